@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import sys
+import typing as T
+
+from benchmarks.corpus import SHAPES
+from benchmarks.suite import BENCHMARKS, compare, format_report, regressions, run_benchmarks
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def main(argv: T.Optional[T.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time conllu on generated corpora and compare the results with a stored baseline.",
+    )
+    parser.add_argument("--sentences", type=int, default=500, help="sentences per corpus (default: 500)")
+    parser.add_argument("--shape", action="append", choices=list(SHAPES), help="corpus shape, can be repeated")
+    parser.add_argument(
+        "--benchmark", action="append", choices=[benchmark.name for benchmark in BENCHMARKS],
+        help="benchmark to run, can be repeated",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="times to run every benchmark (default: 5)")
+    parser.add_argument(
+        "--baseline", default=BASELINE_PATH,
+        help="baseline file, created with --save on your own computer (default: benchmarks/baseline.json)",
+    )
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="how much slower a benchmark can get before it counts as a regression (default: 0.1)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sentences, args.shape, args.benchmark, args.repeat)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if baseline is None:
+        print(format_report(compare({"results": {}}, results), args.threshold))
+    else:
+        if baseline["sentences"] != results["sentences"]:
+            print("Warning: the baseline was run on {} sentences per corpus, not {}.".format(
+                baseline["sentences"], results["sentences"]
+            ))
+
+        if baseline.get("machine") != results["machine"]:
+            print("Warning: the baseline was run with a different Python, platform or compiled parser setting.")
+
+        print(format_report(compare(baseline, results), args.threshold))
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+        print("Saved baseline to {}".format(args.baseline))
+        return 0
+
+    if baseline is not None and regressions(compare(baseline, results), args.threshold):
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import random
+import typing as T
+
+UPOS = ["NOUN", "VERB", "ADJ", "ADV", "PRON", "DET", "ADP", "AUX", "CCONJ", "PROPN", "NUM", "PUNCT"]
+DEPRELS = ["nsubj", "obj", "obl", "amod", "advmod", "det", "case", "conj", "cc", "nmod", "aux", "punct"]
+FEATS = {
+    "Case": ["Nom", "Acc", "Gen", "Dat"],
+    "Definite": ["Def", "Ind"],
+    "Degree": ["Pos", "Cmp", "Sup"],
+    "Gender": ["Masc", "Fem", "Neut"],
+    "Mood": ["Ind", "Imp", "Sub"],
+    "Number": ["Sing", "Plur"],
+    "Person": ["1", "2", "3"],
+    "PronType": ["Art", "Prs", "Dem"],
+    "Tense": ["Past", "Pres", "Fut"],
+    "VerbForm": ["Fin", "Inf", "Part"],
+}
+MISC = {
+    "SpaceAfter": ["No"],
+    "Translit": ["a", "b", "c"],
+    "Gloss": ["dog", "bark", "the", "house"],
+    "Start": ["0", "10", "20"],
+    "End": ["5", "15", "25"],
+}
+
+class Shape(T.NamedTuple):
+    words: int = 15
+    feats: int = 3
+    misc: int = 1
+    enhanced_deps: bool = False
+    multiword_tokens: float = 0.0
+    empty_nodes: float = 0.0
+
+
+SHAPES = {
+    "default": Shape(),
+    "long_sentences": Shape(words=120),
+    "heavy_feats": Shape(feats=8, misc=5),
+    "enhanced_deps": Shape(enhanced_deps=True),
+    "multiword_tokens": Shape(multiword_tokens=0.2),
+    "empty_nodes": Shape(enhanced_deps=True, empty_nodes=0.1),
+}
+
+def generate_corpus(sentences: int = 1000, shape: T.Union[str, Shape] = "default", seed: int = 0) -> str:
+    """
+        Generate a random but valid CoNLL-U corpus. The same arguments always give the same corpus.
+    """
+    if isinstance(shape, str):
+        shape = SHAPES[shape]
+
+    rng = random.Random(seed)
+    return "".join(generate_sentence(rng, shape, i + 1) for i in range(sentences))
+
+def generate_sentence(rng: random.Random, shape: Shape, sent_id: int) -> str:
+    words = max(1, round(rng.gauss(shape.words, shape.words / 4)))
+
+    # Attaching every word to one that comes before it in a shuffled order always gives a tree
+    order = list(range(1, words + 1))
+    rng.shuffle(order)
+    heads = {order[0]: 0}
+    for position, word in enumerate(order[1:], 1):
+        heads[word] = order[rng.randrange(position)]
+
+    lines = ["# sent_id = {}\n".format(sent_id), "# text = {}\n".format(" ".join(
+        "w{}".format(word) for word in range(1, words + 1)
+    ))]
+    word = 1
+    while word <= words:
+        if word < words and rng.random() < shape.multiword_tokens:
+            lines.append("{}-{}\tw{}w{}\t_\t_\t_\t_\t_\t_\t_\t_\n".format(word, word + 1, word, word + 1))
+            lines.append(generate_word(rng, shape, word, heads[word]))
+            lines.append(generate_word(rng, shape, word + 1, heads[word + 1]))
+            word += 2
+        else:
+            lines.append(generate_word(rng, shape, word, heads[word]))
+            word += 1
+
+        if rng.random() < shape.empty_nodes:
+            lines.append(generate_empty_node(rng, shape, word - 1))
+
+    lines.append("\n")
+    return "".join(lines)
+
+def generate_word(rng: random.Random, shape: Shape, id_: int, head: int) -> str:
+    deprel = "root" if head == 0 else rng.choice(DEPRELS)
+    if shape.enhanced_deps:
+        deps = [(head, deprel)]
+        if head != 0 and rng.random() < 0.3:
+            deps.append((0 if head == 1 else head - 1, "conj"))
+
+        deps_value = "|".join("{}:{}".format(dep_head, dep_rel) for dep_head, dep_rel in sorted(set(deps)))
+    else:
+        deps_value = "_"
+
+    return "\t".join([
+        str(id_), "w{}".format(id_), "l{}".format(id_ % 50), rng.choice(UPOS), "_",
+        generate_pairs(rng, FEATS, shape.feats), str(head), deprel, deps_value,
+        generate_pairs(rng, MISC, shape.misc),
+    ]) + "\n"
+
+def generate_empty_node(rng: random.Random, shape: Shape, after: int) -> str:
+    return "\t".join([
+        "{}.1".format(after), "e{}".format(after), "_", "VERB", "_",
+        generate_pairs(rng, FEATS, shape.feats), "_", "_", "{}:conj".format(after), "_",
+    ]) + "\n"
+
+def generate_pairs(rng: random.Random, values: T.Dict[str, T.List[str]], count: int) -> str:
+    keys = sorted(rng.sample(sorted(values), min(count, len(values))))
+    return "|".join("{}={}".format(key, rng.choice(values[key])) for key in keys) or "_"
@@ -0,0 +1,86 @@
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import typing as T
+
+from benchmarks.corpus import SHAPES, generate_corpus
+from conllu import parse_incr
+from conllu.columnar import parse_columnar
+
+
+def _best_time(path: str, run: T.Callable[[T.TextIO], T.Any], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        with open(path, encoding="utf-8") as f:
+            start = time.perf_counter()
+            run(f)
+            times.append(time.perf_counter() - start)
+
+    return min(times)
+
+def time_parallel(path: str, workers: T.Iterable[int], repeat: int = 3) -> T.Dict[str, T.Dict[int, float]]:
+    """
+        Time parsing the file at path into columns with every number of workers, keeping the fastest
+        of `repeat` runs in seconds. One worker means parsing in this process. Parsing into tokens
+        with parse_incr is timed as well, as the serial time to beat.
+    """
+    results: T.Dict[str, T.Dict[int, float]] = {
+        "parse_incr": {1: _best_time(path, lambda f: sum(1 for _ in parse_incr(f)), repeat)},
+        "parse_columnar": {},
+    }
+    for count in workers:
+        results["parse_columnar"][count] = _best_time(
+            path, lambda f: parse_columnar(f, workers=count if count > 1 else None), repeat,
+        )
+
+    return results
+
+def format_speedups(results: T.Dict[str, T.Dict[int, float]]) -> str:
+    """
+        Format the times as a table, with the speedup of every run over the same benchmark with a
+        single worker, and over parsing into tokens with parse_incr.
+    """
+    reference = results["parse_incr"][1]
+    lines = ["{:<16}  {:>7}  {:>10}  {:>7}  {:>13}".format("benchmark", "workers", "time", "speedup", "vs parse_incr")]
+    for name, times in results.items():
+        serial = times[min(times)]
+        for count, seconds in times.items():
+            lines.append("{:<16}  {:>7}  {:>9.3f}s  {:>6.2f}x  {:>12.2f}x".format(
+                name, count, seconds, serial / seconds, reference / seconds,
+            ))
+
+    return "\n".join(lines)
+
+def main(argv: T.Optional[T.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.parallel",
+        description="Time parsing a generated corpus file with different numbers of worker processes.",
+    )
+    parser.add_argument("--sentences", type=int, default=20000, help="sentences in the corpus (default: 20000)")
+    parser.add_argument("--shape", choices=list(SHAPES), default="default", help="corpus shape (default: default)")
+    parser.add_argument(
+        "--workers", type=int, action="append",
+        help="number of workers, can be repeated (default: 1, 2, 4 and the number of CPUs)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="times to run every benchmark (default: 3)")
+    args = parser.parse_args(argv)
+
+    workers = sorted(set(args.workers or [1, 2, 4, os.cpu_count() or 1]))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "corpus.conllu")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(generate_corpus(args.sentences, args.shape))
+
+        results = time_parallel(path, workers, args.repeat)
+
+    print("{} sentences, {} CPUs".format(args.sentences, os.cpu_count()))
+    print(format_speedups(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
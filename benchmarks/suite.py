@@ -0,0 +1,194 @@
+import gc
+import importlib.util
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import typing as T
+from io import StringIO
+
+from benchmarks.corpus import SHAPES, generate_corpus
+from conllu import parse, parse_incr, parse_tree, serialize_incr
+from conllu.binary import CACHE_SUFFIX, load_binary, parse_cached
+from conllu.columnar import parse_columnar
+from conllu.indexed import IndexedSentenceList, MappedSentenceList, SentenceIndex
+from conllu.parser import DEFAULT_FIELDS, _speedups, parse_dict_value, parse_line
+
+
+class Benchmark(T.NamedTuple):
+    name: str
+    setup: T.Callable[[str], T.Any]
+    run: T.Callable[[T.Any], T.Any]
+
+def _token_lines(data: str) -> T.List[str]:
+    return [line for line in data.splitlines() if line and not line.startswith("#")]
+
+def _feats_values(data: str) -> T.List[str]:
+    return [line.split("\t")[5] for line in _token_lines(data)]
+
+def _trees(data: str) -> T.List[T.Any]:
+    return [sentence.to_tree() for sentence in parse(data)]
+
+class CorpusFiles(T.NamedTuple):
+    directory: tempfile.TemporaryDirectory
+    source_path: str
+    binary_path: str
+    sentence_index: SentenceIndex
+
+def _corpus_files(data: str) -> CorpusFiles:
+    # The files are removed once the benchmark is done with them and the directory is garbage collected
+    directory = tempfile.TemporaryDirectory()
+    source_path = os.path.join(directory.name, "corpus.conllu")
+    with open(source_path, "w", encoding="utf-8") as f:
+        f.write(data)
+
+    parse_cached(source_path)
+    return CorpusFiles(directory, source_path, source_path + CACHE_SUFFIX, SentenceIndex.build(source_path))
+
+def _read_every_sentence(sentence_list_type: T.Type[IndexedSentenceList], files: CorpusFiles) -> T.List[T.Any]:
+    # Back to front, so every sentence needs a seek
+    with sentence_list_type(files.source_path, files.sentence_index) as sentences:
+        return [sentences[i] for i in reversed(range(len(sentences)))]
+
+
+BENCHMARKS = [
+    Benchmark("parse", lambda data: data, parse),
+    Benchmark("parse_intern", lambda data: data, lambda data: parse(data, intern=True)),
+    Benchmark("parse_shared", lambda data: data, lambda data: parse(data, shared_fields=["feats", "misc"])),
+    Benchmark("parse_incr", lambda data: data, lambda data: sum(1 for _ in parse_incr(StringIO(data)))),
+    Benchmark("parse_compact", lambda data: data, lambda data: parse(data, compact=True)),
+    Benchmark("parse_lazy", lambda data: data, lambda data: parse(data, lazy=True)),
+    Benchmark("parse_columnar", lambda data: data, lambda data: parse_columnar(StringIO(data))),
+    Benchmark("parse_columnar_workers", lambda data: data, lambda data: parse_columnar(StringIO(data), workers=2)),
+    Benchmark("parse_tree", lambda data: data, parse_tree),
+    Benchmark("parse_line", _token_lines, lambda lines: [parse_line(line, DEFAULT_FIELDS) for line in lines]),
+    Benchmark("parse_dict_value", _feats_values, lambda values: [parse_dict_value(value) for value in values]),
+    Benchmark("serialize", parse, lambda sentences: [sentence.serialize() for sentence in sentences]),
+    Benchmark("serialize_incr", parse, lambda sentences: serialize_incr(sentences, StringIO())),
+    Benchmark("filter", parse, lambda sentences: [sentence.filter(upos="NOUN") for sentence in sentences]),
+    Benchmark("to_tree", parse, lambda sentences: [sentence.to_tree() for sentence in sentences]),
+    Benchmark("to_list", _trees, lambda trees: [tree.to_list() for tree in trees]),
+    Benchmark("load_binary", _corpus_files, lambda files: load_binary(files.binary_path)),
+    Benchmark("load_binary_columnar", _corpus_files, lambda files: load_binary(files.binary_path, columnar=True)),
+    Benchmark("parse_cached", _corpus_files, lambda files: parse_cached(files.source_path)),
+    Benchmark("indexed_access", _corpus_files, lambda files: _read_every_sentence(IndexedSentenceList, files)),
+    Benchmark("mapped_access", _corpus_files, lambda files: _read_every_sentence(MappedSentenceList, files)),
+]
+
+# Turning corpora into arrays needs NumPy, which is optional
+if importlib.util.find_spec("numpy") is not None:
+    BENCHMARKS.append(Benchmark(
+        "to_arrays", lambda data: parse_columnar(StringIO(data)), lambda corpus: corpus.to_arrays(),
+    ))
+
+def run_benchmarks(sentences: int = 500,
+                   shapes: T.Optional[T.Iterable[str]] = None,
+                   names: T.Optional[T.Iterable[str]] = None,
+                   repeat: int = 5,
+                   ) -> T.Dict[str, T.Any]:
+    """
+        Time every benchmark on a generated corpus of every shape. Each one runs `repeat` times, and
+        the fastest and median times are kept, in seconds, under the name "benchmark[shape]".
+    """
+    names = set(names) if names is not None else None
+    results = {}
+    for shape in shapes or SHAPES:
+        data = generate_corpus(sentences, shape)
+        for benchmark in BENCHMARKS:
+            if names is not None and benchmark.name not in names:
+                continue
+
+            argument = benchmark.setup(data)
+            times = []
+            for _ in range(repeat):
+                # Like timeit, keep garbage collection from adding noise to the measurements
+                gc.collect()
+                gc.disable()
+                try:
+                    start = time.perf_counter()
+                    benchmark.run(argument)
+                    times.append(time.perf_counter() - start)
+                finally:
+                    gc.enable()
+
+            results["{}[{}]".format(benchmark.name, shape)] = {
+                "min": min(times),
+                "median": statistics.median(times),
+            }
+
+    return {
+        "machine": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "compiled_parser": _speedups is not None,
+        },
+        "sentences": sentences,
+        "repeat": repeat,
+        "results": results,
+    }
+
+class Comparison(T.NamedTuple):
+    name: str
+    baseline: T.Optional[float]
+    current: float
+
+    @property
+    def ratio(self) -> T.Optional[float]:
+        if self.baseline is None:
+            return None
+
+        return self.current / self.baseline
+
+def compare(baseline: T.Dict[str, T.Any], current: T.Dict[str, T.Any]) -> T.List[Comparison]:
+    """
+        Pair up the fastest times of the benchmarks in the current run with the ones in the baseline.
+    """
+    baseline_results = baseline["results"]
+    return [
+        Comparison(name, baseline_results[name]["min"] if name in baseline_results else None, result["min"])
+        for name, result in current["results"].items()
+    ]
+
+def format_report(comparisons: T.List[Comparison], threshold: float = 0.1) -> str:
+    """
+        Format a comparison as a table. Benchmarks that got more than `threshold` slower are marked
+        as regressions, the ones that got more than `threshold` faster as improvements.
+    """
+    width = max([len("benchmark")] + [len(comparison.name) for comparison in comparisons])
+    lines = ["{:<{width}}  {:>10}  {:>10}  {:>7}".format("benchmark", "baseline", "current", "ratio", width=width)]
+    for comparison in comparisons:
+        ratio = comparison.ratio
+        if ratio is None:
+            note = "new"
+        elif ratio > 1 + threshold:
+            note = "REGRESSION"
+        elif ratio < 1 - threshold:
+            note = "improvement"
+        else:
+            note = ""
+
+        lines.append("{:<{width}}  {:>10}  {:>10}  {:>7}  {}".format(
+            comparison.name,
+            _format_time(comparison.baseline),
+            _format_time(comparison.current),
+            "-" if ratio is None else "{:.2f}x".format(ratio),
+            note,
+            width=width,
+        ).rstrip())
+
+    return "\n".join(lines)
+
+def regressions(comparisons: T.List[Comparison], threshold: float = 0.1) -> T.List[Comparison]:
+    return [
+        comparison for comparison in comparisons
+        if comparison.ratio is not None and comparison.ratio > 1 + threshold
+    ]
+
+def _format_time(seconds: T.Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+
+    return "{:.2f} ms".format(seconds * 1000)
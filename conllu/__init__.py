@@ -1,59 +1,77 @@
 import typing as T
 from io import StringIO
 
-from conllu.models import Metadata, SentenceGenerator, SentenceList, Token, TokenList, TokenTree
+from conllu.compact_tree import CompactTree
+from conllu.intern import InternTable
+from conllu.models import (
+    CompactToken, LazyToken, Metadata, SentenceGenerator, SentenceList, Token, TokenList, TokenTree,
+)
 from conllu.parser import (
-    DEFAULT_FIELDS, _FieldParserType, _MetadataParserType, parse_sentences, parse_token_and_metadata,
+    ParsePlan, _FieldParserType, _filter_sentences, _MetadataParserType, _plan_sentences, compile_parse_plan,
+    parse_lines, parse_sentence_lines, parse_sentences, parse_token_and_metadata,
 )
+from conllu.serializer import serialize_incr
+from conllu.shared import SharedDict
 
 __all__ = [
     "parse", "parse_incr", "parse_tree", "parse_tree_incr",
-    "SentenceGenerator", "SentenceList", "TokenList", "TokenTree", "Token", "Metadata",
-    "parse_sentences", "parse_token_and_metadata",
+    "SentenceGenerator", "SentenceList", "TokenList", "TokenTree", "CompactTree",
+    "Token", "CompactToken", "LazyToken", "Metadata", "InternTable", "SharedDict",
+    "parse_sentences", "parse_token_and_metadata", "ParsePlan", "compile_parse_plan",
+    "parse_sentence_lines", "parse_lines", "serialize_incr",
 ]
 
 def parse(data: str, fields: T.Optional[T.Sequence[str]] = None,
           field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None,
-          metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None
+          metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None,
+          strict_tabs: T.Optional[bool] = None,
+          compact: bool = False,
+          lazy: bool = False,
+          columns: T.Optional[T.Iterable[str]] = None,
+          metadata_filter: T.Optional[T.Dict[str, T.Any]] = None,
+          token_filter: T.Optional[T.Dict[str, T.Any]] = None,
+          intern: T.Union[bool, InternTable] = False,
+          shared_fields: T.Optional[T.Iterable[str]] = None,
           ) -> SentenceList:
     return SentenceList(parse_incr(
         StringIO(data),
         fields=fields,
         field_parsers=field_parsers,
-        metadata_parsers=metadata_parsers
+        metadata_parsers=metadata_parsers,
+        strict_tabs=strict_tabs,
+        compact=compact,
+        lazy=lazy,
+        columns=columns,
+        metadata_filter=metadata_filter,
+        token_filter=token_filter,
+        intern=intern,
+        shared_fields=shared_fields,
     ))
 
 def parse_incr(in_file: T.TextIO, fields: T.Optional[T.Sequence[str]] = None,
                field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None,
-               metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None
+               metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None,
+               strict_tabs: T.Optional[bool] = None,
+               compact: bool = False,
+               lazy: bool = False,
+               columns: T.Optional[T.Iterable[str]] = None,
+               metadata_filter: T.Optional[T.Dict[str, T.Any]] = None,
+               token_filter: T.Optional[T.Dict[str, T.Any]] = None,
+               intern: T.Union[bool, InternTable] = False,
+               shared_fields: T.Optional[T.Iterable[str]] = None,
                ) -> SentenceGenerator:
 
     if not hasattr(in_file, 'read'):
         raise FileNotFoundError("Invalid file, 'parse_incr' needs an opened file as input")
 
     def generator():
-        global_columns = None
-
-        for sentence in parse_sentences(in_file):
-            lines = sentence.strip().split('\n')
-            current_metadata = [line for line in lines if line.startswith('#')]
-            current_sentence = [line for line in lines if not line.startswith('#')]
-
-            if any(line.startswith('# global.columns = ') for line in current_metadata):
-                global_columns = next(
-                    line.split('=', 1)[1].strip().split()
-                    for line in current_metadata if line.startswith('# global.columns = ')
-                )
-
-            used_fields = global_columns if global_columns else (fields if fields else DEFAULT_FIELDS)
-            used_fields = [field.lower() for field in used_fields]
+        planned = _plan_sentences(in_file, fields, field_parsers, strict_tabs, compact, lazy, columns, intern,
+                                  shared_fields)
+        if metadata_filter or token_filter:
+            planned = _filter_sentences(planned, metadata_filter, token_filter, metadata_parsers)
 
-            yield parse_token_and_metadata(
-                '\n'.join(current_metadata + current_sentence),
-                fields=used_fields,
-                field_parsers=field_parsers,
-                metadata_parsers=metadata_parsers
-            )
+        for plan, comment_lines, token_lines in planned:
+            yield parse_lines(comment_lines, token_lines, plan, metadata_parsers)
 
     return SentenceGenerator(generator())
 
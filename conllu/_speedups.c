@@ -0,0 +1,555 @@
+/*
+ * Compiled version of the parts of conllu.parser that parse tokens with the default fields and
+ * field parsers. conllu.parser is the reference: every function here must give exactly the same
+ * values, and raise the same ParseExceptions, as the Python code it replaces.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#define NUM_FIELDS 10
+
+enum { ID, FORM, LEMMA, UPOS, XPOS, FEATS, HEAD, DEPREL, DEPS, MISC };
+
+static const char *field_names[NUM_FIELDS] = {
+    "id", "form", "lemma", "upos", "xpos", "feats", "head", "deprel", "deps", "misc",
+};
+
+static PyObject *field_keys[NUM_FIELDS];
+static PyObject *parse_exception;
+static PyObject *dash;
+static PyObject *dot;
+static PyObject *empty;
+static PyObject *no_args;
+
+typedef struct {
+    PyObject *line;
+    int kind;
+    const void *data;
+} Line;
+
+#define CHAR(line, i) PyUnicode_READ((line)->kind, (line)->data, (i))
+
+static PyObject *
+substring(Line *line, Py_ssize_t start, Py_ssize_t end)
+{
+    return PyUnicode_Substring(line->line, start, end);
+}
+
+static Py_ssize_t
+find(Line *line, Py_UCS4 ch, Py_ssize_t start, Py_ssize_t end)
+{
+    for (Py_ssize_t i = start; i < end; i++) {
+        if (CHAR(line, i) == ch) {
+            return i;
+        }
+    }
+    return -1;
+}
+
+static int
+is_null(Line *line, Py_ssize_t start, Py_ssize_t end)
+{
+    return start == end || (end - start == 1 && CHAR(line, start) == '_');
+}
+
+static int
+is_number(Line *line, Py_ssize_t start, Py_ssize_t end)
+{
+    if (start == end) {
+        return 0;
+    }
+    for (Py_ssize_t i = start; i < end; i++) {
+        Py_UCS4 ch = CHAR(line, i);
+        if (ch < '0' || ch > '9') {
+            return 0;
+        }
+    }
+    return 1;
+}
+
+static int
+is_positive_number(Line *line, Py_ssize_t start, Py_ssize_t end)
+{
+    return is_number(line, start, end) && CHAR(line, start) != '0';
+}
+
+static PyObject *
+to_int(Line *line, Py_ssize_t start, Py_ssize_t end)
+{
+    /* Only called on an optional "-" followed by ASCII digits */
+    if (end - start < 18) {
+        long long value = 0;
+        int negative = CHAR(line, start) == '-';
+        for (Py_ssize_t i = start + negative; i < end; i++) {
+            value = value * 10 + (long long)(CHAR(line, i) - '0');
+        }
+        return PyLong_FromLongLong(negative ? -value : value);
+    }
+
+    PyObject *text = substring(line, start, end);
+    if (text == NULL) {
+        return NULL;
+    }
+    PyObject *value = PyLong_FromUnicodeObject(text, 10);
+    Py_DECREF(text);
+    return value;
+}
+
+static PyObject *
+raise_invalid(Line *line, Py_ssize_t start, Py_ssize_t end, int field, const char *format)
+{
+    PyObject *text = substring(line, start, end);
+    if (text == NULL) {
+        return NULL;
+    }
+    PyObject *message = PyUnicode_FromFormat(format, text);
+    Py_DECREF(text);
+    if (message == NULL) {
+        return NULL;
+    }
+    PyObject *full_message = PyUnicode_FromFormat("Failed parsing field '%s': %U", field_names[field], message);
+    Py_DECREF(message);
+    if (full_message != NULL) {
+        PyErr_SetObject(parse_exception, full_message);
+        Py_DECREF(full_message);
+    }
+    return NULL;
+}
+
+static PyObject *
+parse_nullable_value(Line *line, Py_ssize_t start, Py_ssize_t end)
+{
+    if (is_null(line, start, end)) {
+        Py_RETURN_NONE;
+    }
+    return substring(line, start, end);
+}
+
+static PyObject *
+parse_int_value(Line *line, Py_ssize_t start, Py_ssize_t end, int field)
+{
+    if (end - start == 1 && CHAR(line, start) == '_') {
+        Py_RETURN_NONE;
+    }
+
+    Py_ssize_t digits = start < end && CHAR(line, start) == '-' ? start + 1 : start;
+    if (is_number(line, digits, end) && (CHAR(line, digits) != '0' || (digits == start && end - start == 1))) {
+        return to_int(line, start, end);
+    }
+    return raise_invalid(line, start, end, field, "'%U' is not a valid value for parse_int_value.");
+}
+
+static PyObject *
+make_id_tuple(Line *line, Py_ssize_t start, Py_ssize_t separator, Py_ssize_t end, PyObject *kind)
+{
+    PyObject *before = to_int(line, start, separator);
+    if (before == NULL) {
+        return NULL;
+    }
+    PyObject *after = to_int(line, separator + 1, end);
+    if (after == NULL) {
+        Py_DECREF(before);
+        return NULL;
+    }
+    Py_INCREF(kind);
+    PyObject *id = PyTuple_Pack(3, before, kind, after);
+    Py_DECREF(before);
+    Py_DECREF(kind);
+    Py_DECREF(after);
+    return id;
+}
+
+static PyObject *
+parse_id_value(Line *line, Py_ssize_t start, Py_ssize_t end, int field)
+{
+    if (is_null(line, start, end)) {
+        Py_RETURN_NONE;
+    }
+
+    if (is_number(line, start, end)) {
+        if (CHAR(line, start) != '0' || end - start == 1) {
+            return to_int(line, start, end);
+        }
+    }
+    else {
+        Py_ssize_t separator = find(line, '-', start, end);
+        if (separator != -1) {
+            if (is_positive_number(line, start, separator) && is_positive_number(line, separator + 1, end)) {
+                PyObject *id = make_id_tuple(line, start, separator, end, dash);
+                if (id == NULL) {
+                    return NULL;
+                }
+                int compare = PyObject_RichCompareBool(PyTuple_GET_ITEM(id, 2), PyTuple_GET_ITEM(id, 0), Py_GE);
+                if (compare == 1) {
+                    return id;
+                }
+                Py_DECREF(id);
+                if (compare == -1) {
+                    return NULL;
+                }
+            }
+        }
+        else {
+            separator = find(line, '.', start, end);
+            if (separator != -1 && is_number(line, start, separator) &&
+                    is_positive_number(line, separator + 1, end)) {
+                return make_id_tuple(line, start, separator, end, dot);
+            }
+        }
+    }
+
+    return raise_invalid(line, start, end, field, "'%U' is not a valid ID.");
+}
+
+static int
+is_any_id(Line *line, Py_ssize_t start, Py_ssize_t end)
+{
+    if (is_number(line, start, end)) {
+        return CHAR(line, start) != '0' || end - start == 1;
+    }
+
+    Py_ssize_t separator = find(line, '-', start, end);
+    if (separator != -1) {
+        return is_positive_number(line, start, separator) && is_positive_number(line, separator + 1, end);
+    }
+
+    separator = find(line, '.', start, end);
+    if (separator == -1) {
+        return 0;
+    }
+    return is_number(line, start, separator) && is_positive_number(line, separator + 1, end);
+}
+
+static int
+is_paired_list(Line *line, Py_ssize_t start, Py_ssize_t end)
+{
+    Py_ssize_t part_start = start;
+    while (1) {
+        Py_ssize_t part_end = find(line, '|', part_start, end);
+        if (part_end == -1) {
+            part_end = end;
+        }
+
+        Py_ssize_t colon = find(line, ':', part_start, part_end);
+        if (colon == -1 || colon + 1 == part_end || !is_any_id(line, part_start, colon)) {
+            return 0;
+        }
+
+        Py_ssize_t segment_start = colon + 1;
+        while (segment_start <= part_end) {
+            Py_ssize_t segment_end = find(line, ':', segment_start, part_end);
+            if (segment_end == -1) {
+                segment_end = part_end;
+            }
+            if (segment_start == segment_end) {
+                return 0;
+            }
+            Py_UCS4 first = CHAR(line, segment_start);
+            if (first == '_' || first == '-' || Py_UNICODE_ISDECIMAL(first)) {
+                return 0;
+            }
+            segment_start = segment_end + 1;
+        }
+
+        if (part_end == end) {
+            return 1;
+        }
+        part_start = part_end + 1;
+    }
+}
+
+static PyObject *
+parse_paired_list_value(Line *line, Py_ssize_t start, Py_ssize_t end, int field)
+{
+    if (!is_paired_list(line, start, end)) {
+        return parse_nullable_value(line, start, end);
+    }
+
+    PyObject *pairs = PyList_New(0);
+    if (pairs == NULL) {
+        return NULL;
+    }
+
+    Py_ssize_t part_start = start;
+    while (part_start <= end) {
+        Py_ssize_t part_end = find(line, '|', part_start, end);
+        if (part_end == -1) {
+            part_end = end;
+        }
+        Py_ssize_t colon = find(line, ':', part_start, part_end);
+
+        PyObject *relation = substring(line, colon + 1, part_end);
+        if (relation == NULL) {
+            goto error;
+        }
+        PyObject *id = parse_id_value(line, part_start, colon, field);
+        if (id == NULL) {
+            Py_DECREF(relation);
+            goto error;
+        }
+        PyObject *pair = PyTuple_Pack(2, relation, id);
+        Py_DECREF(relation);
+        Py_DECREF(id);
+        if (pair == NULL || PyList_Append(pairs, pair) < 0) {
+            Py_XDECREF(pair);
+            goto error;
+        }
+        Py_DECREF(pair);
+        part_start = part_end + 1;
+    }
+    return pairs;
+
+error:
+    Py_DECREF(pairs);
+    return NULL;
+}
+
+static PyObject *
+parse_dict_value(Line *line, Py_ssize_t start, Py_ssize_t end)
+{
+    if (is_null(line, start, end)) {
+        Py_RETURN_NONE;
+    }
+
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+
+    Py_ssize_t part_start = start;
+    while (part_start <= end) {
+        Py_ssize_t part_end = find(line, '|', part_start, end);
+        if (part_end == -1) {
+            part_end = end;
+        }
+
+        /* Like part.split("=")[0] and part.split("=")[1] */
+        Py_ssize_t equals = find(line, '=', part_start, part_end);
+        Py_ssize_t key_end = equals == -1 ? part_end : equals;
+        if (!is_null(line, part_start, key_end)) {
+            PyObject *value;
+            if (equals == -1) {
+                Py_INCREF(empty);
+                value = empty;
+            }
+            else {
+                Py_ssize_t value_end = find(line, '=', equals + 1, part_end);
+                value = parse_nullable_value(line, equals + 1, value_end == -1 ? part_end : value_end);
+            }
+            PyObject *key = substring(line, part_start, key_end);
+            if (value == NULL || key == NULL || PyDict_SetItem(dict, key, value) < 0) {
+                Py_XDECREF(value);
+                Py_XDECREF(key);
+                Py_DECREF(dict);
+                return NULL;
+            }
+            Py_DECREF(value);
+            Py_DECREF(key);
+        }
+        part_start = part_end + 1;
+    }
+    return dict;
+}
+
+static PyObject *
+parse_field(Line *line, int field, Py_ssize_t start, Py_ssize_t end)
+{
+    switch (field) {
+    case ID:
+        return parse_id_value(line, start, end, field);
+    case XPOS:
+        return parse_nullable_value(line, start, end);
+    case FEATS:
+    case MISC:
+        return parse_dict_value(line, start, end);
+    case HEAD:
+        return parse_int_value(line, start, end, field);
+    case DEPS:
+        return parse_paired_list_value(line, start, end, field);
+    default:
+        return substring(line, start, end);
+    }
+}
+
+static PyObject *
+new_token(PyObject *token_type)
+{
+    /* Dict subclasses that keep dict's __init__, like Token, don't need a full call */
+    PyTypeObject *type = (PyTypeObject *)token_type;
+    if (PyType_Check(token_type) && PyType_IsSubtype(type, &PyDict_Type) && type->tp_init == PyDict_Type.tp_init) {
+        return type->tp_new(type, no_args, NULL);
+    }
+    return PyObject_CallObject(token_type, NULL);
+}
+
+static PyObject *
+parse_token(PyObject *text, int strict_tabs, PyObject *token_type)
+{
+    if (!PyUnicode_Check(text)) {
+        PyErr_SetString(PyExc_TypeError, "token lines must be strings");
+        return NULL;
+    }
+    if (PyUnicode_READY(text) < 0) {
+        return NULL;
+    }
+
+    Line line = {text, PyUnicode_KIND(text), PyUnicode_DATA(text)};
+    Py_ssize_t length = PyUnicode_GET_LENGTH(text);
+
+    /* Split like ParsePlan.split_line(): on tabs only in strictly tab separated files, otherwise on
+       every tab and every run of two or more spaces */
+    int tabs_only = strict_tabs && find(&line, '\t', 0, length) != -1;
+    Py_ssize_t starts[NUM_FIELDS], ends[NUM_FIELDS];
+    Py_ssize_t num_values = 0;
+    Py_ssize_t value_start = 0;
+    Py_ssize_t i = 0;
+    while (i < length) {
+        Py_UCS4 ch = CHAR(&line, i);
+        Py_ssize_t separator_end = -1;
+        if (ch == '\t') {
+            separator_end = i + 1;
+        }
+        else if (!tabs_only && ch == ' ' && i + 1 < length && CHAR(&line, i + 1) == ' ') {
+            separator_end = i + 2;
+            while (separator_end < length && CHAR(&line, separator_end) == ' ') {
+                separator_end++;
+            }
+        }
+
+        if (separator_end == -1) {
+            i++;
+            continue;
+        }
+        if (num_values < NUM_FIELDS) {
+            starts[num_values] = value_start;
+            ends[num_values] = i;
+        }
+        num_values++;
+        value_start = i = separator_end;
+    }
+    if (num_values < NUM_FIELDS) {
+        starts[num_values] = value_start;
+        ends[num_values] = length;
+    }
+    num_values++;
+
+    if (num_values == 1) {
+        PyErr_SetString(parse_exception, "Invalid line format, line must contain either tabs or two spaces.");
+        return NULL;
+    }
+
+    PyObject *token = new_token(token_type);
+    if (token == NULL) {
+        return NULL;
+    }
+    for (int field = 0; field < NUM_FIELDS && field < num_values; field++) {
+        PyObject *value = parse_field(&line, field, starts[field], ends[field]);
+        if (value == NULL || PyDict_SetItem(token, field_keys[field], value) < 0) {
+            Py_XDECREF(value);
+            Py_DECREF(token);
+            return NULL;
+        }
+        Py_DECREF(value);
+    }
+    return token;
+}
+
+static PyObject *
+speedups_parse_token_line(PyObject *module, PyObject *args)
+{
+    PyObject *line, *token_type;
+    int strict_tabs;
+    if (!PyArg_ParseTuple(args, "UpO:parse_token_line", &line, &strict_tabs, &token_type)) {
+        return NULL;
+    }
+    return parse_token(line, strict_tabs, token_type);
+}
+
+static PyObject *
+speedups_parse_token_lines(PyObject *module, PyObject *args)
+{
+    PyObject *lines, *token_type;
+    int strict_tabs;
+    if (!PyArg_ParseTuple(args, "OpO:parse_token_lines", &lines, &strict_tabs, &token_type)) {
+        return NULL;
+    }
+
+    PyObject *iterator = PyObject_GetIter(lines);
+    if (iterator == NULL) {
+        return NULL;
+    }
+    PyObject *tokens = PyList_New(0);
+    if (tokens == NULL) {
+        Py_DECREF(iterator);
+        return NULL;
+    }
+
+    PyObject *line;
+    while ((line = PyIter_Next(iterator)) != NULL) {
+        PyObject *token = parse_token(line, strict_tabs, token_type);
+        Py_DECREF(line);
+        if (token == NULL || PyList_Append(tokens, token) < 0) {
+            Py_XDECREF(token);
+            goto error;
+        }
+        Py_DECREF(token);
+    }
+    if (PyErr_Occurred()) {
+        goto error;
+    }
+    Py_DECREF(iterator);
+    return tokens;
+
+error:
+    Py_DECREF(iterator);
+    Py_DECREF(tokens);
+    return NULL;
+}
+
+static PyMethodDef speedups_methods[] = {
+    {"parse_token_line", speedups_parse_token_line, METH_VARARGS,
+     "parse_token_line(line, strict_tabs, token_type)\n\n"
+     "Parse a token line with the default fields and field parsers into a token_type."},
+    {"parse_token_lines", speedups_parse_token_lines, METH_VARARGS,
+     "parse_token_lines(lines, strict_tabs, token_type)\n\n"
+     "Parse token lines with the default fields and field parsers into a list of token_type."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "conllu._speedups",
+    "Compiled token parsing for conllu.parser.",
+    -1,
+    speedups_methods,
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    PyObject *exceptions = PyImport_ImportModule("conllu.exceptions");
+    if (exceptions == NULL) {
+        return NULL;
+    }
+    parse_exception = PyObject_GetAttrString(exceptions, "ParseException");
+    Py_DECREF(exceptions);
+    if (parse_exception == NULL) {
+        return NULL;
+    }
+
+    for (int field = 0; field < NUM_FIELDS; field++) {
+        field_keys[field] = PyUnicode_InternFromString(field_names[field]);
+        if (field_keys[field] == NULL) {
+            return NULL;
+        }
+    }
+    dash = PyUnicode_InternFromString("-");
+    dot = PyUnicode_InternFromString(".");
+    empty = PyUnicode_New(0, 0);
+    no_args = PyTuple_New(0);
+    if (dash == NULL || dot == NULL || empty == NULL || no_args == NULL) {
+        return NULL;
+    }
+
+    return PyModule_Create(&speedups_module);
+}
@@ -0,0 +1,196 @@
+import typing as T
+
+from conllu.shared import SharedDict
+
+if T.TYPE_CHECKING:
+    import numpy
+
+    from conllu.columnar import ColumnarSentenceList
+    from conllu.models import TokenList
+
+    class VocabularyProtocol(T.Protocol):
+        def encode(self, value: T.Any) -> int:
+            pass
+
+NUMERIC_FIELDS = ("id", "head")
+DEFAULT_ARRAY_FIELDS = ("id", "head", "upos", "deprel", "form")
+MISSING_NUMBER = -1
+
+class Vocabulary:
+    """
+        Maps field values to consecutive integer ids in the order they are first seen. Dicts and
+        lists, like feats and deps, are compared by their items. A frozen vocabulary returns
+        unknown_id for values it hasn't seen instead of adding them.
+    """
+    def __init__(self, values: T.Iterable[T.Any] = (), frozen: bool = False, unknown_id: int = -1):
+        self.values: T.List[T.Any] = []
+        self.ids: T.Dict[T.Any, int] = {}
+        self.unknown_id = unknown_id
+        self.frozen = False
+
+        for value in values:
+            self.encode(value)
+
+        self.frozen = frozen
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value: T.Any) -> bool:
+        return _hashable(value) in self.ids
+
+    def __repr__(self) -> str:
+        return f'Vocabulary<{len(self)} values>'
+
+    def encode(self, value: T.Any) -> int:
+        key = _hashable(value)
+        value_id = self.ids.get(key)
+        if value_id is None:
+            if self.frozen:
+                return self.unknown_id
+
+            value_id = self.ids[key] = len(self.values)
+            self.values.append(value)
+
+        return value_id
+
+    def decode(self, value_id: int) -> T.Any:
+        return self.values[value_id]
+
+def _hashable(value: T.Any) -> T.Hashable:
+    if isinstance(value, (dict, SharedDict)):
+        return dict, tuple((key, _hashable(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return list, tuple(_hashable(item) for item in value)
+
+    return value
+
+def _import_numpy() -> T.Any:
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Converting to arrays needs NumPy, install it with 'pip install conllu[numpy]'") from None
+
+    return numpy
+
+def _encode_number(value: T.Any) -> int:
+    return value if isinstance(value, int) else MISSING_NUMBER
+
+def _encoders(fields: T.Sequence[str], vocabularies: T.Optional[T.Dict[str, 'VocabularyProtocol']]
+              ) -> T.Dict[str, T.Callable[[T.Any], int]]:
+    vocabularies = {} if vocabularies is None else vocabularies
+    return {
+        field: _encode_number if field in NUMERIC_FIELDS else vocabularies.setdefault(field, Vocabulary()).encode
+        for field in fields
+    }
+
+def tokenlist_to_arrays(tokenlist: 'TokenList', fields: T.Sequence[str] = DEFAULT_ARRAY_FIELDS,
+                        vocabularies: T.Optional[T.Dict[str, 'VocabularyProtocol']] = None,
+                        ) -> T.Dict[str, 'numpy.ndarray']:
+    """
+        One int64 array per field for the words of a sentence, leaving out multiword tokens and
+        empty nodes. id and head are kept as numbers, other fields are encoded with the vocabulary
+        for that field. Missing vocabularies are created and added to the vocabularies dict.
+    """
+    numpy = _import_numpy()
+    encoders = _encoders(fields, vocabularies)
+    words = [token for token in tokenlist if isinstance(token.get("id"), int)]
+
+    return {
+        field: numpy.fromiter((encode(token.get(field)) for token in words), dtype=numpy.int64, count=len(words))
+        for field, encode in encoders.items()
+    }
+
+def sentences_to_arrays(sentences: T.Iterable['TokenList'], fields: T.Sequence[str] = DEFAULT_ARRAY_FIELDS,
+                        vocabularies: T.Optional[T.Dict[str, 'VocabularyProtocol']] = None,
+                        padded: bool = True, pad_value: int = -1,
+                        ) -> T.Dict[str, 'numpy.ndarray']:
+    """
+        Arrays for many sentences, either padded to the longest sentence with a "lengths" array, or
+        ragged: all words concatenated, with an "offsets" array where sentence i is
+        offsets[i]:offsets[i + 1].
+    """
+    numpy = _import_numpy()
+    encoders = _encoders(fields, vocabularies)
+
+    values: T.Dict[str, T.List[int]] = {field: [] for field in fields}
+    lengths = []
+    for tokenlist in sentences:
+        words = [token for token in tokenlist if isinstance(token.get("id"), int)]
+        for field, encode in encoders.items():
+            values[field].extend(encode(token.get(field)) for token in words)
+        lengths.append(len(words))
+
+    return _assemble(
+        {field: numpy.array(field_values, dtype=numpy.int64) for field, field_values in values.items()},
+        numpy.array(lengths, dtype=numpy.int64),
+        padded,
+        pad_value,
+    )
+
+def columnar_to_arrays(corpus: 'ColumnarSentenceList', fields: T.Sequence[str] = DEFAULT_ARRAY_FIELDS,
+                       vocabularies: T.Optional[T.Dict[str, 'VocabularyProtocol']] = None,
+                       padded: bool = True, pad_value: int = -1,
+                       ) -> T.Dict[str, 'numpy.ndarray']:
+    # Same result as sentences_to_arrays(corpus), but every distinct value is only encoded once
+    numpy = _import_numpy()
+    encoders = _encoders(fields, vocabularies)
+    table = corpus.values.values
+    token_fields = numpy.frombuffer(corpus.token_fields, dtype=numpy.uint32)
+
+    def has_field(field: str) -> T.Any:
+        field_sets = [field in (field_set or ()) for field_set in corpus._field_sets]
+        return numpy.array(field_sets, dtype=bool)[token_fields]
+
+    def value_ids(field: str) -> T.Any:
+        # Tokens without the field point to one past the end of the value table, which means None
+        if field not in corpus.columns:
+            return numpy.full(len(token_fields), len(table), dtype=numpy.int64)
+
+        column = numpy.frombuffer(corpus.columns[field], dtype=numpy.uint32).astype(numpy.int64)
+        return numpy.where(has_field(field), column, len(table))
+
+    def lookup(value_id: int) -> T.Any:
+        return table[value_id] if value_id < len(table) else None
+
+    id_values = value_ids("id")
+    is_word = numpy.array([isinstance(value, int) for value in table] + [False], dtype=bool)[id_values]
+
+    encoded = {}
+    for field, encode in encoders.items():
+        selected = value_ids(field)[is_word]
+
+        # Encode values in the order they first appear, like sentences_to_arrays does
+        unique, first_index, inverse = numpy.unique(selected, return_index=True, return_inverse=True)
+        order = numpy.argsort(first_index, kind="stable")
+        codes = numpy.empty(len(unique), dtype=numpy.int64)
+        for position in order:
+            codes[position] = encode(lookup(int(unique[position])))
+
+        encoded[field] = codes[inverse.reshape(-1)]
+
+    words_before = numpy.concatenate([[0], numpy.cumsum(is_word)])
+    offsets = numpy.frombuffer(corpus.sentence_offsets, dtype=numpy.int64)
+    lengths = words_before[offsets[1:]] - words_before[offsets[:-1]]
+
+    return _assemble(encoded, lengths.astype(numpy.int64), padded, pad_value)
+
+def _assemble(values: T.Dict[str, 'numpy.ndarray'], lengths: 'numpy.ndarray', padded: bool, pad_value: int
+              ) -> T.Dict[str, 'numpy.ndarray']:
+    numpy = _import_numpy()
+    offsets = numpy.concatenate([[0], numpy.cumsum(lengths)]).astype(numpy.int64)
+
+    if not padded:
+        return {**values, "offsets": offsets}
+
+    max_length = int(lengths.max()) if len(lengths) else 0
+    rows = numpy.repeat(numpy.arange(len(lengths)), lengths)
+    columns = numpy.arange(int(offsets[-1])) - numpy.repeat(offsets[:-1], lengths)
+
+    arrays = {}
+    for field, field_values in values.items():
+        array = numpy.full((len(lengths), max_length), pad_value, dtype=numpy.int64)
+        array[rows, columns] = field_values
+        arrays[field] = array
+
+    return {**arrays, "lengths": lengths}
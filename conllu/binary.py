@@ -0,0 +1,308 @@
+import hashlib
+import json
+import marshal
+import os
+import sys
+import types
+import typing as T
+import uuid
+from array import array
+
+from conllu import parse_incr
+from conllu.columnar import ColumnarSentenceList, ValueTable
+from conllu.exceptions import ParseException
+from conllu.models import CompactToken, Metadata, SentenceList, Token, TokenList
+from conllu.parser import _FieldParserType, _MetadataParserType
+from conllu.shared import SharedDict
+
+BINARY_MAGIC = b"CoNLL-U\x00"
+BINARY_VERSION = 2
+MARSHAL_VERSION = 4
+CACHE_SUFFIX = ".bin"
+
+def save_binary(sentences: T.Union[ColumnarSentenceList, T.Iterable[TokenList]],
+                binary_path: T.Union[str, os.PathLike],
+                key: T.Optional[T.Dict[str, T.Any]] = None) -> None:
+    """
+        Save sentences in a binary file that load_binary() can read back without parsing the text.
+        Every distinct value is stored once, in a table, and tokens are arrays of ids into it, one
+        array per field. The file is written next to binary_path first and then moved into place,
+        so it's never seen half written.
+    """
+    metadata = sentences.metadata if isinstance(sentences, SentenceList) else None
+    if not isinstance(sentences, ColumnarSentenceList):
+        sentences = ColumnarSentenceList(sentences)
+
+    arrays = [
+        ("sentence_offsets", sentences.sentence_offsets),
+        ("sentence_fields", sentences.sentence_fields),
+        ("token_fields", sentences.token_fields),
+    ] + [("column", column) for column in sentences.columns.values()]
+
+    # The values and metadata are saved with marshal, which reads them back much faster than JSON
+    tables = marshal.dumps((
+        [_plain_value(value) for value in sentences.values.values],
+        [_plain_value(sentence_metadata) for sentence_metadata in sentences.metadata],
+        None if metadata is None else _plain_value(metadata),
+    ), MARSHAL_VERSION)
+
+    header = {
+        "version": BINARY_VERSION,
+        "byteorder": sys.byteorder,
+        "key": key,
+        "field_sets": [None if fields is None else list(fields) for fields in sentences._field_sets],
+        "columns": list(sentences.columns),
+        "arrays": [[name, values.typecode, values.itemsize, len(values)] for name, values in arrays],
+        "tables": len(tables),
+    }
+    header_data = json.dumps(header).encode("utf-8")
+
+    temp_path = "{}.{}.tmp".format(os.fspath(binary_path), uuid.uuid4().hex)
+    try:
+        with open(temp_path, "xb") as f:
+            f.write(BINARY_MAGIC)
+            f.write(len(header_data).to_bytes(8, "little"))
+            f.write(header_data)
+            for _, values in arrays:
+                f.write(values.tobytes())
+
+            f.write(tables)
+
+        os.replace(temp_path, binary_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        raise
+
+def read_binary_header(binary_path: T.Union[str, os.PathLike]) -> T.Dict[str, T.Any]:
+    with open(binary_path, "rb") as f:
+        return _read_header(f)
+
+def _read_header(in_file: T.BinaryIO) -> T.Dict[str, T.Any]:
+    if in_file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ParseException("Can't load binary file, it's not a CoNLL-U binary file.")
+
+    header_length = int.from_bytes(in_file.read(8), "little")
+    header = json.loads(in_file.read(header_length).decode("utf-8"))
+    version = header.get("version") if isinstance(header, dict) else None
+    if version != BINARY_VERSION:
+        raise ParseException("Can't load binary file, unsupported version '{}'.".format(version))
+
+    return header
+
+def _read_binary(binary_path: T.Union[str, os.PathLike]
+                 ) -> T.Tuple[T.Dict[str, T.Any], T.List[array], T.Tuple[T.Any, T.Any, T.Any]]:
+    with open(binary_path, "rb") as f:
+        header = _read_header(f)
+        data = memoryview(f.read())
+
+    for _, typecode, itemsize, _ in header["arrays"]:
+        if array(typecode).itemsize != itemsize:
+            raise ParseException("Can't load binary file, it was saved on an incompatible platform.")
+
+    if len(data) != sum(itemsize * length for _, _, itemsize, length in header["arrays"]) + header["tables"]:
+        raise ParseException("Can't load binary file, it's truncated or corrupt.")
+
+    arrays = []
+    position = 0
+    for _, typecode, itemsize, length in header["arrays"]:
+        ids = array(typecode)
+        ids.frombytes(data[position:position + itemsize * length])
+        if header["byteorder"] != sys.byteorder:
+            ids.byteswap()
+
+        arrays.append(ids)
+        position += itemsize * length
+
+    return header, arrays, marshal.loads(data[position:])
+
+@T.overload
+def load_binary(binary_path: T.Union[str, os.PathLike], compact: bool = ...,
+                columnar: T.Literal[False] = ...) -> SentenceList:
+    ...  # pragma: no cover
+
+@T.overload
+def load_binary(binary_path: T.Union[str, os.PathLike], compact: bool = ...,
+                *, columnar: T.Literal[True]) -> ColumnarSentenceList:
+    ...  # pragma: no cover
+
+def load_binary(binary_path, compact=False, columnar=False):  # noqa: F811
+    """
+        Load sentences saved with save_binary(). With columnar, they are returned as a
+        ColumnarSentenceList made straight from the saved arrays, without building any tokens,
+        which is much faster. Values are read with marshal, so only load binary files you made
+        yourself.
+    """
+    header, arrays, (values, sentence_metadata, metadata) = _read_binary(binary_path)
+    if columnar:
+        return _load_columnar(header, arrays, values, sentence_metadata)
+
+    sentence_offsets, sentence_fields, token_fields = arrays[:3]
+    field_sets = [None if fields is None else tuple(fields) for fields in header["field_sets"]]
+
+    # Turn every column of value ids into values up front, giving each token its own copy of
+    # values it could change in place
+    mutable_ids = {value_id for value_id, value in enumerate(values) if isinstance(value, (dict, list))}
+    columns = {}
+    for field, column in zip(header["columns"], arrays[3:]):
+        if mutable_ids.intersection(column):
+            columns[field] = [
+                values[value_id].copy() if value_id in mutable_ids else values[value_id]
+                for value_id in column
+            ]
+        else:
+            columns[field] = [values[value_id] for value_id in column]
+
+    # Build the values of every token at once by zipping the columns, which is much faster than
+    # looking them up token by token when all tokens have the same fields, like they usually do
+    token_field_sets = [field_sets[field_set_id] or () for field_set_id in set(token_fields)]
+    rows: T.Iterable[T.Tuple[T.Any, ...]]
+    if len(token_field_sets) == 1:
+        fields = token_field_sets[0]
+        rows = zip(*[columns[field] for field in fields]) if fields else [()] * len(token_fields)
+        token_fields_list: T.Iterable[T.Tuple[str, ...]] = [fields] * len(token_fields)
+    else:
+        token_fields_list = [field_sets[field_set_id] or () for field_set_id in token_fields]
+        rows = (
+            tuple(columns[field][position] for field in fields)
+            for position, fields in enumerate(token_fields_list)
+        )
+
+    tokens: T.List[T.Any]
+    if compact:
+        tokens = [CompactToken.from_values(fields, row) for fields, row in zip(token_fields_list, rows)]
+    else:
+        tokens = [Token(zip(fields, row)) for fields, row in zip(token_fields_list, rows)]
+
+    sentences = [
+        TokenList(
+            tokens[sentence_offsets[i]:sentence_offsets[i + 1]],
+            Metadata(metadata_values),
+            field_sets[sentence_fields[i]],
+        )
+        for i, metadata_values in enumerate(sentence_metadata)
+    ]
+
+    return SentenceList(sentences, None if metadata is None else Metadata(metadata))
+
+def _load_columnar(header: T.Dict[str, T.Any], arrays: T.List[array], values: T.List[T.Any],
+                   sentence_metadata: T.List[T.Dict[str, T.Any]]) -> ColumnarSentenceList:
+    corpus = ColumnarSentenceList()
+    corpus.values = ValueTable.from_values(values)
+    corpus.sentence_offsets, corpus.sentence_fields, corpus.token_fields = arrays[:3]
+    corpus.columns = dict(zip(header["columns"], arrays[3:]))
+    corpus.metadata = [Metadata(metadata_values) for metadata_values in sentence_metadata]
+    for fields in header["field_sets"]:
+        corpus._field_set_id(fields)
+
+    return corpus
+
+@T.overload
+def parse_cached(source_path: T.Union[str, os.PathLike],
+                 cache_path: T.Optional[T.Union[str, os.PathLike]] = ...,
+                 fields: T.Optional[T.Sequence[str]] = ...,
+                 field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = ...,
+                 metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = ...,
+                 strict_tabs: T.Optional[bool] = ...,
+                 compact: bool = ...,
+                 columns: T.Optional[T.Iterable[str]] = ...,
+                 metadata_filter: T.Optional[T.Dict[str, T.Any]] = ...,
+                 token_filter: T.Optional[T.Dict[str, T.Any]] = ...,
+                 columnar: T.Literal[False] = ...,
+                 ) -> SentenceList:
+    ...  # pragma: no cover
+
+@T.overload
+def parse_cached(source_path: T.Union[str, os.PathLike],
+                 cache_path: T.Optional[T.Union[str, os.PathLike]] = ...,
+                 fields: T.Optional[T.Sequence[str]] = ...,
+                 field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = ...,
+                 metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = ...,
+                 strict_tabs: T.Optional[bool] = ...,
+                 compact: bool = ...,
+                 columns: T.Optional[T.Iterable[str]] = ...,
+                 metadata_filter: T.Optional[T.Dict[str, T.Any]] = ...,
+                 token_filter: T.Optional[T.Dict[str, T.Any]] = ...,
+                 *, columnar: T.Literal[True],
+                 ) -> ColumnarSentenceList:
+    ...  # pragma: no cover
+
+def parse_cached(source_path, cache_path=None, fields=None, field_parsers=None, metadata_parsers=None,  # noqa: F811
+                 strict_tabs=None, compact=False, columns=None, metadata_filter=None,
+                 token_filter=None, columnar=False):
+    """
+        Parse a CoNLL-U file, saving the result in a binary cache file next to it. Later calls load
+        the cache instead, as long as the file's size and modification time and the parse options
+        are the same. Custom parsers and filter functions are told apart by their name and code,
+        so clear the cache after changing a value that one of them only reads from outside. Loading
+        the cache builds every token again, which takes about as long as parsing with the compiled
+        parser; with columnar, a ColumnarSentenceList is returned instead, which loads many times
+        faster.
+    """
+    cache_path = cache_path or os.fspath(source_path) + CACHE_SUFFIX
+    columns = None if columns is None else list(columns)
+
+    stat = os.stat(source_path)
+    key = {
+        "source": os.path.abspath(source_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "options": json.dumps([
+            fields, field_parsers, metadata_parsers, strict_tabs, columns, metadata_filter, token_filter,
+        ], default=_describe_option, sort_keys=True),
+    }
+
+    if os.path.exists(cache_path):
+        try:
+            if read_binary_header(cache_path)["key"] == key:
+                return load_binary(cache_path, compact=compact, columnar=columnar)
+        except (OSError, ValueError, KeyError, TypeError, EOFError, ParseException):
+            # A cache that can't be read is treated like a stale one, and the file is parsed again
+            pass
+
+    with open(source_path, "r", encoding="utf-8") as f:
+        sentences = (ColumnarSentenceList if columnar else SentenceList)(parse_incr(
+            f,
+            fields=fields,
+            field_parsers=field_parsers,
+            metadata_parsers=metadata_parsers,
+            strict_tabs=strict_tabs,
+            compact=compact,
+            columns=columns,
+            metadata_filter=metadata_filter,
+            token_filter=token_filter,
+        ))
+
+    save_binary(sentences, cache_path, key=key)
+    return sentences
+
+def _describe_option(option: T.Any) -> str:
+    name = "{}.{}".format(getattr(option, "__module__", None), getattr(option, "__qualname__", repr(option)))
+    code = getattr(option, "__code__", None)
+    if not isinstance(code, types.CodeType):
+        return name
+
+    # Every lambda in a module has the same name, so tell functions apart by their code as well
+    return "{}:{}".format(name, hashlib.sha1(_describe_code(code).encode("utf-8")).hexdigest())
+
+def _describe_code(code: types.CodeType) -> str:
+    # The repr of a code object includes its address, so nested functions are described instead
+    consts = [_describe_code(const) if isinstance(const, types.CodeType) else repr(const) for const in code.co_consts]
+    return repr((code.co_code, code.co_names, consts))
+
+def _plain_value(value: T.Any) -> T.Any:
+    # marshal only saves the built-in types themselves, so subclasses and SharedDicts are turned into them
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+
+    if isinstance(value, tuple):
+        return tuple(_plain_value(item) for item in value)
+
+    if isinstance(value, list):
+        return [_plain_value(item) for item in value]
+
+    if isinstance(value, (dict, SharedDict)):
+        return {_plain_value(key): _plain_value(item) for key, item in value.items()}
+
+    raise TypeError(f"Can't save value of type {type(value)} in a binary file:\n{value}")
@@ -0,0 +1,383 @@
+import typing as T
+from array import array
+
+from conllu.arrays import DEFAULT_ARRAY_FIELDS, columnar_to_arrays
+from conllu.exceptions import ParseException
+from conllu.models import Metadata, SentenceList, Token, TokenList
+from conllu.parser import (
+    DEFAULT_FIELD_PARSERS, ParsePlan, _FieldParserType, _MetadataParserType, _plan_sentences, parse_metadata_lines,
+)
+from conllu.shared import SharedDict
+
+if T.TYPE_CHECKING:
+    import numpy
+
+    from conllu.arrays import VocabularyProtocol
+
+
+# Parsers that only read their own column, so their values can be looked up by the column's string
+_COLUMN_PARSERS = {None, *DEFAULT_FIELD_PARSERS.values()}
+
+class ValueTable:
+    """
+        Interning table that maps each distinct field value to a small integer id. Strings, ints,
+        tuples and dicts/lists of hashable items are shared, anything else gets an id of its own.
+    """
+    def __init__(self) -> None:
+        self.values: T.List[T.Any] = []
+        self._ids: T.Optional[T.Dict[T.Any, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, value_id: int) -> T.Any:
+        return self.values[value_id]
+
+    @classmethod
+    def from_values(cls, values: T.List[T.Any]) -> 'ValueTable':
+        # Finding the ids of values is only needed to add more, so it's put off until then
+        table = cls()
+        table.values = values
+        table._ids = None
+        return table
+
+    def _value_ids(self) -> T.Dict[T.Any, int]:
+        if self._ids is None:
+            # Keep the ids of the values as they are, even if two of them have become equal
+            self._ids = {}
+            for value_id, value in enumerate(self.values):
+                try:
+                    self._ids.setdefault(_value_key(value), value_id)
+                except TypeError:
+                    pass
+
+        return self._ids
+
+    def add(self, value: T.Any) -> int:
+        ids = self._value_ids()
+        try:
+            key = _value_key(value)
+            return ids[key]
+        except KeyError:
+            value_id = ids[key] = len(self.values)
+        except TypeError:
+            value_id = len(self.values)
+
+        self.values.append(value)
+        return value_id
+
+    def add_all(self, values: T.Iterable[T.Any]) -> T.List[int]:
+        # Like add() for many values at once, with the common case of strings inlined
+        ids = self._value_ids()
+        table = self.values
+        value_ids = []
+        for value in values:
+            try:
+                key = (str, value) if type(value) is str else _value_key(value)
+                value_id = ids.get(key)
+                if value_id is None:
+                    value_id = ids[key] = len(table)
+                    table.append(value)
+            except TypeError:
+                value_id = len(table)
+                table.append(value)
+
+            value_ids.append(value_id)
+
+        return value_ids
+
+def _value_key(value: T.Any) -> T.Hashable:
+    # Include the type, so that 1, 1.0 and True don't share an id
+    value_type = type(value)
+    if isinstance(value, (dict, SharedDict)):
+        return value_type, tuple(value.items())
+    if isinstance(value, list):
+        return value_type, tuple(value)
+
+    return value_type, value
+
+def _translate_ids(ids: array, new_ids: T.List[int]) -> array:
+    # Ids that don't change, like the ones of a first chunk, are copied as they are
+    if new_ids == list(range(len(new_ids))):
+        return ids
+
+    try:
+        import numpy
+    except ImportError:
+        return array("I", map(new_ids.__getitem__, ids))
+
+    # Looking up every id in Python takes longer than the rest of merging corpora, so use NumPy if it's there
+    translated = numpy.array(new_ids, dtype=numpy.uint32)[numpy.frombuffer(ids, dtype=numpy.uint32)]
+    return array("I", translated.tobytes())
+
+def _copy_value(value: T.Any) -> T.Any:
+    # Views get their own copy of mutable values, so changing them doesn't change the corpus
+    if isinstance(value, (dict, list)):
+        return type(value)(value)
+
+    if isinstance(value, SharedDict):
+        return value.copy()
+
+    return value
+
+class ColumnarSentenceList(T.Sequence[TokenList]):
+    """
+        Corpus stored one column per field instead of one dict per token. Every column is an array
+        of ids into a shared ValueTable, and sentences are ranges of token positions. Indexing
+        builds TokenList views on demand; changing a view doesn't change the corpus.
+    """
+    def __init__(self, sentences: T.Optional[T.Iterable[TokenList]] = None):
+        self.values = ValueTable()
+        self.columns: T.Dict[str, array] = {}
+        self.sentence_offsets = array("q", [0])
+        self.metadata: T.List[Metadata] = []
+
+        # Field names of each token and default_fields of each sentence, as ids into _field_sets
+        self.token_fields = array("I")
+        self.sentence_fields = array("I")
+        self._field_sets: T.List[T.Optional[T.Tuple[str, ...]]] = []
+        self._field_set_ids: T.Dict[T.Optional[T.Tuple[str, ...]], int] = {}
+
+        for sentence in sentences or []:
+            self.append(sentence)
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def __repr__(self) -> str:
+        return f'ColumnarSentenceList<{len(self)} sentences, {self.num_tokens} tokens>'
+
+    @property
+    def num_tokens(self) -> int:
+        return self.sentence_offsets[-1]
+
+    def _field_set_id(self, fields: T.Optional[T.Iterable[str]]) -> int:
+        fields = tuple(fields) if fields is not None else None
+        field_set_id = self._field_set_ids.get(fields)
+        if field_set_id is None:
+            field_set_id = self._field_set_ids[fields] = len(self._field_sets)
+            self._field_sets.append(fields)
+
+        return field_set_id
+
+    def _append_token(self, values: T.Iterable[T.Tuple[str, T.Any]]) -> None:
+        self._append_token_ids((field, self.values.add(value)) for field, value in values)
+
+    def _append_token_ids(self, value_ids: T.Iterable[T.Tuple[str, int]]) -> None:
+        position = len(self.token_fields)
+        columns = self.columns
+        fields = []
+        appended = 0
+        for field, value_id in value_ids:
+            fields.append(field)
+            column = columns.get(field)
+            if column is None:
+                column = columns[field] = array("I", [0]) * position
+            elif len(column) > position:
+                # A token with the same field twice, like CoNLL-U files parsed with fields=("id", "id")
+                column[position] = value_id
+                continue
+
+            column.append(value_id)
+            appended += 1
+
+        # Keep every column as long as the number of tokens, even where this token has no value
+        if appended < len(columns):
+            for column in columns.values():
+                if len(column) == position:
+                    column.append(0)
+
+        self.token_fields.append(self._field_set_id(fields))
+
+    def _append_sentence(self, metadata: Metadata, default_fields: T.Optional[T.Iterable[str]]) -> None:
+        self.metadata.append(metadata)
+        self.sentence_fields.append(self._field_set_id(default_fields))
+        self.sentence_offsets.append(len(self.token_fields))
+
+    def append(self, sentence: TokenList) -> None:
+        for token in sentence:
+            self._append_token(token.items())
+
+        self._append_sentence(Metadata(sentence.metadata), sentence.default_fields)
+
+    def extend(self, sentences: T.Iterable[TokenList]) -> None:
+        if isinstance(sentences, ColumnarSentenceList):
+            self._extend_columnar(sentences)
+            return
+
+        for sentence in sentences:
+            self.append(sentence)
+
+    def _extend_columnar(self, other: 'ColumnarSentenceList') -> None:
+        # Copy the other corpus' columns over a column at a time, translating its ids into ours
+        value_ids = self.values.add_all(other.values.values)
+        field_set_ids = [self._field_set_id(fields) for fields in other._field_sets]
+        position = len(self.token_fields)
+
+        for field, other_column in other.columns.items():
+            column = self.columns.get(field)
+            if column is None:
+                column = self.columns[field] = array("I", [0]) * position
+            column.extend(_translate_ids(other_column, value_ids))
+
+        for column in self.columns.values():
+            if len(column) == position:
+                column.extend(array("I", [0]) * other.num_tokens)
+
+        self.token_fields.extend(map(field_set_ids.__getitem__, other.token_fields))
+        self.sentence_fields.extend(map(field_set_ids.__getitem__, other.sentence_fields))
+        self.sentence_offsets.extend(offset + position for offset in other.sentence_offsets[1:])
+        self.metadata.extend(Metadata(metadata) for metadata in other.metadata)
+
+    def _token(self, position: int) -> Token:
+        fields = self._field_sets[self.token_fields[position]]
+        assert fields is not None  # help mypy
+        values = self.values.values
+        return Token([(field, _copy_value(values[self.columns[field][position]])) for field in fields])
+
+    @T.overload
+    def __getitem__(self, key: int) -> TokenList: ...  # noqa, pragma: no cover
+
+    @T.overload
+    def __getitem__(self, key: slice) -> SentenceList: ...  # noqa, pragma: no cover
+
+    def __getitem__(self, key):  # noqa: F811
+        if isinstance(key, slice):
+            return SentenceList([self[i] for i in range(*key.indices(len(self)))])
+
+        if key < 0:
+            key += len(self)
+
+        if not 0 <= key < len(self):
+            raise IndexError("sentence index out of range")
+
+        tokens = [
+            self._token(position)
+            for position in range(self.sentence_offsets[key], self.sentence_offsets[key + 1])
+        ]
+        return TokenList(tokens, Metadata(self.metadata[key]), self._field_sets[self.sentence_fields[key]])
+
+    def token_range(self, i: int) -> range:
+        return range(self.sentence_offsets[i], self.sentence_offsets[i + 1])
+
+    def column(self, field: str, sentence: T.Optional[int] = None) -> T.List[T.Any]:
+        """
+            Values of one field for all tokens, or the tokens of one sentence. Tokens without the
+            field get None.
+        """
+        positions = range(self.num_tokens) if sentence is None else self.token_range(sentence)
+        column = self.columns.get(field)
+        if column is None:
+            return [None] * len(positions)
+
+        values = self.values.values
+        field_sets = self._field_sets
+        token_fields = self.token_fields
+        return [
+            _copy_value(values[column[position]]) if field in (field_sets[token_fields[position]] or ()) else None
+            for position in positions
+        ]
+
+    def to_sentence_list(self) -> SentenceList:
+        return SentenceList([self[i] for i in range(len(self))])
+
+    def to_arrays(self, fields: T.Sequence[str] = DEFAULT_ARRAY_FIELDS,
+                  vocabularies: T.Optional[T.Dict[str, 'VocabularyProtocol']] = None,
+                  padded: bool = True, pad_value: int = -1,
+                  ) -> T.Dict[str, 'numpy.ndarray']:
+        return columnar_to_arrays(self, fields=fields, vocabularies=vocabularies, padded=padded, pad_value=pad_value)
+
+def parse_columnar(in_file: T.TextIO, fields: T.Optional[T.Sequence[str]] = None,
+                   field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None,
+                   metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None,
+                   strict_tabs: T.Optional[bool] = None,
+                   workers: T.Optional[int] = None,
+                   chunk_bytes: T.Optional[int] = None,
+                   ) -> ColumnarSentenceList:
+    """
+        Parse a CoNLL-U file straight into a ColumnarSentenceList. With workers, parts of the file are
+        parsed into columns in worker processes, and only the columns are sent back and merged.
+    """
+    if workers and workers > 1:
+        from conllu.parallel import parse_columnar_parallel
+        return parse_columnar_parallel(in_file, workers, fields, field_parsers, metadata_parsers, strict_tabs,
+                                       chunk_bytes=chunk_bytes)
+
+    corpus = ColumnarSentenceList()
+    _append_planned(corpus, _plan_sentences(in_file, fields, field_parsers, strict_tabs), metadata_parsers)
+    return corpus
+
+def _append_planned(corpus: ColumnarSentenceList,
+                    planned: T.Iterable[T.Tuple[ParsePlan, T.List[str], T.List[str]]],
+                    metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None) -> None:
+    # Goes straight from lines to value ids, without building Token or TokenList objects. The default
+    # field parsers only read their own column, so every distinct string in those is only parsed once
+    value_ids: T.Dict[T.Tuple[str, T.Optional[_FieldParserType]], T.Dict[str, int]] = {}
+    add_value = corpus.values.add
+
+    def parse_value_id(line_split: T.List[str], i: int, field: str, parser: T.Optional[_FieldParserType],
+                       cache: T.Optional[T.Dict[str, int]]) -> int:
+        if parser is None:
+            value = line_split[i]
+        else:
+            try:
+                value = parser(line_split, i)
+            except ParseException as e:
+                raise ParseException("Failed parsing field '{}': ".format(field) + str(e))
+
+        value_id = add_value(value)
+        if cache is not None:
+            cache[line_split[i]] = value_id
+
+        return value_id
+
+    last_plan = None
+    columns: T.List[T.Tuple[int, str, T.Optional[_FieldParserType], T.Optional[T.Dict[str, int]]]] = []
+    width = 0
+    targets: T.Optional[T.List[array]] = None
+    field_set_id = 0
+    for plan, comment_lines, token_lines in planned:
+        if plan is not last_plan:
+            last_plan = plan
+            columns = [
+                (i, field, parser, value_ids.setdefault((field, parser), {}) if parser in _COLUMN_PARSERS else None)
+                for i, field, parser in plan.columns
+            ]
+            width = columns[-1][0] + 1 if columns else 0
+            targets = None
+
+        for line in token_lines:
+            line_split = plan.split_line(line)
+            if targets is not None and len(line_split) >= width:
+                # Tokens with every column of the plan go straight into the column arrays
+                for (i, field, parser, cache), target in zip(columns, targets):
+                    value_id = None if cache is None else cache.get(line_split[i])
+                    if value_id is None:
+                        value_id = parse_value_id(line_split, i, field, parser, cache)
+
+                    target.append(value_id)
+
+                corpus.token_fields.append(field_set_id)
+                continue
+
+            ids = []
+            for i, field, parser, cache in columns:
+                # Allow parsing CoNNL-U files with fewer columns
+                if i >= len(line_split):
+                    break
+
+                value_id = None if cache is None else cache.get(line_split[i])
+                if value_id is None:
+                    value_id = parse_value_id(line_split, i, field, parser, cache)
+
+                ids.append((field, value_id))
+
+            corpus._append_token_ids(ids)
+
+            # Once the corpus has exactly the columns of a whole token, later ones can skip the checks
+            fields = [field for field, _ in ids]
+            if len(line_split) >= width and len(set(fields)) == len(fields) == len(corpus.columns) > 0:
+                targets = [corpus.columns[field] for field in fields]
+                field_set_id = corpus.token_fields[-1]
+
+        corpus._append_sentence(parse_metadata_lines(comment_lines, metadata_parsers), plan.fields)
@@ -0,0 +1,204 @@
+import typing as T
+from array import array
+
+from conllu.exceptions import ParseException
+
+if T.TYPE_CHECKING:
+    from conllu.models import Metadata, Token
+
+class CompactTree:
+    """
+        Dependency tree stored as int arrays, one position per node, with the root as node 0. Apart
+        from parent, first child and next sibling links, it keeps the preorder position, depth,
+        subtree size and leftmost/rightmost word of every node, so most queries don't need to walk
+        the tree. Nodes are referred to by their token id, and the root by 0.
+    """
+    def __init__(self, tokens: T.Sequence['Token'], metadata: T.Optional['Metadata'] = None):
+        self.tokens = list(tokens)
+        self.metadata = metadata
+
+        size = len(self.tokens) + 1
+        self.ids: T.List[int] = [0]
+        self._index: T.Dict[int, int] = {0: 0}
+        for token in self.tokens:
+            if token["id"] in self._index:
+                raise ParseException("Can't build tree, found id '{}' twice.".format(token["id"]))
+
+            self._index[token["id"]] = len(self.ids)
+            self.ids.append(token["id"])
+
+        self._parent = array("i", [-1]) * size
+        self._first_child = array("i", [-1]) * size
+        self._next_sibling = array("i", [-1]) * size
+        for node in range(size - 1, 0, -1):
+            head = self.tokens[node - 1]["head"]
+            parent = self._index.get(head)
+            if parent is None:
+                raise ParseException("Can't build tree, token '{}' has unknown head '{}'.".format(
+                    self.ids[node], head
+                ))
+
+            self._parent[node] = parent
+            self._next_sibling[node] = self._first_child[parent]
+            self._first_child[parent] = node
+
+        self._order = array("i")
+        self._pre = array("i", [-1]) * size
+        self._depth = array("i", [0]) * size
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            self._pre[node] = len(self._order)
+            self._order.append(node)
+
+            children = []
+            child = self._first_child[node]
+            while child != -1:
+                self._depth[child] = self._depth[node] + 1
+                children.append(child)
+                child = self._next_sibling[child]
+
+            stack.extend(reversed(children))
+
+        if len(self._order) != size:
+            raise ParseException("Can't build tree, the heads of tokens {} form a cycle.".format(
+                [self.ids[node] for node in range(size) if self._pre[node] == -1]
+            ))
+
+        # Children come after their parents in preorder, so one reverse pass fills in whole subtrees
+        self._size = array("i", [1]) * size
+        self._leftmost = array("i", range(size))
+        self._rightmost = array("i", range(size))
+        for node in reversed(self._order[1:]):
+            parent = self._parent[node]
+            self._size[parent] += self._size[node]
+            self._leftmost[parent] = min(self._leftmost[parent], self._leftmost[node])
+            self._rightmost[parent] = max(self._rightmost[parent], self._rightmost[node])
+
+        self._projective = all(
+            self._rightmost[node] - self._leftmost[node] + 1 == self._size[node] for node in range(1, size)
+        )
+        self._min_depth_table: T.Optional[T.List[array]] = None
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __repr__(self) -> str:
+        return f'CompactTree<{len(self.tokens)} tokens>'
+
+    def token(self, id_: int) -> 'Token':
+        return self.tokens[self._index[id_] - 1]
+
+    def parent(self, id_: int) -> T.Optional[int]:
+        parent = self._parent[self._index[id_]]
+        return None if parent == -1 else self.ids[parent]
+
+    def children(self, id_: int) -> T.List[int]:
+        children = []
+        child = self._first_child[self._index[id_]]
+        while child != -1:
+            children.append(self.ids[child])
+            child = self._next_sibling[child]
+
+        return children
+
+    def ancestors(self, id_: int) -> T.List[int]:
+        """
+            Ids from the parent of the node up to the root.
+        """
+        ancestors = []
+        node = self._parent[self._index[id_]]
+        while node != -1:
+            ancestors.append(self.ids[node])
+            node = self._parent[node]
+
+        return ancestors
+
+    def descendants(self, id_: int) -> T.List[int]:
+        """
+            Ids of all nodes below the node, in preorder.
+        """
+        node = self._index[id_]
+        start = self._pre[node] + 1
+        return [self.ids[descendant] for descendant in self._order[start:start + self._size[node] - 1]]
+
+    def is_ancestor(self, ancestor_id: int, id_: int) -> bool:
+        ancestor, node = self._index[ancestor_id], self._index[id_]
+        return self._pre[ancestor] < self._pre[node] < self._pre[ancestor] + self._size[ancestor]
+
+    def depth(self, id_: int) -> int:
+        return self._depth[self._index[id_]]
+
+    def subtree_size(self, id_: int) -> int:
+        return self._size[self._index[id_]]
+
+    def span(self, id_: int) -> T.Tuple[int, int]:
+        """
+            Ids of the first and last token in the subtree of the node, in sentence order.
+        """
+        node = self._index[id_]
+        return self.ids[self._leftmost[node]], self.ids[self._rightmost[node]]
+
+    def preorder(self) -> T.List[int]:
+        return [self.ids[node] for node in self._order]
+
+    def postorder(self) -> T.List[int]:
+        postorder = [0] * len(self.ids)
+        for node in self._order:
+            postorder[self._pre[node] - self._depth[node] + self._size[node] - 1] = self.ids[node]
+
+        return postorder
+
+    def preorder_index(self, id_: int) -> int:
+        return self._pre[self._index[id_]]
+
+    def postorder_index(self, id_: int) -> int:
+        # Nodes finished before this one: the ones before it in preorder, except its ancestors, and
+        # its own descendants
+        node = self._index[id_]
+        return self._pre[node] - self._depth[node] + self._size[node] - 1
+
+    def lca(self, first_id: int, second_id: int) -> int:
+        """
+            Id of the lowest common ancestor of two nodes. The first call builds a sparse table over
+            the preorder, after that every call takes constant time.
+        """
+        first, second = self._index[first_id], self._index[second_id]
+        if first == second:
+            return first_id
+
+        start, end = sorted((self._pre[first], self._pre[second]))
+
+        # The shallowest node after the first one in preorder, up to the second one, is a child of
+        # their lowest common ancestor
+        table = self._min_depth_table or self._build_min_depth_table()
+        level = (end - start).bit_length() - 1
+        left, right = table[level][start + 1], table[level][end - (1 << level) + 1]
+        shallowest = left if self._depth[left] <= self._depth[right] else right
+        return self.ids[self._parent[shallowest]]
+
+    def _build_min_depth_table(self) -> T.List[array]:
+        depth = self._depth
+        table = [self._order]
+        width = 1
+        while width * 2 <= len(self._order):
+            previous = table[-1]
+            table.append(array("i", (
+                previous[i] if depth[previous[i]] <= depth[previous[i + width]] else previous[i + width]
+                for i in range(len(previous) - width)
+            )))
+            width *= 2
+
+        self._min_depth_table = table
+        return table
+
+    def is_projective(self, id_: T.Optional[int] = None) -> bool:
+        """
+            Whether the subtree of the node covers an unbroken span of the sentence. Without an id,
+            whether that is true for every node, which means no arcs in the tree cross.
+        """
+        if id_ is None:
+            return self._projective
+
+        node = self._index[id_]
+        return self._rightmost[node] - self._leftmost[node] + 1 == self._size[node]
@@ -0,0 +1,175 @@
+import base64
+import json
+import os
+import sys
+import typing as T
+from array import array
+from bisect import bisect_left
+
+from conllu.exceptions import ParseException
+from conllu.models import TokenList
+from conllu.shared import SharedDict
+
+CORPUS_INDEX_VERSION = 1
+DEFAULT_INDEX_FIELDS = ("form", "lemma", "upos", "deprel", "feats")
+
+# Token positions are stored as one number, with the sentence index above the token index
+TOKEN_BITS = 24
+TOKEN_MASK = (1 << TOKEN_BITS) - 1
+
+class CorpusIndex:
+    """
+        Inverted index from field values to the positions of the tokens that have them, as sorted
+        (sentence index, token index) posting lists. Values are indexed as strings. Dict fields like
+        feats are indexed both by key, under "feats", and by value, under "feats__Number" and so on.
+    """
+    def __init__(self, fields: T.Iterable[str] = DEFAULT_INDEX_FIELDS):
+        self.fields = tuple(fields)
+        self.postings: T.Dict[str, T.Dict[str, array]] = {}
+        self.num_sentences = 0
+        self._sentence_postings: T.Dict[T.Tuple[str, str], T.List[int]] = {}
+
+    def __len__(self) -> int:
+        return self.num_sentences
+
+    def __repr__(self) -> str:
+        return f'CorpusIndex<{self.num_sentences} sentences, fields={list(self.fields)}>'
+
+    @classmethod
+    def build(cls, sentences: T.Iterable[TokenList], fields: T.Iterable[str] = DEFAULT_INDEX_FIELDS
+              ) -> 'CorpusIndex':
+        index = cls(fields)
+        index.extend(sentences)
+        return index
+
+    def add(self, sentence: TokenList) -> None:
+        if len(sentence) > TOKEN_MASK:
+            raise ParseException("Can't index sentences with more than {} tokens.".format(TOKEN_MASK))
+
+        sentence_position = self.num_sentences << TOKEN_BITS
+        for token_index, token in enumerate(sentence):
+            position = sentence_position | token_index
+            for field in self.fields:
+                value = token.get(field)
+                if value is None:
+                    continue
+
+                if isinstance(value, (dict, SharedDict)):
+                    for key, item in value.items():
+                        self._add_posting(field, key, position)
+                        if item is not None:
+                            self._add_posting(field + "__" + key, str(item), position)
+                elif not isinstance(value, (list, tuple)):
+                    self._add_posting(field, str(value), position)
+
+        self.num_sentences += 1
+        self._sentence_postings.clear()
+
+    def extend(self, sentences: T.Iterable[TokenList]) -> None:
+        for sentence in sentences:
+            self.add(sentence)
+
+    def _add_posting(self, field: str, value: str, position: int) -> None:
+        values = self.postings.get(field)
+        if values is None:
+            values = self.postings[field] = {}
+
+        positions = values.get(value)
+        if positions is None:
+            values[value] = array("q", [position])
+        elif positions[-1] != position:
+            positions.append(position)
+
+    def _positions(self, field: str, value: T.Any) -> T.Sequence[int]:
+        return self.postings.get(field, {}).get(str(value), array("q"))
+
+    def lookup(self, field: str, value: T.Any) -> T.List[T.Tuple[int, int]]:
+        return [(position >> TOKEN_BITS, position & TOKEN_MASK) for position in self._positions(field, value)]
+
+    def values(self, field: str) -> T.List[str]:
+        return list(self.postings.get(field, {}))
+
+    def tokens(self, **kwargs: T.Any) -> T.List[T.Tuple[int, int]]:
+        """
+            Positions of tokens where all the keyword arguments match, like
+            index.tokens(lemma="dog", feats__Number="Plur").
+        """
+        positions = _intersect_all([self._positions(field, value) for field, value in kwargs.items()])
+        return [(position >> TOKEN_BITS, position & TOKEN_MASK) for position in positions]
+
+    def sentences(self, **kwargs: T.Any) -> T.List[int]:
+        """
+            Indexes of sentences where each keyword argument matches some token, not necessarily
+            the same one.
+        """
+        return _intersect_all([self._sentences(field, str(value)) for field, value in kwargs.items()])
+
+    def _sentences(self, field: str, value: str) -> T.List[int]:
+        sentences = self._sentence_postings.get((field, value))
+        if sentences is None:
+            sentences = list(dict.fromkeys(position >> TOKEN_BITS for position in self._positions(field, value)))
+            self._sentence_postings[(field, value)] = sentences
+
+        return sentences
+
+    def save(self, index_path: T.Union[str, os.PathLike]) -> None:
+        data = {
+            "version": CORPUS_INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "fields": list(self.fields),
+            "num_sentences": self.num_sentences,
+            "postings": {
+                field: {value: _encode_positions(positions) for value, positions in values.items()}
+                for field, values in self.postings.items()
+            },
+        }
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, index_path: T.Union[str, os.PathLike]) -> 'CorpusIndex':
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("version") != CORPUS_INDEX_VERSION:
+            raise ParseException("Can't load corpus index, unsupported version '{}'.".format(data.get("version")))
+
+        index = cls(data["fields"])
+        index.num_sentences = data["num_sentences"]
+        for field, values in data["postings"].items():
+            index.postings[field] = {}
+            for value, encoded in values.items():
+                positions = array("q", base64.b64decode(encoded))
+                if data["byteorder"] != sys.byteorder:
+                    positions.byteswap()
+                index.postings[field][value] = positions
+
+        return index
+
+def _encode_positions(positions: array) -> str:
+    return base64.b64encode(positions.tobytes()).decode("ascii")
+
+def _intersect_all(postings: T.List[T.Sequence[int]]) -> T.List[int]:
+    if not postings:
+        return []
+
+    # Start with the shortest list, so every step is as cheap as possible
+    postings = sorted(postings, key=len)
+    result = list(postings[0])
+    for other in postings[1:]:
+        result = _intersect(result, other)
+
+    return result
+
+def _intersect(first: T.Sequence[int], second: T.Sequence[int]) -> T.List[int]:
+    # Look up each item of the shorter sorted list in the longer one, skipping what's already been passed
+    result = []
+    low = 0
+    for item in first:
+        low = bisect_left(second, item, low)
+        if low == len(second):
+            break
+        if second[low] == item:
+            result.append(item)
+
+    return result
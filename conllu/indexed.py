@@ -0,0 +1,391 @@
+import bisect
+import json
+import mmap
+import os
+import re
+import typing as T
+from array import array
+from io import StringIO
+
+from conllu.exceptions import ParseException
+from conllu.models import SentenceList, TokenList
+from conllu.parser import (
+    DEFAULT_FIELDS, ParsePlan, _FieldParserType, _MetadataParserType, compile_parse_plan, detect_strict_tabs,
+    parse_global_columns, parse_lines, parse_pair_value, parse_sentence_lines,
+)
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+
+# Everything str.strip() removes, as UTF-8, so blank lines can be found without decoding
+_WHITESPACE = (
+    rb"(?:[ \t\r\x0b\x0c\x1c-\x1f]|\xc2[\x85\xa0]|\xe1\x9a\x80|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]"
+    rb"|\xe2\x81\x9f|\xe3\x80\x80)"
+)
+BLANK_LINE = re.compile(rb"(?m)^" + _WHITESPACE + rb"*(?:\n|\Z)")
+COMMENT_LINE = re.compile(rb"(?m)^" + _WHITESPACE + rb"*#[^\n]*")
+
+_BufferType = T.Union[bytes, bytearray, memoryview, mmap.mmap]
+
+def scan_sentence_spans(buffer: _BufferType) -> T.Iterator[T.Tuple[int, int]]:
+    start = 0
+    for match in BLANK_LINE.finditer(buffer):
+        if match.start() > start:
+            yield start, match.start()
+        start = match.end()
+
+    if start < len(buffer):
+        yield start, len(buffer)
+
+class SentenceIndex:
+    """
+        Byte offsets, lengths and sent_id of every sentence in a CoNLL-U file, together with the
+        global.columns changes and tab detection needed to parse any sentence on its own.
+    """
+    def __init__(
+        self,
+        offsets: T.Iterable[int],
+        lengths: T.Iterable[int],
+        sent_ids: T.List[T.Optional[str]],
+        column_changes: T.Optional[T.List[T.Tuple[int, T.Tuple[str, ...]]]] = None,
+        strict_tabs: bool = False,
+        source_size: T.Optional[int] = None,
+        source_mtime: T.Optional[int] = None,
+    ):
+        self.offsets = array("q", offsets)
+        self.lengths = array("q", lengths)
+        self.sent_ids = sent_ids
+        self.column_changes = column_changes or []
+        self._change_starts = [start for start, _ in self.column_changes]
+        self.strict_tabs = strict_tabs
+        self.source_size = source_size
+        self.source_mtime = source_mtime
+        self._positions: T.Optional[T.Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __repr__(self) -> str:
+        return f'SentenceIndex<{len(self)} sentences>'
+
+    def __eq__(self, other: T.Any) -> bool:
+        if not isinstance(other, SentenceIndex):
+            return False
+
+        return self._to_dict() == other._to_dict()
+
+    def position(self, sent_id: str) -> int:
+        if self._positions is None:
+            self._positions = {}
+            for i, current_id in enumerate(self.sent_ids):
+                if current_id is not None:
+                    self._positions.setdefault(current_id, i)
+
+        return self._positions[sent_id]
+
+    def fields_at(self, i: int) -> T.Optional[T.Tuple[str, ...]]:
+        # global.columns stays in effect until the next sentence that changes it
+        change = bisect.bisect_right(self._change_starts, i)
+        if change == 0:
+            return None
+
+        return self.column_changes[change - 1][1] or None
+
+    def is_current(self, source_path: T.Union[str, os.PathLike]) -> bool:
+        stat = os.stat(source_path)
+        return self.source_size == stat.st_size and self.source_mtime == stat.st_mtime_ns
+
+    @classmethod
+    def from_file(cls, in_file: T.BinaryIO) -> 'SentenceIndex':
+        index = cls([], [], [])
+        strict_tabs = None
+
+        start = end = pos = 0
+        in_sentence = False
+        comment_lines: T.List[str] = []
+        first_token_lines: T.List[str] = []
+
+        for line in in_file:
+            pos += len(line)
+
+            if _is_blank(line):
+                if in_sentence:
+                    index._append(start, end, comment_lines)
+                    in_sentence = False
+                    comment_lines = []
+                    if strict_tabs is None and first_token_lines:
+                        strict_tabs = detect_strict_tabs(first_token_lines)
+                continue
+
+            if not in_sentence:
+                in_sentence = True
+                start = pos - len(line)
+            end = pos
+
+            stripped = line.strip()
+            if stripped[:1] == b"#":
+                comment_lines.append(stripped.decode("utf-8"))
+            elif strict_tabs is None:
+                first_token_lines.append(stripped.decode("utf-8"))
+
+        if in_sentence:
+            index._append(start, end, comment_lines)
+            if strict_tabs is None and first_token_lines:
+                strict_tabs = detect_strict_tabs(first_token_lines)
+
+        index.strict_tabs = bool(strict_tabs)
+        return index
+
+    @classmethod
+    def from_buffer(cls, buffer: _BufferType) -> 'SentenceIndex':
+        index = cls([], [], [])
+        strict_tabs = None
+
+        for start, end in scan_sentence_spans(buffer):
+            comment_lines = [
+                match.group().decode("utf-8").strip()
+                for match in COMMENT_LINE.finditer(buffer, start, end)
+            ]
+            index._append(start, end, comment_lines)
+
+            if strict_tabs is None:
+                text = str(buffer[start:end], "utf-8")
+                for _, token_lines in parse_sentence_lines(StringIO(text, newline=None)):
+                    if token_lines:
+                        strict_tabs = detect_strict_tabs(token_lines)
+
+        index.strict_tabs = bool(strict_tabs)
+        return index
+
+    def _append(self, start: int, end: int, comment_lines: T.List[str]) -> None:
+        sent_id = None
+        for line in comment_lines:
+            key, value = parse_pair_value(line[1:])
+            if key == "sent_id":
+                sent_id = value
+                break
+
+        global_fields = parse_global_columns(comment_lines)
+        if global_fields is not None:
+            self.column_changes.append((len(self.offsets), global_fields))
+            self._change_starts.append(len(self.offsets))
+
+        self.offsets.append(start)
+        self.lengths.append(end - start)
+        self.sent_ids.append(sent_id)
+
+    @classmethod
+    def build(cls, source_path: T.Union[str, os.PathLike]) -> 'SentenceIndex':
+        stat = os.stat(source_path)
+        with open(source_path, "rb") as f:
+            if stat.st_size == 0:
+                index = cls([], [], [])
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    index = cls.from_buffer(buffer)
+
+        index.source_size = stat.st_size
+        index.source_mtime = stat.st_mtime_ns
+        return index
+
+    def _to_dict(self) -> T.Dict[str, T.Any]:
+        return {
+            "version": INDEX_VERSION,
+            "source_size": self.source_size,
+            "source_mtime": self.source_mtime,
+            "strict_tabs": self.strict_tabs,
+            "column_changes": [[start, list(fields)] for start, fields in self.column_changes],
+            "offsets": self.offsets.tolist(),
+            "lengths": self.lengths.tolist(),
+            "sent_ids": self.sent_ids,
+        }
+
+    def save(self, index_path: T.Union[str, os.PathLike]) -> None:
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(self._to_dict(), f)
+
+    @classmethod
+    def load(cls, index_path: T.Union[str, os.PathLike]) -> 'SentenceIndex':
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        version = data.get("version") if isinstance(data, dict) else None
+        if version != INDEX_VERSION:
+            raise ParseException("Can't load index, unsupported version '{}'.".format(version))
+
+        return cls(
+            data["offsets"],
+            data["lengths"],
+            data["sent_ids"],
+            [(start, tuple(fields)) for start, fields in data["column_changes"]],
+            data["strict_tabs"],
+            data["source_size"],
+            data["source_mtime"],
+        )
+
+def load_or_build_index(source_path: T.Union[str, os.PathLike],
+                        index_path: T.Optional[T.Union[str, os.PathLike]] = None) -> SentenceIndex:
+    """
+        Load the sidecar index of a CoNLL-U file, rebuilding and saving it if it is missing, can't be
+        read or the file has changed since it was built. If it can't be saved, for instance next to a
+        file on a read-only disk, the rebuilt index is only kept in memory.
+    """
+    index_path = index_path or os.fspath(source_path) + INDEX_SUFFIX
+
+    try:
+        index = SentenceIndex.load(index_path)
+        if index.is_current(source_path):
+            return index
+    except (OSError, ValueError, KeyError, TypeError, ParseException):
+        pass
+
+    index = SentenceIndex.build(source_path)
+    try:
+        index.save(index_path)
+    except (OSError, ValueError):
+        pass
+
+    return index
+
+def _is_blank(line: bytes) -> bool:
+    stripped = line.strip()
+    if not stripped:
+        return True
+
+    # str.strip() also removes unicode and some control whitespace, so let it decide for those
+    first = stripped[0]
+    if first >= 0x80 or 0x1c <= first <= 0x1f:
+        return not stripped.decode("utf-8", "replace").strip()
+
+    return False
+
+class IndexedSentenceList(T.Sequence[TokenList]):
+    """
+        Read-only list of the sentences in a CoNLL-U file that seeks to and parses only the sentences
+        that are accessed.
+    """
+    def __init__(
+        self,
+        source_path: T.Union[str, os.PathLike],
+        index: T.Optional[SentenceIndex] = None,
+        fields: T.Optional[T.Sequence[str]] = None,
+        field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None,
+        metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None,
+        strict_tabs: T.Optional[bool] = None,
+    ):
+        self.source_path = source_path
+        self.sentence_index = load_or_build_index(source_path) if index is None else index
+        self.fields = tuple(field.lower() for field in (fields if fields else DEFAULT_FIELDS))
+        self.field_parsers = field_parsers
+        self.metadata_parsers = metadata_parsers
+        self.strict_tabs = self.sentence_index.strict_tabs if strict_tabs is None else strict_tabs
+        self._plans: T.Dict[T.Tuple[str, ...], ParsePlan] = {}
+        self._file: T.Optional[T.BinaryIO] = None
+
+    def __len__(self) -> int:
+        return len(self.sentence_index)
+
+    def __repr__(self) -> str:
+        return f'IndexedSentenceList<{self.source_path}, {len(self)} sentences>'
+
+    @T.overload
+    def __getitem__(self, key: int) -> TokenList: ...  # noqa, pragma: no cover
+
+    @T.overload
+    def __getitem__(self, key: slice) -> SentenceList: ...  # noqa, pragma: no cover
+
+    def __getitem__(self, key):  # noqa: F811
+        if isinstance(key, slice):
+            return SentenceList([self._parse(i) for i in range(*key.indices(len(self)))])
+
+        if key < 0:
+            key += len(self)
+
+        if not 0 <= key < len(self):
+            raise IndexError("sentence index out of range")
+
+        return self._parse(key)
+
+    def get_by_sent_id(self, sent_id: str) -> TokenList:
+        return self._parse(self.sentence_index.position(sent_id))
+
+    def read(self, i: int) -> bytes:
+        if self._file is None:
+            self._file = open(self.source_path, "rb")
+
+        self._file.seek(self.sentence_index.offsets[i])
+        return self._file.read(self.sentence_index.lengths[i])
+
+    def _plan(self, i: int) -> ParsePlan:
+        fields = self.sentence_index.fields_at(i) or self.fields
+        plan = self._plans.get(fields)
+        if plan is None:
+            plan = compile_parse_plan(fields, self.field_parsers, strict_tabs=self.strict_tabs)
+            self._plans[fields] = plan
+
+        return plan
+
+    def _parse(self, i: int) -> TokenList:
+        text = str(self.read(i), "utf-8")
+        for comment_lines, token_lines in parse_sentence_lines(StringIO(text, newline=None)):
+            return parse_lines(comment_lines, token_lines, self._plan(i), self.metadata_parsers)
+
+        raise ParseException("Can't parse sentence {}, index doesn't match the file.".format(i))
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'IndexedSentenceList':
+        return self
+
+    def __exit__(self, *args: T.Any) -> None:
+        self.close()
+
+class MappedSentenceList(IndexedSentenceList):
+    """
+        IndexedSentenceList backed by a memory-mapped file. Sentence boundaries are found by scanning
+        the raw bytes for blank lines, and only the sentences that are parsed get decoded. read()
+        returns a copy of the sentence's bytes, which stays valid after the list is closed.
+    """
+    def __init__(
+        self,
+        source_path: T.Union[str, os.PathLike],
+        index: T.Optional[SentenceIndex] = None,
+        fields: T.Optional[T.Sequence[str]] = None,
+        field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None,
+        metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None,
+        strict_tabs: T.Optional[bool] = None,
+    ):
+        self._mmap: T.Optional[mmap.mmap] = None
+        with open(source_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size > 0:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if index is None:
+            index = SentenceIndex.from_buffer(self._mmap if self._mmap is not None else b"")
+
+        super().__init__(
+            source_path,
+            index=index,
+            fields=fields,
+            field_parsers=field_parsers,
+            metadata_parsers=metadata_parsers,
+            strict_tabs=strict_tabs,
+        )
+
+    def __repr__(self) -> str:
+        return f'MappedSentenceList<{self.source_path}, {len(self)} sentences>'
+
+    def read(self, i: int) -> bytes:
+        offset = self.sentence_index.offsets[i]
+        if self._mmap is None:
+            raise ValueError("MappedSentenceList is closed")
+
+        return self._mmap[offset:offset + self.sentence_index.lengths[i]]
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
@@ -0,0 +1,67 @@
+import typing as T
+
+DEFAULT_MAX_SIZE = 1_000_000
+
+# Numbers and lists of ids aren't worth interning
+UNINTERNED_FIELDS = ("id", "head", "deps")
+
+class InternTable:
+    """
+        Table of strings seen while parsing, so tokens share one object for every distinct value
+        instead of keeping a copy each. Once max_size strings are in the table, new ones are
+        passed through as they are. Share a table between parse calls to share values between them.
+    """
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.strings: T.Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __repr__(self) -> str:
+        return f'InternTable<{len(self.strings)} strings, hit rate {self.hit_rate:.1%}>'
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> T.Dict[str, T.Any]:
+        return {
+            "size": len(self.strings),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+    def intern(self, value: str) -> str:
+        interned = self.strings.get(value)
+        if interned is not None:
+            self.hits += 1
+            return interned
+
+        self.misses += 1
+        if len(self.strings) < self.max_size:
+            self.strings[value] = value
+
+        return value
+
+    def intern_value(self, value: T.Any) -> T.Any:
+        """
+            Intern a string, or the keys and string values of a dict, like parsed feats and misc.
+            Other values are returned unchanged.
+        """
+        if type(value) is str:
+            return self.intern(value)
+
+        if type(value) is dict:
+            intern = self.intern
+            return {
+                intern(key) if type(key) is str else key: intern(item) if type(item) is str else item
+                for key, item in value.items()
+            }
+
+        return value
@@ -2,12 +2,23 @@ import typing as T
 from collections import defaultdict
 from collections.abc import Mapping
 
+from conllu import query
+from conllu.arrays import DEFAULT_ARRAY_FIELDS, sentences_to_arrays, tokenlist_to_arrays
+from conllu.compact_tree import CompactTree
 from conllu.exceptions import ParseException
-from conllu.serializer import serialize
+from conllu.serializer import serialize, serialize_field
 
 DEFAULT_EXCLUDE_FIELDS = ('id', 'deprel', 'xpos', 'feats', 'head', 'deps', 'misc')
 
+# Placeholder for values of a LazyToken that haven't been parsed yet
+_NOT_PARSED = object()
+_IMMUTABLE_TYPES = (str, int, float, bool, tuple, type(None))
+
 if T.TYPE_CHECKING:
+    import numpy
+
+    from conllu.arrays import VocabularyProtocol
+
     class SupportsIndex(T.Protocol):
         def __index__(self) -> int:
             pass
@@ -48,6 +59,209 @@ class Token(dict):
 
         return ''
 
+class CompactToken(T.MutableMapping[str, T.Any]):
+    """
+        Token that keeps its values in a tuple, next to a tuple of field names that is shared by all
+        tokens parsed with the same fields, instead of in a dict of its own. Works like Token,
+        including the upostag/xpostag aliases, but takes less than half the memory. Changing a
+        value replaces the tuple, so it's best suited for tokens that are mostly read.
+    """
+    __slots__ = ("_fields", "_values")
+
+    MAPPING = Token.MAPPING
+
+    _fields: T.Tuple[str, ...]
+    _values: T.Tuple[T.Any, ...]
+
+    def __init__(self, data: T.Union[T.Mapping[str, T.Any], T.Iterable[T.Tuple[str, T.Any]]] = ()):
+        values = dict(data)
+        self._fields = tuple(values)
+        self._values = tuple(values.values())
+
+    @classmethod
+    def from_values(cls, fields: T.Tuple[str, ...], values: T.Tuple[T.Any, ...]) -> 'CompactToken':
+        # fields must not have duplicates and must be as long as values
+        token = cls.__new__(cls)
+        token._fields = fields
+        token._values = values
+        return token
+
+    def _value(self, i: int) -> T.Any:
+        return self._values[i]
+
+    def __getitem__(self, key: str) -> T.Any:
+        if key in self._fields:
+            return self._value(self._fields.index(key))
+
+        if key in self.MAPPING:
+            return self.get(self.MAPPING[key])
+
+        raise KeyError("'" + key + "'")
+
+    def get(self, key: str, default: T.Optional[T.Any] = None) -> T.Any:
+        if key not in self._fields and key in self.MAPPING:
+            key = self.MAPPING[key]
+
+        if key not in self._fields:
+            return default
+
+        return self._value(self._fields.index(key))
+
+    def __setitem__(self, key: str, value: T.Any) -> None:
+        if key in self._fields:
+            values = list(self._values)
+            values[self._fields.index(key)] = value
+            self._values = tuple(values)
+        else:
+            self._fields += (key,)
+            self._values += (value,)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._fields:
+            raise KeyError("'" + key + "'")
+
+        i = self._fields.index(key)
+        self._fields = self._fields[:i] + self._fields[i + 1:]
+        self._values = self._values[:i] + self._values[i + 1:]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    def __iter__(self) -> T.Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def __str__(self) -> str:
+        if 'form' in self:
+            return self['form']
+
+        if 'id' in self:
+            return f"id={self['id']}"
+
+        return ''
+
+    def __getstate__(self) -> T.Tuple[T.Tuple[str, ...], T.Tuple[T.Any, ...]]:
+        return self._fields, self._values
+
+    def __setstate__(self, state: T.Tuple[T.Tuple[str, ...], T.Tuple[T.Any, ...]]) -> None:
+        self._fields, self._values = state
+
+    def copy(self) -> 'CompactToken':
+        return self.from_values(self._fields, self._values)
+
+class LazyToken(CompactToken):
+    """
+        CompactToken that keeps the raw column strings of its line and only runs the parser of a
+        field the first time that field is read. Fields that were never read are serialized
+        straight from the raw strings. Errors in a field are raised when it's read, not when the
+        line is parsed.
+
+        Tokens from tab separated lines also keep the line itself. Until the token is changed, or
+        a field is read that could be changed in place, like feats, the line is serialized as is.
+    """
+    __slots__ = ("_raw", "_columns", "_line")
+
+    _values: T.Any
+    _raw: T.Optional[T.List[str]]
+    _line: T.Optional[str]
+    _columns: T.Tuple[T.Tuple[int, str, T.Optional[T.Callable[[T.List[str], int], T.Any]]], ...]
+
+    def __init__(self, data: T.Union[T.Mapping[str, T.Any], T.Iterable[T.Tuple[str, T.Any]]] = ()):
+        super().__init__(data)
+        self._raw = None
+        self._columns = ()
+        self._line = None
+
+    @classmethod
+    def from_line(cls, fields: T.Tuple[str, ...], line_split: T.List[str],
+                  columns: T.Tuple[T.Tuple[int, str, T.Optional[T.Callable[[T.List[str], int], T.Any]]], ...],
+                  line: T.Optional[str] = None,
+                  ) -> 'LazyToken':
+        # One column for each field, and fields must not have duplicates. line must be exactly the
+        # columns joined by tabs.
+        token = cls.__new__(cls)
+        token._fields = fields
+        token._values = [_NOT_PARSED] * len(columns)
+        token._raw = line_split
+        token._columns = columns
+        token._line = line
+        return token
+
+    @property
+    def raw_line(self) -> T.Optional[str]:
+        """
+            The line the token was parsed from, or None if the token might have changed since.
+        """
+        return self._line
+
+    def _value(self, i: int) -> T.Any:
+        value = self._values[i]
+        if value is _NOT_PARSED:
+            column, field, parser = self._columns[i]
+            assert self._raw is not None  # help mypy
+            if parser is None:
+                value = self._raw[column]
+            else:
+                try:
+                    value = parser(self._raw, column)
+                except ParseException as e:
+                    raise ParseException("Failed parsing field '{}': ".format(field) + str(e))
+
+                # Values like dicts and lists can be changed without the token knowing
+                if type(value) not in _IMMUTABLE_TYPES:
+                    self._line = None
+
+            self._values[i] = value
+
+        return value
+
+    def _parse_all(self) -> None:
+        self._values = tuple(self._value(i) for i in range(len(self._values)))
+        self._raw = None
+        self._line = None
+
+    def __setitem__(self, key: str, value: T.Any) -> None:
+        self._parse_all()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self._parse_all()
+        super().__delitem__(key)
+
+    def __reduce__(self) -> T.Tuple[T.Any, ...]:
+        # Field parsers are often lambdas that can't be pickled, so pickle the parsed values
+        return CompactToken.from_values, (self._fields, tuple(self._value(i) for i in range(len(self._values))))
+
+    def copy(self) -> 'LazyToken':
+        token = LazyToken.__new__(LazyToken)
+        token._fields = self._fields
+        token._values = list(self._values) if self._raw is not None else self._values
+        token._raw = self._raw
+        token._columns = self._columns
+        token._line = self._line
+        return token
+
+    def serialize_line(self) -> str:
+        if self._line is not None:
+            return self._line
+
+        return '\t'.join(self.serialize_values())
+
+    def serialize_values(self) -> T.List[str]:
+        if self._raw is None:
+            return [serialize_field(value) for value in self._values]
+
+        raw = self._raw
+        return [
+            raw[column] if value is _NOT_PARSED else serialize_field(value)
+            for (column, _, _), value in zip(self._columns, self._values)
+        ]
+
 class TokenList(T.List[Token]):
     def __init__(
         self,
@@ -60,7 +274,7 @@ class TokenList(T.List[Token]):
         if not isinstance(tokens, list):
             raise ParseException("Can't create TokenList, tokens is not a list.")
 
-        if len(tokens) > 0 and not isinstance(tokens[0], Token):
+        if len(tokens) > 0 and not isinstance(tokens[0], (Token, CompactToken)):
             tokens = [Token(token) for token in tokens]
 
         super(TokenList, self).__init__(tokens)
@@ -103,7 +317,7 @@ class TokenList(T.List[Token]):
         self.metadata.update(iterable.metadata)
 
     def _dict_to_token_and_set_defaults(self, token: T.Union[dict, Token]) -> Token:
-        if not isinstance(token, Token):
+        if not isinstance(token, (Token, CompactToken)):
             token = Token(token)
 
         if self.default_fields:
@@ -139,15 +353,31 @@ class TokenList(T.List[Token]):
     def serialize(self) -> str:
         return serialize(self)
 
+    def to_arrays(self, fields: T.Sequence[str] = DEFAULT_ARRAY_FIELDS,
+                  vocabularies: T.Optional[T.Dict[str, 'VocabularyProtocol']] = None,
+                  ) -> T.Dict[str, 'numpy.ndarray']:
+        return tokenlist_to_arrays(self, fields=fields, vocabularies=vocabularies)
+
     @staticmethod
     def head_to_token(sentence: 'TokenList') -> T.Dict[int, T.List[Token]]:
+        head_indexed = defaultdict(list)
+        for token in TokenList._tree_tokens(sentence):
+            head_indexed[token["head"]].append(token)
+
+        if len(head_indexed[0]) == 0:
+            raise ParseException("Found no head node, can't build tree")
+
+        return head_indexed
+
+    @staticmethod
+    def _tree_tokens(sentence: 'TokenList') -> T.List[Token]:
         if not sentence:
             raise ParseException("Can't parse tree, need a tokenlist as input.")
 
         if "head" not in sentence[0]:
             raise ParseException("Can't parse tree, missing 'head' field.")
 
-        head_indexed = defaultdict(list)
+        tokens = []
         for token in sentence:
             # Filter out range and decimal ID:s before building tree
             if "id" in token and not isinstance(token["id"], int):
@@ -156,51 +386,47 @@ class TokenList(T.List[Token]):
             # Filter out tokens with negative head, they are sometimes used to
             # specify tokens which should not be included in tree
             # Also filter out those that have no head, just exclude them from the tree.
-            if (token.get("head") is None) or token["head"] < 0:
+            head = token.get("head")
+            if head is None or head < 0:
                 continue
 
-            head_indexed[token["head"]].append(token)
-
-        if len(head_indexed[0]) == 0:
-            raise ParseException("Found no head node, can't build tree")
+            tokens.append(token)
 
-        return head_indexed
+        return tokens
 
     def to_tree(self) -> 'TokenTree':
-        def _create_tree(head_to_token_mapping: T.Dict[int, T.List[Token]], id_: int = 0) -> T.List['TokenTree']:
-            return [
-                TokenTree(child, _create_tree(head_to_token_mapping, child["id"]))
-                for child in head_to_token_mapping[id_]
-            ]
-
-        head_indexed = self.head_to_token(self)
-        if len(head_indexed[0]) > 1:
+        # Link every node to its head in one pass, without recursion, so deep trees work too.
+        # Nodes that can't be reached from the root are left out.
+        nodes = [TokenTree(token, []) for token in self._tree_tokens(self)]
+        nodes_by_id = {node.token["id"]: node for node in nodes}
+
+        roots = []
+        for node in nodes:
+            head = node.token["head"]
+            if head == 0:
+                roots.append(node)
+            else:
+                parent = nodes_by_id.get(head)
+                if parent is not None:
+                    parent.children.append(node)
+
+        if not roots:
+            raise ParseException("Found no head node, can't build tree")
+
+        if len(roots) > 1:
             # Introduce fake root node that multiple root nodes can have a single parent
-            head_indexed[-1] = [Token(
-                [("id", 0), ("form", "_"), ("deprel", "root")]
-            )]
-            root = _create_tree(head_indexed, -1)[0]
+            root = TokenTree(Token([("id", 0), ("form", "_"), ("deprel", "root")]), roots)
         else:
-            root = _create_tree(head_indexed, 0)[0]
+            root = roots[0]
 
         root.set_metadata(self.metadata)
         return root
 
-    def filter(self, **kwargs: T.Any) -> 'TokenList':
-        tokens = self.copy()
-
-        for query, value in kwargs.items():
-            filtered_tokens = []
-            for token in tokens:
-                if callable(value) and value(traverse_dict(token, query)) is True:
-                    filtered_tokens.append(token)
-                else:
-                    if traverse_dict(token, query) == value:
-                        filtered_tokens.append(token)
+    def to_compact_tree(self) -> CompactTree:
+        return CompactTree(self._tree_tokens(self), self.metadata)
 
-            tokens[:] = filtered_tokens
-
-        return tokens
+    def filter(self, **kwargs: T.Any) -> 'TokenList':
+        return query.compile(**kwargs).filter(self)
 
 
 _T = T.TypeVar("_T")
@@ -247,23 +473,18 @@ class TokenTree(object):
                 and self.metadata == other.metadata
         return False
 
-    def to_list(self):
-        def _to_list(root_token: TokenTree, token_list: T.List[Token] = []) -> T.List[Token]:
-            token_list.append(root_token.token)
-
-            for child_token in root_token.children:
-                _to_list(child_token, token_list)
-
-            return token_list
-
+    def to_list(self) -> TokenList:
         if not self.token or "id" not in self.token:
             raise ParseException("Could not flatten tree; missing 'id' field.")
 
-        token_list = _to_list(self)
-        token_list = sorted(token_list, key=lambda t: t['id'])
-        token_list = TokenList(token_list, self.metadata)
+        tokens = []
+        stack = [self]
+        while stack:
+            tree = stack.pop()
+            tokens.append(tree.token)
+            stack.extend(reversed(tree.children))
 
-        return token_list
+        return TokenList(_sort_by_id(tokens), self.metadata)
 
     def serialize(self) -> str:
         return serialize(self.to_list())
@@ -294,6 +515,19 @@ class TokenTree(object):
         for child in self.children:
             child.print_tree(depth=depth + 1, indent=indent, exclude_fields=exclude_fields)
 
+def _sort_by_id(tokens: T.List[Token]) -> T.List[Token]:
+    # Tree ids are usually 0 or 1 up to the number of tokens, so put each token straight into its
+    # place, and only sort when the ids aren't like that
+    ordered: T.List[T.Optional[Token]] = [None] * (len(tokens) + 1)
+    for token in tokens:
+        id_ = token["id"]
+        if type(id_) is not int or not 0 <= id_ <= len(tokens) or ordered[id_] is not None:
+            return sorted(tokens, key=lambda t: t['id'])
+
+        ordered[id_] = token
+
+    return [token for token in ordered if token is not None]
+
 class SentenceList(T.List[TokenList]):
     def __init__(
         self,
@@ -362,6 +596,12 @@ class SentenceList(T.List[TokenList]):
 
         self.metadata.update(iterable.metadata)
 
+    def to_arrays(self, fields: T.Sequence[str] = DEFAULT_ARRAY_FIELDS,
+                  vocabularies: T.Optional[T.Dict[str, 'VocabularyProtocol']] = None,
+                  padded: bool = True, pad_value: int = -1,
+                  ) -> T.Dict[str, 'numpy.ndarray']:
+        return sentences_to_arrays(self, fields=fields, vocabularies=vocabularies, padded=padded, pad_value=pad_value)
+
 
 class SentenceGenerator(T.Iterable[TokenList]):
     def __init__(
@@ -0,0 +1,186 @@
+import codecs
+import itertools
+import mmap
+import os
+import re
+import typing as T
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from io import StringIO
+
+from conllu.columnar import ColumnarSentenceList, _append_planned
+from conllu.parser import (
+    ParsePlan, _FieldParserType, _MetadataParserType, _plan_sentences, compile_parse_plan, detect_strict_tabs,
+    parse_global_columns, parse_sentence_lines,
+)
+
+_ChunkType = T.List[T.Tuple[T.Tuple[str, ...], bool, T.List[str], T.List[str]]]
+_RangeType = T.Tuple[int, int, T.Optional[T.Tuple[str, ...]]]
+
+DEFAULT_CHUNK_BYTES = 1 << 20
+
+BLANK_LINE = re.compile(rb"\n[^\S\n]*\n")
+GLOBAL_COLUMNS_LINE = re.compile(rb"^[^\S\n]*# global\.columns =.*$", re.MULTILINE)
+
+# Set in each worker process by _init_worker, so parsers are only sent once per process
+_worker_field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None
+_worker_metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None
+_worker_fields: T.Optional[T.Sequence[str]] = None
+
+def _init_worker(field_parsers: T.Optional[T.Dict[str, _FieldParserType]],
+                 metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]],
+                 fields: T.Optional[T.Sequence[str]] = None) -> None:
+    global _worker_field_parsers, _worker_metadata_parsers, _worker_fields
+    _worker_field_parsers = field_parsers
+    _worker_metadata_parsers = metadata_parsers
+    _worker_fields = fields
+
+def _parse_chunk(chunk: _ChunkType) -> ColumnarSentenceList:
+    # Plans can't be pickled since the default field parsers are lambdas, so workers rebuild them
+    plans: T.Dict[T.Tuple[T.Tuple[str, ...], bool], ParsePlan] = {}
+    planned = []
+    for fields, strict_tabs, comment_lines, token_lines in chunk:
+        plan = plans.get((fields, strict_tabs))
+        if plan is None:
+            plan = compile_parse_plan(fields, _worker_field_parsers, strict_tabs=strict_tabs)
+            plans[(fields, strict_tabs)] = plan
+
+        planned.append((plan, comment_lines, token_lines))
+
+    corpus = ColumnarSentenceList()
+    _append_planned(corpus, planned, _worker_metadata_parsers)
+    return corpus
+
+def _parse_range(source_path: str, start: int, end: int, global_fields: T.Optional[T.Tuple[str, ...]],
+                 strict_tabs: bool) -> ColumnarSentenceList:
+    # Workers read and split their own part of the file, so the parent only has to find where parts start
+    with open(source_path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    corpus = ColumnarSentenceList()
+    planned = _plan_sentences(
+        StringIO(text, newline=None), _worker_fields, _worker_field_parsers, strict_tabs, global_fields=global_fields,
+    )
+    _append_planned(corpus, planned, _worker_metadata_parsers)
+    return corpus
+
+def _source_path(in_file: T.TextIO) -> T.Optional[str]:
+    # Workers can only read the file themselves if it's a UTF-8 file on disk that hasn't been read from yet
+    name = getattr(in_file, "name", None)
+    encoding = getattr(in_file, "encoding", None)
+    if not isinstance(name, str) or not encoding or not os.path.isfile(name):
+        return None
+
+    try:
+        if codecs.lookup(encoding).name != "utf-8" or in_file.tell() != 0:
+            return None
+    except (LookupError, OSError, ValueError):
+        return None
+
+    return name
+
+def _file_ranges(source_path: str, chunk_bytes: int) -> T.List[_RangeType]:
+    """
+        Split a file into parts of about chunk_bytes that end on blank lines, with the columns of the
+        last global.columns header before each part.
+    """
+    with open(source_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            size = len(buffer)
+
+            # Only the first header in a sentence counts, so skip headers with no blank line in between
+            headers: T.List[T.Tuple[int, T.Tuple[str, ...]]] = []
+            for match in GLOBAL_COLUMNS_LINE.finditer(buffer):
+                if headers and not BLANK_LINE.search(buffer, headers[-1][0], match.start()):
+                    continue
+
+                fields = parse_global_columns([match.group().decode("utf-8").strip()])
+                if fields is not None:
+                    headers.append((match.start(), fields))
+
+            ranges: T.List[_RangeType] = []
+            start = 0
+            header = 0
+            global_fields: T.Optional[T.Tuple[str, ...]] = None
+            while start < size:
+                blank_line = BLANK_LINE.search(buffer, start + chunk_bytes) if start + chunk_bytes < size else None
+                end = blank_line.start() + 1 if blank_line else size
+                ranges.append((start, end, global_fields))
+
+                while header < len(headers) and headers[header][0] < end:
+                    global_fields = headers[header][1]
+                    header += 1
+
+                start = end
+
+    return ranges
+
+def _detect_file_strict_tabs(source_path: str) -> bool:
+    with open(source_path, "r", encoding="utf-8") as f:
+        for _, token_lines in parse_sentence_lines(f):
+            if token_lines:
+                return detect_strict_tabs(token_lines)
+
+    return False
+
+def _run_in_pool(tasks: T.Iterable[T.Tuple[T.Callable[..., T.Any], T.Tuple[T.Any, ...]]], workers: int,
+                 initargs: T.Tuple[T.Any, ...]) -> T.Iterator[T.Any]:
+    # Results come back in order, with at most two tasks per worker in flight
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+        pending: T.Deque[Future] = deque()
+        for function, args in tasks:
+            pending.append(executor.submit(function, *args))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+def _tasks(in_file: T.TextIO, fields: T.Optional[T.Sequence[str]],
+           field_parsers: T.Optional[T.Dict[str, _FieldParserType]],
+           strict_tabs: T.Optional[bool], chunk_size: int, chunk_bytes: T.Optional[int],
+           ) -> T.Iterator[T.Tuple[T.Callable[..., T.Any], T.Tuple[T.Any, ...]]]:
+    source_path = _source_path(in_file)
+    if source_path is not None:
+        if strict_tabs is None:
+            strict_tabs = _detect_file_strict_tabs(source_path)
+
+        for start, end, global_fields in _file_ranges(source_path, chunk_bytes or DEFAULT_CHUNK_BYTES):
+            yield _parse_range, (source_path, start, end, global_fields, strict_tabs)
+
+        return
+
+    items = (
+        (plan.fields, plan.strict_tabs, comment_lines, token_lines)
+        for plan, comment_lines, token_lines in _plan_sentences(in_file, fields, field_parsers, strict_tabs)
+    )
+    for chunk in iter(lambda: list(itertools.islice(items, chunk_size)), []):
+        yield _parse_chunk, (chunk,)
+
+def parse_columnar_parallel(in_file: T.TextIO, workers: int, fields: T.Optional[T.Sequence[str]] = None,
+                            field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None,
+                            metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None,
+                            strict_tabs: T.Optional[bool] = None,
+                            chunk_size: int = 500,
+                            chunk_bytes: T.Optional[int] = None,
+                            ) -> ColumnarSentenceList:
+    """
+        Parse sentences into columns in a pool of worker processes, keeping them in the original
+        order. When in_file is a UTF-8 file on disk that hasn't been read from, every worker reads
+        and parses parts of about chunk_bytes of it on its own. Other files are split into
+        sentences here, and sent to the workers in chunks of chunk_size sentences. Workers send
+        back their sentences as columns, which are much faster to send and merge than tokens.
+        Custom field_parsers and metadata_parsers must be picklable if the platform spawns new
+        processes.
+    """
+    tasks = _tasks(in_file, fields, field_parsers, strict_tabs, chunk_size, chunk_bytes)
+
+    corpus = ColumnarSentenceList()
+    for chunk in _run_in_pool(tasks, workers, (field_parsers, metadata_parsers, fields)):
+        corpus.extend(chunk)
+
+    return corpus
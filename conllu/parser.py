@@ -1,8 +1,13 @@
+import functools
+import importlib
+import os
 import re
 import typing as T
 
 from conllu.exceptions import ParseException
-from conllu.models import Metadata, Token, TokenList
+from conllu.intern import UNINTERNED_FIELDS, InternTable
+from conllu.models import CompactToken, LazyToken, Metadata, Token, TokenList
+from conllu.shared import SharedDict
 
 _IdType = T.Union[int, T.Tuple[int, str, int]]
 _FieldParserType = T.Callable[[T.List[str], int], T.Any]
@@ -10,18 +15,36 @@ _MetadataParserType = T.Callable[[str, T.Optional[str]], T.Any]
 
 DEFAULT_FIELDS = ('id', 'form', 'lemma', 'upos', 'xpos', 'feats', 'head', 'deprel', 'deps', 'misc')
 DEFAULT_FIELD_PARSERS: T.Dict[str, _FieldParserType] = {
-    "id": lambda line, i: parse_id_value(line[i]),
+    "id": lambda line, i: _cached_parsers["id"](line[i]),
     "xpos": lambda line, i: parse_nullable_value(line[i]),
-    "feats": lambda line, i: parse_dict_value(line[i]),
-    "head": lambda line, i: parse_int_value(line[i]),
-    "deps": lambda line, i: parse_paired_list_value(line[i]),
-    "misc": lambda line, i: parse_dict_value(line[i]),
+    "feats": lambda line, i: _cached_parsers["feats"](line[i]),
+    "head": lambda line, i: _cached_parsers["head"](line[i]),
+    "deps": lambda line, i: _cached_parsers["deps"](line[i]),
+    "misc": lambda line, i: _cached_parsers["misc"](line[i]),
 }
 DEFAULT_METADATA_PARSERS: T.Dict[str, _MetadataParserType] = {
     "newpar": lambda key, value: (key, value),
     "newdoc": lambda key, value: (key, value),
 }
 
+COLUMN_SEPARATOR = re.compile(r"\t| {2,}")
+
+# Most distinct values per field that shared_fields keeps a dict for
+MAX_SHARED_VALUES = 10_000
+
+def _load_speedups() -> T.Any:
+    # Set CONLLU_PURE_PYTHON to use the pure Python parser even when the compiled one is built
+    if os.environ.get("CONLLU_PURE_PYTHON"):
+        return None
+
+    try:
+        return importlib.import_module("conllu._speedups")
+    except ImportError:
+        return None
+
+
+_speedups = _load_speedups()
+
 def parse_sentences(in_file: T.TextIO) -> T.Iterator[str]:
     buf: T.List[str] = []
     for line in in_file:
@@ -35,25 +58,325 @@ def parse_sentences(in_file: T.TextIO) -> T.Iterator[str]:
     if buf:
         yield "".join(buf).rstrip()
 
+class ParsePlan(T.NamedTuple):
+    """
+        Field parsers resolved against a list of fields. Build it once with compile_parse_plan()
+        and reuse it for every line that shares the same fields. columns only holds the columns
+        that end up in tokens, and token_fields their names. native plans parse tokens with the
+        compiled parser in conllu._speedups, which gives the same tokens as the field parsers.
+    """
+    fields: T.Tuple[str, ...]
+    columns: T.Tuple[T.Tuple[int, str, T.Optional[_FieldParserType]], ...]
+    strict_tabs: bool = False
+    compact: bool = False
+    lazy: bool = False
+    token_fields: T.Tuple[str, ...] = ()
+    native: bool = False
+
+    def parse_line(self, line: str) -> Token:
+        if self.native:
+            return _speedups.parse_token_line(line, self.strict_tabs, Token)
+
+        return Token(self.parse_values(line))
+
+    def parse_compact_line(self, line: str) -> CompactToken:
+        values = dict(self.parse_values(line))
+        fields = tuple(values)
+
+        # Share the fields tuple between all tokens that have exactly the planned fields
+        token_fields = self.token_fields
+        return CompactToken.from_values(token_fields if fields == token_fields else fields, tuple(values.values()))
+
+    def parse_lazy_line(self, line: str) -> LazyToken:
+        line_split = self.split_line(line)
+        columns = self.columns
+        fields = self.token_fields
+        num_values = len(line_split)
+
+        # Leave out the columns that are missing from short lines
+        if columns and columns[-1][0] >= num_values:
+            columns = tuple(column for column in columns if column[0] < num_values)
+            fields = tuple(field for _, field, _ in columns)
+
+        # Keep the line for serializing if it holds exactly the token's columns, separated by tabs
+        if num_values == len(columns) == len(self.fields) and '  ' not in line:
+            return LazyToken.from_line(fields, line_split, columns, line)
+
+        return LazyToken.from_line(fields, line_split, columns)
+
+    def split_line(self, line: str) -> T.List[str]:
+        # Strictly tab separated files only need the regex for lines without any tabs
+        if self.strict_tabs and '\t' in line:
+            line_split = line.split('\t')
+        else:
+            line_split = COLUMN_SEPARATOR.split(line)
+
+        if len(line_split) == 1:
+            raise ParseException("Invalid line format, line must contain either tabs or two spaces.")
+
+        return line_split
+
+    def parse_values(self, line: str) -> T.List[T.Tuple[str, T.Any]]:
+        line_split = self.split_line(line)
+        values = []
+        num_values = len(line_split)
+
+        for i, field, parser in self.columns:
+            # Allow parsing CoNNL-U files with fewer columns
+            if i >= num_values:
+                break
+
+            if parser is None:
+                values.append((field, line_split[i]))
+                continue
+
+            try:
+                values.append((field, parser(line_split, i)))
+            except ParseException as e:
+                raise ParseException("Failed parsing field '{}': ".format(field) + str(e))
+
+        return values
+
+def compile_parse_plan(fields: T.Optional[T.Sequence[str]] = None,
+                       field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None,
+                       strict_tabs: bool = False,
+                       compact: bool = False,
+                       lazy: bool = False,
+                       columns: T.Optional[T.Iterable[str]] = None,
+                       intern: T.Optional[InternTable] = None,
+                       shared_fields: T.Optional[T.Iterable[str]] = None,
+                       ) -> ParsePlan:
+    if field_parsers:
+        field_parsers = {**DEFAULT_FIELD_PARSERS, **field_parsers}
+    else:
+        field_parsers = DEFAULT_FIELD_PARSERS
+
+    return _bind_field_parsers(fields or DEFAULT_FIELDS, field_parsers, strict_tabs, compact, lazy, columns, intern,
+                               shared_fields)
+
+def detect_strict_tabs(token_lines: T.Iterable[str]) -> bool:
+    return all('\t' in line and '  ' not in line for line in token_lines)
+
+def _bind_field_parsers(fields: T.Sequence[str], field_parsers: T.Dict[str, _FieldParserType],
+                        strict_tabs: bool = False, compact: bool = False, lazy: bool = False,
+                        selected_fields: T.Optional[T.Iterable[str]] = None,
+                        intern: T.Optional[InternTable] = None,
+                        shared_fields: T.Optional[T.Iterable[str]] = None) -> ParsePlan:
+    selected = None if selected_fields is None else set(selected_fields)
+    shared = set(shared_fields or ())
+
+    columns = []
+    for i, field in enumerate(fields):
+        # Only keep the selected fields, under either name for xpos/upos
+        if selected is not None and field not in selected and Token.MAPPING.get(field) not in selected:
+            continue
+
+        parser = field_parsers.get(field)
+
+        # Support xpostag/upostag as aliases for xpos/upos (both ways)
+        if parser is None and field in Token.MAPPING:
+            parser = field_parsers.get(Token.MAPPING[field])
+
+        if parser is not None and field in shared:
+            parser = _sharing_parser(parser)
+
+        if intern is not None and field not in UNINTERNED_FIELDS:
+            parser = _interning_parser(parser, intern)
+
+        columns.append((i, str(field), parser))
+
+    fields = tuple(fields)
+    token_fields = fields if selected is None else tuple(field for _, field, _ in columns)
+
+    # Lazy tokens keep one value per column, so repeated fields fall back to compact tokens
+    compact = compact or lazy
+    lazy = lazy and len(set(token_fields)) == len(token_fields)
+
+    # The compiled parser only knows the default fields and field parsers, and plain tokens
+    native = (
+        _speedups is not None and fields == DEFAULT_FIELDS and field_parsers is DEFAULT_FIELD_PARSERS
+        and selected is None and intern is None and not shared and not compact
+    )
+
+    return ParsePlan(fields, tuple(columns), strict_tabs, compact, lazy, token_fields, native)
+
+def _sharing_parser(parser: _FieldParserType) -> _FieldParserType:
+    # Parse every distinct string once, and give each token a copy-on-write view of the same dict
+    shared_values: T.Dict[str, T.Dict[str, T.Any]] = {}
+
+    def parse_shared(line: T.List[str], i: int) -> T.Any:
+        shared_value = shared_values.get(line[i])
+        if shared_value is not None:
+            return SharedDict.shared(shared_value)
+
+        value = parser(line, i)
+        if type(value) is not dict or len(shared_values) >= MAX_SHARED_VALUES:
+            return value
+
+        shared_values[line[i]] = value
+        return SharedDict.shared(value)
+
+    return parse_shared
+
+def _interning_parser(parser: T.Optional[_FieldParserType], table: InternTable) -> _FieldParserType:
+    if parser is None:
+        intern = table.intern
+        return lambda line, i: intern(line[i])
+
+    field_parser = parser
+    intern_value = table.intern_value
+    return lambda line, i: intern_value(field_parser(line, i))
+
+def parse_sentence_lines(in_file: T.TextIO) -> T.Iterator[T.Tuple[T.List[str], T.List[str]]]:
+    comment_lines: T.List[str] = []
+    token_lines: T.List[str] = []
+    for line in in_file:
+        line = line.strip()
+        if not line:
+            if not token_lines and not comment_lines:
+                continue
+            yield comment_lines, token_lines
+            comment_lines = []
+            token_lines = []
+        elif line[0] == '#':
+            comment_lines.append(line)
+        else:
+            token_lines.append(line)
+    if token_lines or comment_lines:
+        yield comment_lines, token_lines
+
+def _plan_sentences(in_file: T.TextIO, fields: T.Optional[T.Sequence[str]] = None,
+                    field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None,
+                    strict_tabs: T.Optional[bool] = None,
+                    compact: bool = False,
+                    lazy: bool = False,
+                    columns: T.Optional[T.Iterable[str]] = None,
+                    intern: T.Union[bool, InternTable] = False,
+                    shared_fields: T.Optional[T.Iterable[str]] = None,
+                    global_fields: T.Optional[T.Tuple[str, ...]] = None,
+                    ) -> T.Iterator[T.Tuple[ParsePlan, T.List[str], T.List[str]]]:
+    # global_fields are the columns of a global.columns header before the start of in_file
+    columns = None if columns is None else tuple(columns)
+    shared_fields = None if shared_fields is None else tuple(shared_fields)
+    table = _intern_table(intern)
+    default_plan = compile_parse_plan([field.lower() for field in (fields if fields else DEFAULT_FIELDS)],
+                                      field_parsers, strict_tabs=bool(strict_tabs), compact=compact, lazy=lazy,
+                                      columns=columns, intern=table, shared_fields=shared_fields)
+    plan = default_plan
+    if global_fields:
+        plan = compile_parse_plan(global_fields, field_parsers, strict_tabs=bool(strict_tabs), compact=compact,
+                                  lazy=lazy, columns=columns, intern=table, shared_fields=shared_fields)
+    detect_tabs = strict_tabs is None
+
+    for comment_lines, token_lines in parse_sentence_lines(in_file):
+        # Unless told otherwise, look at the first sentence to decide if the file is strictly tab separated
+        if detect_tabs and token_lines:
+            # A global.columns header in an earlier sentence may already have replaced the plan
+            is_default = plan is default_plan
+            tabs = detect_strict_tabs(token_lines)
+            default_plan = default_plan._replace(strict_tabs=tabs)
+            plan = default_plan if is_default else plan._replace(strict_tabs=tabs)
+            detect_tabs = False
+
+        global_fields = parse_global_columns(comment_lines)
+        if global_fields is not None:
+            # Only rebuild the plan when the columns actually change, an empty header resets them
+            if not global_fields:
+                plan = default_plan
+            elif global_fields != plan.fields:
+                plan = compile_parse_plan(global_fields, field_parsers, strict_tabs=default_plan.strict_tabs,
+                                          compact=compact, lazy=lazy, columns=columns, intern=table,
+                                          shared_fields=shared_fields)
+
+        yield plan, comment_lines, token_lines
+
+def _intern_table(intern: T.Union[bool, InternTable, None]) -> T.Optional[InternTable]:
+    # True gives every parse call a table of its own, a table passed in is shared between calls
+    if isinstance(intern, InternTable):
+        return intern
+
+    return InternTable() if intern else None
+
+def parse_global_columns(comment_lines: T.Iterable[str]) -> T.Optional[T.Tuple[str, ...]]:
+    for line in comment_lines:
+        if line.startswith('# global.columns = ') or line == '# global.columns =':
+            return tuple(field.lower() for field in line.split('=', 1)[1].split())
+
+    return None
+
+def _filter_sentences(planned: T.Iterable[T.Tuple[ParsePlan, T.List[str], T.List[str]]],
+                      metadata_filter: T.Optional[T.Dict[str, T.Any]] = None,
+                      token_filter: T.Optional[T.Dict[str, T.Any]] = None,
+                      metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None,
+                      ) -> T.Iterator[T.Tuple[ParsePlan, T.List[str], T.List[str]]]:
+    """
+        Only keep sentences where all of metadata_filter match the metadata, and at least one token
+        matches all of token_filter. Token values are compared with the raw column strings, before
+        any field parser runs. Like in TokenList.filter(), a value can also be a function that
+        returns True for matching values.
+    """
+    metadata_filter = metadata_filter or {}
+    token_filter = token_filter or {}
+
+    # Plain strings that must be somewhere on a line, used to skip lines without splitting them
+    required_strings = [value for value in token_filter.values() if isinstance(value, str) and value]
+
+    positions: T.Dict[T.Tuple[str, ...], T.List[T.Tuple[int, T.Any]]] = {}
+    for plan, comment_lines, token_lines in planned:
+        if token_filter:
+            filter_positions = positions.get(plan.fields)
+            if filter_positions is None:
+                filter_positions = positions[plan.fields] = [
+                    (_field_position(plan.fields, field), value) for field, value in token_filter.items()
+                ]
+
+            if not any(
+                _matches_raw_line(plan.split_line(line), filter_positions)
+                for line in token_lines
+                if all(string in line for string in required_strings)
+            ):
+                continue
+
+        if metadata_filter:
+            metadata = parse_metadata_lines(comment_lines, metadata_parsers)
+            if not all(_matches(metadata.get(key), value) for key, value in metadata_filter.items()):
+                continue
+
+        yield plan, comment_lines, token_lines
+
+def _field_position(fields: T.Tuple[str, ...], field: str) -> int:
+    if field not in fields and field in Token.MAPPING:
+        field = Token.MAPPING[field]
+
+    return fields.index(field) if field in fields else len(fields)
+
+def _matches_raw_line(line_split: T.List[str], filter_positions: T.List[T.Tuple[int, T.Any]]) -> bool:
+    return all(
+        _matches(line_split[i] if i < len(line_split) else None, value)
+        for i, value in filter_positions
+    )
+
+def _matches(actual: T.Any, value: T.Any) -> bool:
+    if callable(value):
+        return value(actual) is True
+
+    return actual == value
+
 def parse_token_and_metadata(data: str, fields: T.Optional[T.Sequence[str]] = None,
                              field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None,
-                             metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None
+                             metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None,
+                             plan: T.Optional[ParsePlan] = None,
+                             columns: T.Optional[T.Iterable[str]] = None,
                              ) -> TokenList:
 
     if not data:
         raise ParseException("Can't create TokenList, no data sent to constructor.")
 
-    fields = fields or DEFAULT_FIELDS
-
-    if not field_parsers:
-        field_parsers = DEFAULT_FIELD_PARSERS.copy()
-    elif sorted(field_parsers.keys()) != sorted(fields):
-        new_field_parsers = DEFAULT_FIELD_PARSERS.copy()
-        new_field_parsers.update(field_parsers)
-        field_parsers = new_field_parsers
+    if plan is None:
+        plan = compile_parse_plan(fields, field_parsers, columns=columns)
 
-    tokens = []
-    metadata = Metadata()
+    comment_lines = []
+    token_lines = []
 
     for line in data.split('\n'):
         line = line.strip()
@@ -61,56 +384,44 @@ def parse_token_and_metadata(data: str, fields: T.Optional[T.Sequence[str]] = No
         if not line:
             continue
 
-        if line.startswith('#'):
-            pairs = parse_comment_line(line, metadata_parsers=metadata_parsers)
-            for key, value in pairs:
-                metadata[key] = value
+        if line[0] == '#':
+            comment_lines.append(line)
         else:
-            tokens.append(parse_line(line, fields, field_parsers))
-
-    return TokenList(tokens, metadata, default_fields=fields)
-
-def parse_line(line: str,
-               fields: T.Sequence[str], field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None
-               ) -> Token:
-    # Be backwards compatible if people called parse_line without field_parsers before
-    field_parsers = field_parsers or DEFAULT_FIELD_PARSERS
-
-    # Support xpostag/upostag as aliases for xpos/upos (both ways)
-    if "xpostag" not in field_parsers and "xpos" in field_parsers:
-        field_parsers["xpostag"] = field_parsers["xpos"]
-    if "xpos" not in field_parsers and "xpostag" in field_parsers:
-        field_parsers["xpos"] = field_parsers["xpostag"]
-
-    if "upostag" not in field_parsers and "upos" in field_parsers:
-        field_parsers["upostag"] = field_parsers["upos"]
-    if "upos" not in field_parsers and "upostag" in field_parsers:
-        field_parsers["upos"] = field_parsers["upostag"]
+            token_lines.append(line)
 
-    line_split = re.split(r"\t| {2,}", line)
+    return parse_lines(comment_lines, token_lines, plan, metadata_parsers)
 
-    if len(line_split) == 1:
-        raise ParseException("Invalid line format, line must contain either tabs or two spaces.")
+def parse_lines(comment_lines: T.Iterable[str], token_lines: T.Iterable[str], plan: ParsePlan,
+                metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None) -> TokenList:
+    metadata = parse_metadata_lines(comment_lines, metadata_parsers)
+    if plan.native:
+        tokens = _speedups.parse_token_lines(token_lines, plan.strict_tabs, Token)
+        return TokenList(tokens, metadata, default_fields=plan.token_fields)
 
-    data = Token()
+    parse_line: T.Callable[[str], T.Any] = plan.parse_line
+    if plan.lazy:
+        parse_line = plan.parse_lazy_line
+    elif plan.compact:
+        parse_line = plan.parse_compact_line
 
-    for i, field in enumerate(fields):
-        # Allow parsing CoNNL-U files with fewer columns
-        if i >= len(line_split):
-            break
+    return TokenList([parse_line(line) for line in token_lines], metadata, default_fields=plan.token_fields)
 
-        if field in field_parsers:
-            try:
-                value = field_parsers[field](line_split, i)
-            except ParseException as e:
-                raise ParseException("Failed parsing field '{}': ".format(field) + str(e))
+def parse_metadata_lines(comment_lines: T.Iterable[str],
+                         metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None) -> Metadata:
+    metadata_parsers = _merge_metadata_parsers(metadata_parsers)
 
-        else:
-            value = line_split[i]
+    metadata = Metadata()
+    for line in comment_lines:
+        for key, value in _parse_comment(line, metadata_parsers):
+            metadata[key] = value
 
-        data[str(field)] = value
+    return metadata
 
-    return data
+def parse_line(line: str,
+               fields: T.Sequence[str], field_parsers: T.Optional[T.Dict[str, _FieldParserType]] = None
+               ) -> Token:
+    # Be backwards compatible if people called parse_line without field_parsers before
+    return _bind_field_parsers(fields, field_parsers or DEFAULT_FIELD_PARSERS).parse_line(line)
 
 def parse_comment_line(line: str,
                        metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]] = None
@@ -120,14 +431,18 @@ def parse_comment_line(line: str,
     if line[0] != '#':
         raise ParseException("Invalid comment format, comment must start with '#'")
 
-    key, value = parse_pair_value(line[1:])
+    return _parse_comment(line, _merge_metadata_parsers(metadata_parsers))
 
+def _merge_metadata_parsers(metadata_parsers: T.Optional[T.Dict[str, _MetadataParserType]]
+                            ) -> T.Dict[str, _MetadataParserType]:
     if not metadata_parsers:
-        metadata_parsers = DEFAULT_METADATA_PARSERS.copy()
-    else:
-        new_metadata_parsers = DEFAULT_METADATA_PARSERS.copy()
-        new_metadata_parsers.update(metadata_parsers)
-        metadata_parsers = new_metadata_parsers
+        return DEFAULT_METADATA_PARSERS
+
+    return {**DEFAULT_METADATA_PARSERS, **metadata_parsers}
+
+def _parse_comment(line: str, metadata_parsers: T.Dict[str, _MetadataParserType]
+                   ) -> T.List[T.Tuple[str, T.Optional[str]]]:
+    key, value = parse_pair_value(line[1:])
 
     custom_result = None
     if key in metadata_parsers:
@@ -162,11 +477,20 @@ def parse_int_value(value: str) -> T.Optional[int]:
     if value == '_':
         return None
 
-    if re.fullmatch(INTEGER, value):
+    # Same as matching INTEGER
+    digits = value[1:] if value[:1] == "-" else value
+    if _is_number(digits) and (digits[0] != "0" or value == "0"):
         return int(value)
     else:
         raise ParseException("'{}' is not a valid value for parse_int_value.".format(value))
 
+def _is_number(value: str) -> bool:
+    # isdigit() alone also accepts digits from other scripts, which int() may not understand
+    return value.isdigit() and value.isascii()
+
+def _is_positive_number(value: str) -> bool:
+    return _is_number(value) and value[0] != "0"
+
 
 ID_SINGLE = re.compile(r"(?:0|[1-9][0-9]*)")
 ID_RANGE = re.compile(r"[1-9][0-9]*\-[1-9][0-9]*")
@@ -176,33 +500,58 @@ def parse_id_value(value: str) -> T.Optional[_IdType]:
     if not value or value == '_':
         return None
 
-    if re.fullmatch(ID_SINGLE, value):
-        return int(value)
+    # Same as matching ID_SINGLE, ID_RANGE and ID_DOT_ID, but splitting the value only once
+    if _is_number(value):
+        if value[0] != "0" or value == "0":
+            return int(value)
 
-    elif re.fullmatch(ID_RANGE, value):
-        from_str, to_str = value.split("-")
-        from_, to = int(from_str), int(to_str)
-        if to >= from_:
-            return (int(from_), "-", int(to))
+    elif "-" in value:
+        from_str, _, to_str = value.partition("-")
+        if _is_positive_number(from_str) and _is_positive_number(to_str):
+            from_, to = int(from_str), int(to_str)
+            if to >= from_:
+                return (from_, "-", to)
 
-    elif re.fullmatch(ID_DOT_ID, value):
-        return (int(value.split(".")[0]), ".", int(value.split(".")[1]))
+    elif "." in value:
+        before, _, after = value.partition(".")
+        if _is_number(before) and _is_positive_number(after):
+            return (int(before), ".", int(after))
 
     raise ParseException("'{}' is not a valid ID.".format(value))
 
+def _is_any_id(value: str) -> bool:
+    # Same as matching ANY_ID, which doesn't check that ranges go upwards
+    if _is_number(value):
+        return value[0] != "0" or value == "0"
+
+    if "-" in value:
+        from_str, _, to_str = value.partition("-")
+        return _is_positive_number(from_str) and _is_positive_number(to_str)
+
+    before, _, after = value.partition(".")
+    return _is_number(before) and _is_positive_number(after)
+
 
 ANY_ID = re.compile(ID_SINGLE.pattern + "|" + ID_RANGE.pattern + "|" + ID_DOT_ID.pattern)
 DEPS_RE = re.compile("(" + ANY_ID.pattern + r")(:[^\d:_\-|][^:|]*)+")
 MULTI_DEPS_PATTERN = re.compile(r"{}(\|{})*".format(DEPS_RE.pattern, DEPS_RE.pattern))
 
 def parse_paired_list_value(value: str) -> T.Union[T.Optional[str], T.List[T.Tuple[str, T.Optional[_IdType]]]]:
-    if re.fullmatch(MULTI_DEPS_PATTERN, value):
-        return [
-            (part.split(":", 1)[1], parse_id_value(part.split(":")[0]))
-            for part in value.split("|")
-        ]
+    # Same as matching MULTI_DEPS_PATTERN: every part is an id followed by one or more
+    # ":relation" segments that don't start with a digit, "_" or "-"
+    pairs = []
+    for part in value.split("|"):
+        id_, _, relation = part.partition(":")
+        if not relation or not _is_any_id(id_):
+            return parse_nullable_value(value)
 
-    return parse_nullable_value(value)
+        for segment in relation.split(":"):
+            if not segment or segment[0] in "_-" or segment[0].isdecimal():
+                return parse_nullable_value(value)
+
+        pairs.append((relation, id_))
+
+    return [(relation, parse_id_value(id_)) for relation, id_ in pairs]
 
 def parse_dict_value(value: str) -> T.Optional[T.Dict[str, T.Optional[str]]]:
     if parse_nullable_value(value) is None:
@@ -219,6 +568,61 @@ def parse_nullable_value(value: str) -> T.Optional[str]:
 
     return value
 
+
+DEFAULT_CACHE_SIZE = 4096
+
+# Values of these fields repeat a lot, so the default field parsers remember the last values they parsed
+_CACHED_VALUE_PARSERS: T.Dict[str, T.Callable[[str], T.Any]] = {
+    "id": parse_id_value,
+    "head": parse_int_value,
+    "deps": parse_paired_list_value,
+    "feats": parse_dict_value,
+    "misc": parse_dict_value,
+}
+_cached_parsers: T.Dict[str, T.Callable[[str], T.Any]] = {}
+_value_caches: T.Dict[str, T.Any] = {}
+
+def set_parse_cache_size(max_size: int = DEFAULT_CACHE_SIZE) -> None:
+    """
+        Set how many distinct raw values the default id, head, deps, feats and misc parsers each
+        remember, least recently used first out. 0 turns the caches off. Custom field_parsers, and
+        plans that use the compiled parser, never use the caches.
+    """
+    _cached_parsers.clear()
+    _value_caches.clear()
+    for field, parser in _CACHED_VALUE_PARSERS.items():
+        if max_size > 0:
+            cache = _value_caches[field] = functools.lru_cache(maxsize=max_size)(parser)
+            parser = _copying_parser(cache)
+
+        _cached_parsers[field] = parser
+
+def parse_cache_info() -> T.Dict[str, T.Dict[str, int]]:
+    """
+        Hits, misses, size and max_size of the cache of every field, empty when caching is off.
+    """
+    info = {}
+    for field, cache in _value_caches.items():
+        hits, misses, max_size, size = cache.cache_info()
+        info[field] = {"hits": hits, "misses": misses, "size": size, "max_size": max_size}
+
+    return info
+
+def _copying_parser(cached_parser: T.Callable[[str], T.Any]) -> T.Callable[[str], T.Any]:
+    # Cached lists and dicts are shared between calls, so every token gets a copy of its own
+    def parse_value(value: str) -> T.Any:
+        parsed = cached_parser(value)
+        value_type = type(parsed)
+        if value_type is dict or value_type is list:
+            return value_type(parsed)
+
+        return parsed
+
+    return parse_value
+
+
+set_parse_cache_size()
+
 # DEPRECATED: Mantain old paths until next major version
 def serialize(tokenlist: TokenList) -> str:
     from conllu.serializer import serialize as new_serialize
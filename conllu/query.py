@@ -0,0 +1,102 @@
+import typing as T
+from collections.abc import Mapping
+
+if T.TYPE_CHECKING:
+    from conllu.models import TokenList
+
+_MatchType = T.Callable[[T.Mapping[str, T.Any]], bool]
+
+class Query:
+    """
+        A compiled token filter. Combine queries with & (and), | (or) and ~ (not), then use them on
+        single tokens, on a TokenList or on a whole stream of sentences.
+    """
+    def __init__(self, match: _MatchType):
+        self.match = match
+
+    def __call__(self, token: T.Mapping[str, T.Any]) -> bool:
+        return self.match(token)
+
+    def __and__(self, other: 'Query') -> 'Query':
+        first, second = self.match, other.match
+        return Query(lambda token: first(token) and second(token))
+
+    def __or__(self, other: 'Query') -> 'Query':
+        first, second = self.match, other.match
+        return Query(lambda token: first(token) or second(token))
+
+    def __invert__(self) -> 'Query':
+        match = self.match
+        return Query(lambda token: not match(token))
+
+    def filter(self, tokenlist: 'TokenList') -> 'TokenList':
+        match = self.match
+        return type(tokenlist)(
+            [token for token in tokenlist if match(token)],
+            tokenlist.metadata,
+            tokenlist.default_fields,
+        )
+
+    def sentences(self, sentences: T.Iterable['TokenList']) -> T.Iterator['TokenList']:
+        # Sentences with at least one matching token
+        match = self.match
+        for sentence in sentences:
+            if any(match(token) for token in sentence):
+                yield sentence
+
+    def tokens(self, sentences: T.Iterable['TokenList']
+               ) -> T.Iterator[T.Tuple['TokenList', T.Mapping[str, T.Any]]]:
+        match = self.match
+        for sentence in sentences:
+            for token in sentence:
+                if match(token):
+                    yield sentence, token
+
+def compile(**kwargs: T.Any) -> Query:
+    """
+        Build a Query that matches tokens where all the keyword arguments match, like
+        TokenList.filter(). Keys can point into nested values with '__', like feats__Number, and
+        values can be functions that return True for matching values.
+    """
+    matches = [_compile_condition(key, value) for key, value in kwargs.items()]
+
+    if not matches:
+        return Query(lambda token: True)
+
+    if len(matches) == 1:
+        return Query(matches[0])
+
+    return Query(lambda token: all(match(token) for match in matches))
+
+def _compile_condition(key: str, value: T.Any) -> _MatchType:
+    path = key.split('__')
+    get_value = _compile_path(path)
+
+    if callable(value):
+        return lambda token: value(get_value(token)) is True
+
+    # The most common case, a single field compared with a value
+    if len(path) == 1:
+        field = path[0]
+        return lambda token: token.get(field) == value
+
+    return lambda token: get_value(token) == value
+
+def _compile_path(path: T.List[str]) -> T.Callable[[T.Mapping[str, T.Any]], T.Any]:
+    if len(path) == 1:
+        field = path[0]
+        return lambda token: token.get(field)
+
+    def get_value(token: T.Mapping[str, T.Any]) -> T.Any:
+        value: T.Any = token
+        for name in path:
+            if not isinstance(value, Mapping):
+                return None
+
+            value = value.get(name)
+            if value is None:
+                return None
+
+        return value
+
+    return get_value
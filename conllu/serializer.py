@@ -1,6 +1,8 @@
+import io
 import typing as T
 
 from conllu.exceptions import ParseException
+from conllu.shared import SharedDict
 
 if T.TYPE_CHECKING:
     from conllu.models import TokenList
@@ -10,39 +12,79 @@ SERIALIZABLE_TERMINAL_VALUE_TYPES = (int, float, bool, str)
 
 
 def serialize_field(field: T.Any) -> str:
-    if field is None:
-        return '_'
-
-    if isinstance(field, dict):
-        if field == {}:
-            return '_'
-
-        fields = []
-        for key, value in field.items():
-            if value is None:
-                value = "_"
-            if value == "":
-                fields.append(key)
-                continue
-            if isinstance(value, SERIALIZABLE_TERMINAL_VALUE_TYPES):
-                fields.append(f'{key}={value}')
-                continue
-            else:
-                value_type = type(value)
-                raise TypeError(f"Received non-serializable field value of type {value_type}:\n{value}")
+    # Look up the exact type first, the isinstance checks below handle subclasses
+    serializer = FIELD_SERIALIZERS.get(type(field))
+    if serializer is not None:
+        return serializer(field)
 
-        return '|'.join(fields)
+    if isinstance(field, (dict, SharedDict)):
+        return _serialize_dict(field)
 
     if isinstance(field, tuple):
-        return "".join([serialize_field(item) for item in field])
+        return _serialize_tuple(field)
 
     if isinstance(field, list):
-        if len(field[0]) != 2:
-            raise ParseException("Can't serialize '{}', invalid format".format(field))
-        return "|".join([serialize_field(value) + ":" + str(key) for key, value in field])
+        return _serialize_list(field)
 
     return "{}".format(field)
 
+def _serialize_none(field: None) -> str:
+    return '_'
+
+def _serialize_dict(field: T.Mapping[str, T.Any]) -> str:
+    if not field:
+        return '_'
+
+    fields = []
+    for key, value in field.items():
+        if type(value) is str:
+            fields.append(f'{key}={value}' if value else key)
+            continue
+        if value is None:
+            fields.append(f'{key}=_')
+            continue
+        if value == "":
+            fields.append(key)
+            continue
+        if isinstance(value, SERIALIZABLE_TERMINAL_VALUE_TYPES):
+            fields.append(f'{key}={value}')
+            continue
+        else:
+            value_type = type(value)
+            raise TypeError(f"Received non-serializable field value of type {value_type}:\n{value}")
+
+    return '|'.join(fields)
+
+def _serialize_tuple(field: tuple) -> str:
+    return "".join([serialize_field(item) for item in field])
+
+def _serialize_list(field: list) -> str:
+    if len(field[0]) != 2:
+        raise ParseException("Can't serialize '{}', invalid format".format(field))
+    return "|".join([serialize_field(value) + ":" + str(key) for key, value in field])
+
+
+FIELD_SERIALIZERS: T.Dict[type, T.Callable[[T.Any], str]] = {
+    str: str,
+    int: str,
+    float: str,
+    bool: str,
+    type(None): _serialize_none,
+    dict: _serialize_dict,
+    SharedDict: _serialize_dict,
+    tuple: _serialize_tuple,
+    list: _serialize_list,
+}
+
+
+def serialize_token(token: T.Mapping[str, T.Any]) -> str:
+    # Lazy tokens write unchanged lines, and fields that were never parsed, straight from the raw strings
+    serialize_line = getattr(token, "serialize_line", None)
+    if serialize_line is not None:
+        return serialize_line()
+
+    return '\t'.join([value if type(value) is str else serialize_field(value) for value in token.values()])
+
 def serialize(tokenlist: 'TokenList') -> str:
     lines = []
 
@@ -54,8 +96,45 @@ def serialize(tokenlist: 'TokenList') -> str:
                 line = f"# {key}"
             lines.append(line)
 
-    for token_data in tokenlist:
-        line = '\t'.join(serialize_field(val) for val in token_data.values())
-        lines.append(line)
+    lines.extend([serialize_token(token_data) for token_data in tokenlist])
 
     return '\n'.join(lines) + "\n\n"
+
+def serialize_incr(sentences: T.Iterable['TokenList'], out_file: T.Union[T.TextIO, T.BinaryIO],
+                   buffer_size: int = 1 << 16) -> None:
+    """
+        Write sentences to an open file as CoNLL-U, one at a time, so they never need to be in
+        memory all at once. Binary files get UTF-8. Output is written in batches of roughly
+        buffer_size characters.
+    """
+    binary = _is_binary(out_file)
+    buffer: T.List[str] = []
+    buffered = 0
+    for sentence in sentences:
+        text = serialize(sentence)
+        buffer.append(text)
+        buffered += len(text)
+        if buffered >= buffer_size:
+            _write(out_file, "".join(buffer), binary)
+            buffer.clear()
+            buffered = 0
+
+    if buffer:
+        _write(out_file, "".join(buffer), binary)
+
+def _is_binary(out_file: T.Union[T.TextIO, T.BinaryIO]) -> bool:
+    # Wrappers like NamedTemporaryFile and SpooledTemporaryFile aren't io classes, but have a mode
+    if isinstance(out_file, io.TextIOBase):
+        return False
+
+    if isinstance(out_file, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+
+    mode = getattr(out_file, "mode", "")
+    return isinstance(mode, str) and "b" in mode
+
+def _write(out_file: T.Union[T.TextIO, T.BinaryIO], text: str, binary: bool) -> None:
+    if binary:
+        T.cast(T.BinaryIO, out_file).write(text.encode("utf-8"))
+    else:
+        T.cast(T.TextIO, out_file).write(text)
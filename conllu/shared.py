@@ -0,0 +1,89 @@
+import typing as T
+
+
+class SharedDict(T.MutableMapping[str, T.Any]):
+    """
+        Dict of values, like a token's feats, that can share one dict with other tokens parsed from
+        the same string. The shared dict is never changed, instead the first change to a SharedDict
+        makes a copy of its own. Apart from that it works like a dict, and compares equal to one.
+    """
+    __slots__ = ("_data", "_shared")
+
+    _data: T.Dict[str, T.Any]
+    _shared: bool
+
+    def __init__(self, data: T.Union[T.Mapping[str, T.Any], T.Iterable[T.Tuple[str, T.Any]]] = ()):
+        self._data = dict(data)
+        self._shared = False
+
+    @classmethod
+    def shared(cls, data: T.Dict[str, T.Any]) -> 'SharedDict':
+        # data must not be changed by anyone else afterwards
+        shared_dict = cls.__new__(cls)
+        shared_dict._data = data
+        shared_dict._shared = True
+        return shared_dict
+
+    @property
+    def is_shared(self) -> bool:
+        return self._shared
+
+    def _own_data(self) -> T.Dict[str, T.Any]:
+        if self._shared:
+            self._data = dict(self._data)
+            self._shared = False
+
+        return self._data
+
+    def __getitem__(self, key: str) -> T.Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: T.Any) -> None:
+        self._own_data()[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._own_data()[key]
+
+    def __iter__(self) -> T.Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SharedDict):
+            return self._data == other._data
+
+        if isinstance(other, dict):
+            return self._data == other
+
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self._data)
+
+    def get(self, key: str, default: T.Optional[T.Any] = None) -> T.Any:
+        return self._data.get(key, default)
+
+    def keys(self) -> T.KeysView[str]:
+        return self._data.keys()
+
+    def values(self) -> T.ValuesView[T.Any]:
+        return self._data.values()
+
+    def items(self) -> T.ItemsView[str, T.Any]:
+        return self._data.items()
+
+    def clear(self) -> None:
+        self._data = {}
+        self._shared = False
+
+    def copy(self) -> 'SharedDict':
+        # Copies keep sharing the same dict until one of them is changed
+        return SharedDict.shared(self._data) if self._shared else SharedDict(self._data)
+
+    def __reduce__(self) -> T.Tuple[T.Any, ...]:
+        return (SharedDict.shared, (self._data,)) if self._shared else (SharedDict, (self._data,))
@@ -0,0 +1,4 @@
+from setuptools import Extension, setup
+
+# The compiled parser is optional, conllu falls back to pure Python when it can't be built
+setup(ext_modules=[Extension("conllu._speedups", ["conllu/_speedups.c"], optional=True)])
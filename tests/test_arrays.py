@@ -0,0 +1,140 @@
+import sys
+import unittest
+from textwrap import dedent
+from unittest import mock
+
+import numpy
+
+from conllu import parse
+from conllu.arrays import Vocabulary, columnar_to_arrays, sentences_to_arrays, tokenlist_to_arrays
+from conllu.columnar import ColumnarSentenceList
+from conllu.models import SentenceList, TokenList
+
+DATA = dedent("""\
+    # sent_id = 1
+    1\tThe\tthe\tDET\tDT\tDefinite=Def|PronType=Art\t2\tdet\t_\t_
+    2\tdogs\tdog\tNOUN\tNNS\tNumber=Plur\t0\troot\t0:root\tSpaceAfter=No
+
+    # sent_id = 2
+    1-2\tvámonos\t_\t_\t_\t_\t_\t_\t_\t_
+    1\tvamos\tir\tVERB\t_\t_\t0\troot\t_\t_
+    2\tnos\tnosotros\tPRON\t_\t_\t1\tobj\t_\t_
+    2.1\tnos\tnosotros\tPRON\t_\t_\t_\t_\t1:obj\t_
+    3\t!\t!\tPUNCT\t_\t_\t_\tpunct\t_\t_
+
+    # global.columns = ID FORM
+    1\tHi
+""")
+
+
+class TestVocabulary(unittest.TestCase):
+    def test_encode_in_order_seen(self):
+        vocabulary = Vocabulary()
+        self.assertEqual([vocabulary.encode(value) for value in ["b", "a", "b", None]], [0, 1, 0, 2])
+        self.assertEqual(vocabulary.decode(1), "a")
+        self.assertEqual(len(vocabulary), 3)
+        self.assertIn(None, vocabulary)
+        self.assertEqual(repr(vocabulary), "Vocabulary<3 values>")
+
+    def test_frozen(self):
+        vocabulary = Vocabulary(["NOUN", "VERB"], frozen=True, unknown_id=99)
+        self.assertEqual(vocabulary.encode("VERB"), 1)
+        self.assertEqual(vocabulary.encode("ADJ"), 99)
+        self.assertNotIn("ADJ", vocabulary)
+        self.assertEqual(len(vocabulary), 2)
+
+
+class TestTokenListToArrays(unittest.TestCase):
+    def test_words_only(self):
+        sentence = parse(DATA)[1]
+        arrays = sentence.to_arrays(fields=["id", "head", "upos"])
+
+        self.assertEqual(arrays["id"].tolist(), [1, 2, 3])
+        self.assertEqual(arrays["head"].tolist(), [0, 1, -1])
+        self.assertEqual(arrays["upos"].tolist(), [0, 1, 2])
+        self.assertEqual(arrays["id"].dtype, numpy.int64)
+
+    def test_shared_vocabularies(self):
+        sentences = parse(DATA)
+        vocabularies = {}
+        first = tokenlist_to_arrays(sentences[0], fields=["upos"], vocabularies=vocabularies)
+        second = tokenlist_to_arrays(sentences[1], fields=["upos"], vocabularies=vocabularies)
+
+        self.assertEqual(first["upos"].tolist(), [0, 1])
+        self.assertEqual(second["upos"].tolist(), [2, 3, 4])
+        self.assertEqual(vocabularies["upos"].values, ["DET", "NOUN", "VERB", "PRON", "PUNCT"])
+
+    def test_custom_vocabulary(self):
+        class Lowercase:
+            def encode(self, value):
+                return len(value)
+
+        arrays = parse(DATA)[0].to_arrays(fields=["form"], vocabularies={"form": Lowercase()})
+        self.assertEqual(arrays["form"].tolist(), [3, 4])
+
+    def test_empty(self):
+        arrays = TokenList([]).to_arrays(fields=["id", "form"])
+        self.assertEqual(arrays["id"].tolist(), [])
+        self.assertEqual(arrays["form"].tolist(), [])
+
+
+class TestSentencesToArrays(unittest.TestCase):
+    def test_padded(self):
+        arrays = SentenceList(parse(DATA)).to_arrays(fields=["head", "upos"], pad_value=-9)
+
+        self.assertEqual(arrays["lengths"].tolist(), [2, 3, 1])
+        self.assertEqual(arrays["head"].tolist(), [[2, 0, -9], [0, 1, -1], [-1, -9, -9]])
+        self.assertEqual(arrays["upos"].tolist(), [[0, 1, -9], [2, 3, 4], [5, -9, -9]])
+
+    def test_ragged(self):
+        vocabularies = {}
+        arrays = sentences_to_arrays(parse(DATA), fields=["form"], vocabularies=vocabularies, padded=False)
+
+        self.assertEqual(arrays["offsets"].tolist(), [0, 2, 5, 6])
+        self.assertEqual(arrays["form"].tolist(), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(vocabularies["form"].decode(5), "Hi")
+
+    def test_empty(self):
+        arrays = sentences_to_arrays([], fields=["id"])
+        self.assertEqual(arrays["id"].shape, (0, 0))
+        self.assertEqual(arrays["lengths"].tolist(), [])
+
+    def test_missing_numpy(self):
+        with mock.patch.dict(sys.modules, {"numpy": None}):
+            with self.assertRaises(ImportError) as context:
+                sentences_to_arrays(parse(DATA))
+
+        self.assertIn("pip install conllu[numpy]", str(context.exception))
+
+
+class TestColumnarToArrays(unittest.TestCase):
+    def assert_same_arrays(self, first, second):
+        self.assertEqual(first.keys(), second.keys())
+        for key in first:
+            self.assertEqual(first[key].tolist(), second[key].tolist(), key)
+
+    def test_same_as_sentences(self):
+        sentences = parse(DATA)
+        corpus = ColumnarSentenceList(sentences)
+        fields = ["id", "head", "form", "lemma", "upos", "deps", "misc"]
+
+        for padded in [True, False]:
+            expected_vocabularies = {}
+            vocabularies = {}
+            self.assert_same_arrays(
+                corpus.to_arrays(fields=fields, vocabularies=vocabularies, padded=padded),
+                sentences_to_arrays(sentences, fields=fields, vocabularies=expected_vocabularies, padded=padded),
+            )
+            self.assertEqual(
+                {field: vocabulary.values for field, vocabulary in vocabularies.items()},
+                {field: vocabulary.values for field, vocabulary in expected_vocabularies.items()},
+            )
+
+    def test_unknown_field(self):
+        corpus = ColumnarSentenceList(parse(DATA))
+        arrays = columnar_to_arrays(corpus, fields=["id", "unknown"], padded=False)
+        self.assertEqual(arrays["unknown"].tolist(), [0] * 6)
+
+    def test_empty(self):
+        arrays = ColumnarSentenceList().to_arrays(fields=["id", "form"])
+        self.assertEqual(arrays["form"].shape, (0, 0))
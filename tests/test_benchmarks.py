@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.__main__ import main
+from benchmarks.corpus import SHAPES, Shape, generate_corpus
+from benchmarks.parallel import format_speedups
+from benchmarks.parallel import main as parallel_main
+from benchmarks.suite import BENCHMARKS, Comparison, compare, format_report, regressions, run_benchmarks
+from conllu import parse
+from tests.helpers import capture_print
+
+
+class TestCorpus(unittest.TestCase):
+    def test_shapes_are_valid(self):
+        for name in SHAPES:
+            with self.subTest(shape=name):
+                sentences = parse(generate_corpus(20, name))
+                self.assertEqual(len(sentences), 20)
+                for sentence in sentences:
+                    self.assertEqual(sentence.to_tree().to_list(), sentence.filter(id=lambda x: type(x) is int))
+
+    def test_shape_features(self):
+        sentences = parse(generate_corpus(20, Shape(multiword_tokens=0.5, empty_nodes=0.5, enhanced_deps=True)))
+        ids = [token["id"] for sentence in sentences for token in sentence]
+        self.assertTrue(any(isinstance(id_, tuple) and id_[1] == "-" for id_ in ids))
+        self.assertTrue(any(isinstance(id_, tuple) and id_[1] == "." for id_ in ids))
+        multiword_ids = [id_ for id_ in ids if isinstance(id_, tuple) and id_[1] == "-"]
+        self.assertTrue(all(
+            token["deps"] for sentence in sentences for token in sentence if token["id"] not in multiword_ids
+        ))
+
+        long_sentences = parse(generate_corpus(20, "long_sentences"))
+        self.assertGreater(sum(map(len, long_sentences)), sum(map(len, parse(generate_corpus(20)))) * 4)
+
+    def test_same_corpus_for_same_seed(self):
+        self.assertEqual(generate_corpus(5, seed=1), generate_corpus(5, seed=1))
+        self.assertNotEqual(generate_corpus(5, seed=1), generate_corpus(5, seed=2))
+
+
+class TestSuite(unittest.TestCase):
+    def test_run_benchmarks(self):
+        results = run_benchmarks(3, ["default", "empty_nodes"], repeat=2)
+        self.assertEqual(len(results["results"]), 2 * len(BENCHMARKS))
+        self.assertEqual(results["results"]["parse[default]"].keys(), {"min", "median"})
+        self.assertEqual(results["sentences"], 3)
+        for name in ["parse_lazy", "parse_columnar_workers", "serialize_incr", "load_binary", "mapped_access"]:
+            self.assertIn(name + "[default]", results["results"])
+
+        results = run_benchmarks(3, ["default"], ["parse", "to_list"], repeat=1)
+        self.assertEqual(list(results["results"]), ["parse[default]", "to_list[default]"])
+
+    def test_compare_and_report(self):
+        baseline = {"results": {"parse[default]": {"min": 1.0}, "serialize[default]": {"min": 1.0}}}
+        current = {"results": {
+            "parse[default]": {"min": 1.5}, "serialize[default]": {"min": 0.5}, "filter[default]": {"min": 0.1},
+        }}
+        comparisons = compare(baseline, current)
+        self.assertEqual(comparisons, [
+            Comparison("parse[default]", 1.0, 1.5),
+            Comparison("serialize[default]", 1.0, 0.5),
+            Comparison("filter[default]", None, 0.1),
+        ])
+        self.assertEqual(regressions(comparisons), [comparisons[0]])
+        self.assertEqual(regressions(comparisons, threshold=1.0), [])
+
+        report = format_report(comparisons).splitlines()
+        self.assertEqual(len(report), 4)
+        self.assertTrue(report[1].endswith("1.50x  REGRESSION"))
+        self.assertTrue(report[2].endswith("0.50x  improvement"))
+        self.assertTrue(report[3].endswith("-  new"))
+        self.assertTrue(format_report(comparisons, threshold=1.0).splitlines()[1].endswith("1.50x"))
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            args = ["--sentences", "2", "--shape", "default", "--benchmark", "parse", "--repeat", "1"]
+
+            output = capture_print(lambda: self.assertEqual(main(args + ["--baseline", path, "--save"]), 0))
+            self.assertIn("new", output)
+            with open(path) as f:
+                self.assertIn("parse[default]", json.load(f)["results"])
+
+            output = capture_print(lambda: main(args + ["--baseline", path, "--threshold", "1000"]))
+            self.assertNotIn("new", output)
+            self.assertEqual(main(args + ["--baseline", path, "--threshold", "-1"]), 1)
+
+            output = capture_print(lambda: main(["--sentences", "3"] + args[2:] + ["--baseline", path]))
+            self.assertIn("Warning", output)
+            self.assertNotIn("compiled parser", output)
+
+            with open(path) as f:
+                baseline = json.load(f)
+            baseline["machine"]["compiled_parser"] = not baseline["machine"]["compiled_parser"]
+            with open(path, "w") as f:
+                json.dump(baseline, f)
+
+            output = capture_print(lambda: main(args + ["--baseline", path, "--threshold", "1000"]))
+            self.assertIn("compiled parser", output)
+
+
+class TestParallel(unittest.TestCase):
+    def test_format_speedups(self):
+        report = format_speedups({"parse_incr": {1: 1.0}, "parse_columnar": {1: 2.0, 4: 0.5}}).splitlines()
+        self.assertEqual(len(report), 4)
+        self.assertTrue(report[1].endswith("1.000s    1.00x          1.00x"))
+        self.assertTrue(report[2].endswith("2.000s    1.00x          0.50x"))
+        self.assertTrue(report[3].endswith("0.500s    4.00x          2.00x"))
+
+    def test_main(self):
+        args = ["--sentences", "20", "--workers", "1", "--workers", "2", "--repeat", "1"]
+        output = capture_print(lambda: self.assertEqual(parallel_main(args), 0))
+        self.assertIn("20 sentences", output)
+        self.assertIn("parse_columnar", output)
+        self.assertEqual(len(output.splitlines()), 5)
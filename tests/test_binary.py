@@ -0,0 +1,300 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from array import array
+from textwrap import dedent
+from unittest import mock
+
+from conllu import parse
+from conllu.binary import BINARY_VERSION, _describe_option, load_binary, parse_cached, read_binary_header, save_binary
+from conllu.columnar import ColumnarSentenceList
+from conllu.exceptions import ParseException
+from conllu.models import CompactToken, Metadata, SentenceList, Token, TokenList
+
+DATA = dedent("""\
+    # newdoc
+    # sent_id = 1
+    # weight = 2
+    1-2\tdidn't\t_\t_\t_\t_\t_\t_\t_\t_
+    1\tdid\tdo\tAUX\t_\tMood=Ind|Tense=Past\t0\troot\t_\t_
+    2\tn't\tnot\tPART\t_\tPolarity=Neg\t1\tadvmod\t1:advmod\tSpaceAfter=No
+    2.1\tgo\tgo\tVERB\t_\t_\t_\t_\t0:root\t_
+
+    # sent_id = 2
+    1\tYes\tyes\tINTJ\t_\tPolarity=Pos\t0\troot\t_\t_
+    2\tno\tno\tINTJ\t_\tPolarity=Neg\t1\tconj
+
+""")
+
+
+def weight_parser(key, value):
+    return key, int(value)
+
+
+def rewrite_binary(path, byteswap=False, itemsize=None):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    header_length = int.from_bytes(data[8:16], "little")
+    header = json.loads(data[16:16 + header_length])
+    body = data[16 + header_length:]
+
+    arrays = []
+    position = 0
+    for description in header["arrays"]:
+        _, typecode, size, length = description
+        values = array(typecode)
+        values.frombytes(body[position:position + size * length])
+        if byteswap:
+            values.byteswap()
+
+        arrays.append(values.tobytes())
+        position += size * length
+        description[2] = itemsize or size
+
+    if byteswap:
+        header["byteorder"] = "big" if sys.byteorder == "little" else "little"
+
+    header_data = json.dumps(header).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data[:8] + len(header_data).to_bytes(8, "little") + header_data + b"".join(arrays) + body[position:])
+
+
+class TestBinary(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "corpus.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        sentences = parse(DATA, metadata_parsers={"weight": weight_parser})
+        save_binary(sentences, self.path)
+        loaded = load_binary(self.path)
+
+        self.assertIsInstance(loaded, SentenceList)
+        self.assertEqual(loaded, sentences)
+        self.assertEqual([sentence.metadata for sentence in loaded], [
+            {"newdoc": None, "sent_id": "1", "weight": 2},
+            {"sent_id": "2"},
+        ])
+        self.assertEqual(loaded[0].default_fields, sentences[0].default_fields)
+        self.assertIsInstance(loaded[0][0], Token)
+        self.assertEqual(loaded[0][0]["id"], (1, "-", 2))
+        self.assertEqual(loaded[0][3]["id"], (2, ".", 1))
+        self.assertEqual(loaded[0][2]["deps"], [("advmod", 1)])
+        self.assertEqual(loaded[1][1], Token({
+            "id": 2, "form": "no", "lemma": "no", "upos": "INTJ", "xpos": None,
+            "feats": {"Polarity": "Neg"}, "head": 1, "deprel": "conj",
+        }))
+        self.assertEqual(loaded[0].serialize(), sentences[0].serialize())
+
+    def test_same_fields(self):
+        sentences = parse(DATA)[:1]
+        save_binary(sentences, self.path)
+        self.assertEqual(load_binary(self.path), sentences)
+        self.assertEqual(load_binary(self.path, compact=True), sentences)
+
+        sentences = SentenceList([TokenList([Token(), Token()])])
+        save_binary(sentences, self.path)
+        self.assertEqual(load_binary(self.path), sentences)
+
+    def test_values_are_not_shared(self):
+        save_binary(parse(DATA), self.path)
+        loaded = load_binary(self.path)
+
+        self.assertEqual(loaded[0][2]["feats"], loaded[1][1]["feats"])
+        loaded[0][2]["feats"]["Polarity"] = "Pos"
+        self.assertEqual(loaded[1][1]["feats"], {"Polarity": "Neg"})
+
+    def test_compact(self):
+        sentences = parse(DATA)
+        save_binary(sentences, self.path)
+        loaded = load_binary(self.path, compact=True)
+
+        self.assertIsInstance(loaded[0][0], CompactToken)
+        self.assertEqual(loaded, sentences)
+
+    def test_unusual_values(self):
+        sentences = SentenceList([
+            TokenList([
+                Token({"id": 1, "score": 0.5, "gold": True, "nested": {"a": (1, [2, {3: None}])}}),
+                Token({"id": 2}),
+            ], Metadata({"sent_id": "1"}), default_fields=None),
+        ], Metadata({"name": "test", "size": 1}))
+        save_binary(sentences, self.path)
+        loaded = load_binary(self.path)
+
+        self.assertEqual(loaded, sentences)
+        self.assertEqual(loaded.metadata, {"name": "test", "size": 1})
+        self.assertIsNone(loaded[0].default_fields)
+        self.assertIs(type(loaded[0][0]["gold"]), bool)
+
+        with self.assertRaises(TypeError):
+            save_binary([TokenList([Token({"id": object()})])], self.path)
+
+    def test_columnar_and_empty(self):
+        sentences = parse(DATA)
+        save_binary(ColumnarSentenceList(sentences), self.path)
+        self.assertEqual(load_binary(self.path), sentences)
+        self.assertEqual(load_binary(self.path).metadata, {})
+
+        save_binary(iter([]), self.path)
+        self.assertEqual(load_binary(self.path), [])
+
+    def test_key(self):
+        save_binary(parse(DATA), self.path, key={"source": "a"})
+        self.assertEqual(read_binary_header(self.path)["key"], {"source": "a"})
+
+    def test_other_byteorder(self):
+        sentences = parse(DATA)
+        save_binary(sentences, self.path)
+        rewrite_binary(self.path, byteswap=True)
+        self.assertEqual(load_binary(self.path), sentences)
+
+    def test_invalid_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"1\tdog\n")
+
+        with self.assertRaises(ParseException):
+            load_binary(self.path)
+
+        save_binary(parse(DATA), self.path)
+        with mock.patch("conllu.binary.BINARY_VERSION", BINARY_VERSION + 1):
+            with self.assertRaises(ParseException):
+                load_binary(self.path)
+
+        rewrite_binary(self.path, itemsize=3)
+        with self.assertRaisesRegex(ParseException, "incompatible platform"):
+            load_binary(self.path)
+
+    def test_truncated_file(self):
+        save_binary(parse(DATA), self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        for broken in [data[:-1], data[:-30], data + b"\0"]:
+            with open(self.path, "wb") as f:
+                f.write(broken)
+
+            with self.assertRaisesRegex(ParseException, "truncated or corrupt"):
+                load_binary(self.path)
+
+    def test_save_replaces_file(self):
+        sentences = parse(DATA)
+        save_binary(sentences, self.path)
+
+        with mock.patch("conllu.binary.os.replace", side_effect=OSError("interrupted")):
+            with self.assertRaises(OSError):
+                save_binary(sentences[:1], self.path)
+
+        self.assertEqual(load_binary(self.path), sentences)
+        self.assertEqual(os.listdir(self.directory.name), ["corpus.bin"])
+
+        with self.assertRaises(OSError):
+            save_binary(sentences, os.path.join(self.directory.name, "missing", "corpus.bin"))
+
+    def test_load_columnar(self):
+        sentences = parse(DATA, metadata_parsers={"weight": weight_parser})
+        save_binary(sentences, self.path)
+        loaded = load_binary(self.path, columnar=True)
+
+        self.assertIsInstance(loaded, ColumnarSentenceList)
+        self.assertEqual(list(loaded), sentences)
+        self.assertEqual(loaded[0].metadata["weight"], 2)
+        loaded[0][2]["feats"]["Polarity"] = "Pos"
+        self.assertEqual(loaded[0][2]["feats"], {"Polarity": "Neg"})
+
+        loaded.append(sentences[1])
+        self.assertEqual(loaded[2], sentences[1])
+        self.assertEqual(len(loaded.values), len(load_binary(self.path, columnar=True).values))
+
+    def test_load_columnar_shared_values(self):
+        sentences = parse(DATA, shared_fields=["feats"])
+        save_binary(ColumnarSentenceList(sentences + parse(DATA)), self.path)
+        loaded = load_binary(self.path, columnar=True)
+
+        self.assertEqual(list(loaded), sentences + parse(DATA))
+        loaded.append(sentences[0])
+        self.assertEqual(loaded[4], sentences[0])
+
+
+class TestParseCached(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.directory.name, "corpus.conllu")
+        with open(self.source_path, "w", encoding="utf-8") as f:
+            f.write(DATA)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reuses_cache(self):
+        sentences = parse_cached(self.source_path)
+        self.assertEqual(sentences, parse(DATA))
+        self.assertTrue(os.path.exists(self.source_path + ".bin"))
+
+        with mock.patch("conllu.binary.parse_incr", side_effect=AssertionError("parsed again")):
+            self.assertEqual(parse_cached(self.source_path), sentences)
+            self.assertIsInstance(parse_cached(self.source_path, compact=True)[0][0], CompactToken)
+
+    def test_rebuilds_cache(self):
+        cache_path = os.path.join(self.directory.name, "cache.bin")
+        parse_cached(self.source_path, cache_path)
+
+        sentences = parse_cached(self.source_path, cache_path, columns=["form"])
+        self.assertEqual(sentences[1][0], {"form": "Yes"})
+
+        sentences = parse_cached(self.source_path, cache_path, metadata_parsers={"weight": weight_parser})
+        self.assertEqual(sentences[0].metadata["weight"], 2)
+
+        with open(self.source_path, "a", encoding="utf-8") as f:
+            f.write("1\tMore\n")
+
+        sentences = parse_cached(self.source_path, cache_path, metadata_parsers={"weight": weight_parser})
+        self.assertEqual(len(sentences), 3)
+
+        sentences = parse_cached(self.source_path, cache_path, field_parsers={"form": lambda line, i: line[i].upper()})
+        self.assertEqual(sentences[1][0]["form"], "YES")
+        sentences = parse_cached(self.source_path, cache_path, field_parsers={"form": lambda line, i: line[i].lower()})
+        self.assertEqual(sentences[1][0]["form"], "yes")
+        self.assertEqual(_describe_option(len), "builtins.len")
+
+        with open(cache_path, "wb") as f:
+            f.write(b"broken")
+
+        self.assertEqual(len(parse_cached(self.source_path, cache_path)), 3)
+
+    def test_rebuilds_unreadable_cache(self):
+        cache_path = os.path.join(self.directory.name, "cache.bin")
+        parse_cached(self.source_path, cache_path)
+        with open(cache_path, "rb") as f:
+            data = f.read()
+
+        header_length = int.from_bytes(data[8:16], "little")
+        for broken in [
+            data[:-10],
+            data[:16] + b"\xff" * header_length + data[16 + header_length:],
+            data[:16] + b"[" + data[17:],
+            data[:16] + b"[]".ljust(header_length) + data[16 + header_length:],
+            data[:16] + json.dumps({"version": BINARY_VERSION}).encode().ljust(header_length) + data[16 + header_length:],
+        ]:
+            with open(cache_path, "wb") as f:
+                f.write(broken)
+
+            self.assertEqual(parse_cached(self.source_path, cache_path), parse(DATA))
+            self.assertEqual(load_binary(cache_path), parse(DATA))
+
+    def test_columnar(self):
+        sentences = parse_cached(self.source_path, columnar=True)
+        self.assertIsInstance(sentences, ColumnarSentenceList)
+        self.assertEqual(list(sentences), parse(DATA))
+
+        with mock.patch("conllu.binary.parse_incr", side_effect=AssertionError("parsed again")):
+            sentences = parse_cached(self.source_path, columnar=True)
+
+        self.assertIsInstance(sentences, ColumnarSentenceList)
+        self.assertEqual(list(sentences), parse(DATA))
@@ -0,0 +1,145 @@
+import sys
+import unittest
+from io import StringIO
+from textwrap import dedent
+from unittest import mock
+
+from conllu import parse
+from conllu.columnar import ColumnarSentenceList, ValueTable, parse_columnar
+from conllu.exceptions import ParseException
+from conllu.models import Metadata, SentenceList, Token, TokenList
+from tests.fixtures import TESTCASES
+
+DATA = dedent("""\
+    # sent_id = 1
+    # text = The dogs
+    1\tThe\tthe\tDET\tDT\tDefinite=Def|PronType=Art\t2\tdet\t_\t_
+    2\tdogs\tdog\tNOUN\tNNS\tNumber=Plur\t0\troot\t0:root\tSpaceAfter=No
+
+    # global.columns = ID FORM HEAD
+    # sent_id = 2
+    1-2\tHello\t_
+    1\tHel\t0
+    2\tlo\t1
+""")
+
+
+class TestValueTable(unittest.TestCase):
+    def test_interns_equal_values(self):
+        table = ValueTable()
+        self.assertEqual(table.add("NOUN"), table.add("NOUN"))
+        self.assertEqual(table.add({"Number": "Plur"}), table.add({"Number": "Plur"}))
+        self.assertEqual(table.add([("root", 0)]), table.add([("root", 0)]))
+        self.assertEqual(len(table), 3)
+
+    def test_keeps_types_apart(self):
+        table = ValueTable()
+        ids = [table.add(1), table.add(1.0), table.add(True), table.add("1")]
+        self.assertEqual(len(set(ids)), 4)
+        self.assertIs(table[ids[2]], True)
+
+    def test_unhashable_values(self):
+        table = ValueTable()
+        first = table.add({"a": ["b"]})
+        second = table.add({"a": ["b"]})
+        self.assertNotEqual(first, second)
+        self.assertEqual(table[first], table[second])
+
+    def test_add_all(self):
+        table = ValueTable()
+        table.add("NOUN")
+        self.assertEqual(table.add_all(["VERB", "NOUN", {"a": ["b"]}, {"a": ["b"]}, 1, "VERB"]), [1, 0, 2, 3, 4, 1])
+
+    def test_from_values(self):
+        table = ValueTable.from_values(["NOUN", {"a": ["b"]}, "NOUN"])
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.add("NOUN"), 0)
+        self.assertEqual(table.add({"a": ["b"]}), 3)
+        self.assertEqual(table.add("VERB"), 4)
+
+class TestColumnarSentenceList(unittest.TestCase):
+    def test_roundtrip_testcases(self):
+        for testcase in TESTCASES:
+            expected = parse(testcase)
+            for corpus in [ColumnarSentenceList(expected), parse_columnar(StringIO(testcase))]:
+                self.assertEqual(list(corpus), expected)
+                self.assertEqual([sentence.default_fields for sentence in corpus],
+                                 [sentence.default_fields for sentence in expected])
+
+    def test_parse_columnar(self):
+        corpus = parse_columnar(StringIO(DATA))
+        self.assertEqual(len(corpus), 2)
+        self.assertEqual(corpus.num_tokens, 5)
+        self.assertEqual(list(corpus), parse(DATA))
+        self.assertEqual(repr(corpus), "ColumnarSentenceList<2 sentences, 5 tokens>")
+
+    def test_parse_columnar_options(self):
+        corpus = parse_columnar(
+            StringIO("# tags = A|B\n1  dog\n"),
+            fields=["id", "form"],
+            field_parsers={"form": lambda line, i: line[i].upper()},
+            metadata_parsers={"tags": lambda key, value: (key, value.split("|"))},
+            strict_tabs=True,
+        )
+        self.assertEqual(corpus[0], TokenList([Token([("id", 1), ("form", "DOG")])], Metadata(tags=["A", "B"])))
+
+    def test_parse_columnar_duplicate_fields(self):
+        corpus = parse_columnar(StringIO("1\t2\t3\n"), fields=("id", "id", "id"))
+        self.assertEqual(corpus[0], TokenList([Token([("id", 3)])]))
+
+    def test_columns(self):
+        corpus = parse_columnar(StringIO(DATA))
+        self.assertEqual(corpus.column("form"), ["The", "dogs", "Hello", "Hel", "lo"])
+        self.assertEqual(corpus.column("head", sentence=1), [None, 0, 1])
+        self.assertEqual(corpus.column("upos"), ["DET", "NOUN", None, None, None])
+        self.assertEqual(corpus.column("missing", sentence=0), [None, None])
+        self.assertEqual(corpus.token_range(1), range(2, 5))
+
+    def test_values_are_shared(self):
+        corpus = parse_columnar(StringIO(DATA))
+        self.assertEqual(len(set(corpus.columns["lemma"][:2])), 2)
+        self.assertEqual(corpus.columns["upos"][2], 0)
+        self.assertLess(len(corpus.values), corpus.num_tokens * len(corpus.columns))
+
+    def test_views_are_copies(self):
+        corpus = parse_columnar(StringIO(DATA))
+        sentence = corpus[0]
+        sentence[0]["feats"]["Definite"] = "Ind"
+        sentence[0]["form"] = "A"
+        sentence.metadata["sent_id"] = "changed"
+        corpus.column("feats")[1]["Number"] = "Sing"
+
+        self.assertEqual(corpus[0], parse(DATA)[0])
+
+    def test_indexing(self):
+        corpus = parse_columnar(StringIO(DATA))
+        expected = parse(DATA)
+        self.assertEqual(corpus[-1], expected[-1])
+        self.assertIsInstance(corpus[0:1], SentenceList)
+        self.assertEqual(corpus[0:1], expected[0:1])
+        self.assertEqual(corpus.to_sentence_list(), expected)
+        with self.assertRaises(IndexError):
+            corpus[2]
+
+    def test_extend_with_custom_tokens(self):
+        corpus = ColumnarSentenceList()
+        corpus.extend([
+            TokenList([{"id": 1, "form": "a"}, {"form": "b", "extra": [1]}]),
+            TokenList([Token([("id", 1), ("id", 2)])], default_fields=("id", "id")),
+        ])
+        self.assertEqual(corpus[0], TokenList([{"id": 1, "form": "a"}, {"form": "b", "extra": [1]}]))
+        self.assertEqual(list(corpus[0][1].keys()), ["form", "extra"])
+        self.assertEqual(corpus[1], TokenList([{"id": 2}]))
+        self.assertEqual(corpus[1].default_fields, ("id", "id"))
+
+    def test_parse_errors(self):
+        with self.assertRaisesRegex(ParseException, "Failed parsing field 'id'"):
+            parse_columnar(StringIO("1\tdog\n\nx\tcat\n"))
+
+    def test_extend_with_columnar_without_numpy(self):
+        expected = parse(DATA) + parse(DATA)[::-1]
+        for modules in [{}, {"numpy": None}]:
+            with self.subTest(modules=modules), mock.patch.dict(sys.modules, modules):
+                corpus = parse_columnar(StringIO(DATA))
+                corpus.extend(ColumnarSentenceList(parse(DATA)[::-1]))
+                self.assertEqual(list(corpus), expected)
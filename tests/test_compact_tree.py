@@ -0,0 +1,122 @@
+import random
+import unittest
+from textwrap import dedent
+
+from conllu import parse
+from conllu.compact_tree import CompactTree
+from conllu.exceptions import ParseException
+from conllu.models import Token, TokenList
+
+DATA = dedent("""\
+    # sent_id = 1
+    1\tThe\tthe\tDET\t_\t_\t2\tdet\t_\t_
+    2\tdog\tdog\tNOUN\t_\t_\t3\tnsubj\t_\t_
+    3-4\tdidn't\t_\t_\t_\t_\t_\t_\t_\t_
+    3\tdid\tdo\tAUX\t_\t_\t0\troot\t_\t_
+    4\tn't\tnot\tPART\t_\t_\t3\tadvmod\t_\t_
+    5\tbark\tbark\tVERB\t_\t_\t3\txcomp\t_\t_
+    6\tloudly\tloudly\tADV\t_\t_\t5\tadvmod\t_\t_
+
+""")
+
+def random_tokenlist(length, rng):
+    return TokenList([Token({"id": i, "head": rng.randrange(i)}) for i in range(1, length + 1)])
+
+
+class TestCompactTree(unittest.TestCase):
+    def setUp(self):
+        self.sentence = parse(DATA)[0]
+        self.tree = self.sentence.to_compact_tree()
+
+    def test_basics(self):
+        self.assertEqual(len(self.tree), 6)
+        self.assertEqual(repr(self.tree), "CompactTree<6 tokens>")
+        self.assertEqual(self.tree.ids, [0, 1, 2, 3, 4, 5, 6])
+        self.assertEqual(self.tree.token(5)["form"], "bark")
+        self.assertEqual(self.tree.metadata, {"sent_id": "1"})
+
+    def test_parent_and_children(self):
+        self.assertEqual(self.tree.parent(0), None)
+        self.assertEqual(self.tree.parent(3), 0)
+        self.assertEqual(self.tree.parent(1), 2)
+        self.assertEqual(self.tree.children(0), [3])
+        self.assertEqual(self.tree.children(3), [2, 4, 5])
+        self.assertEqual(self.tree.children(6), [])
+
+    def test_ancestors_and_descendants(self):
+        self.assertEqual(self.tree.ancestors(1), [2, 3, 0])
+        self.assertEqual(self.tree.ancestors(0), [])
+        self.assertEqual(self.tree.descendants(3), [2, 1, 4, 5, 6])
+        self.assertEqual(self.tree.descendants(6), [])
+        self.assertTrue(self.tree.is_ancestor(3, 6))
+        self.assertTrue(self.tree.is_ancestor(0, 1))
+        self.assertFalse(self.tree.is_ancestor(6, 3))
+        self.assertFalse(self.tree.is_ancestor(2, 6))
+        self.assertFalse(self.tree.is_ancestor(5, 5))
+
+    def test_depth_size_and_span(self):
+        self.assertEqual([self.tree.depth(id_) for id_ in self.tree.ids], [0, 3, 2, 1, 2, 2, 3])
+        self.assertEqual(self.tree.subtree_size(5), 2)
+        self.assertEqual(self.tree.subtree_size(0), 7)
+        self.assertEqual(self.tree.span(2), (1, 2))
+        self.assertEqual(self.tree.span(3), (1, 6))
+
+    def test_orders(self):
+        self.assertEqual(self.tree.preorder(), [0, 3, 2, 1, 4, 5, 6])
+        self.assertEqual(self.tree.postorder(), [1, 2, 4, 6, 5, 3, 0])
+        self.assertEqual(self.tree.preorder_index(4), 4)
+        self.assertEqual(self.tree.postorder_index(4), 2)
+
+    def test_lca(self):
+        self.assertEqual(self.tree.lca(1, 6), 3)
+        self.assertEqual(self.tree.lca(6, 1), 3)
+        self.assertEqual(self.tree.lca(1, 2), 2)
+        self.assertEqual(self.tree.lca(4, 4), 4)
+        self.assertEqual(self.tree.lca(0, 6), 0)
+
+    def test_lca_matches_ancestors(self):
+        rng = random.Random(1)
+        for length in [1, 2, 7, 50]:
+            tree = random_tokenlist(length, rng).to_compact_tree()
+            for first in tree.ids:
+                for second in tree.ids:
+                    first_path = [first] + tree.ancestors(first)
+                    second_path = set([second] + tree.ancestors(second))
+                    expected = next(id_ for id_ in first_path if id_ in second_path)
+                    self.assertEqual(tree.lca(first, second), expected)
+
+    def test_projectivity(self):
+        self.assertTrue(self.tree.is_projective())
+        self.assertTrue(self.tree.is_projective(3))
+
+        tree = TokenList([
+            Token({"id": 1, "head": 3}),
+            Token({"id": 2, "head": 0}),
+            Token({"id": 3, "head": 2}),
+        ]).to_compact_tree()
+        self.assertFalse(tree.is_projective())
+        self.assertFalse(tree.is_projective(3))
+        self.assertTrue(tree.is_projective(1))
+        self.assertTrue(tree.is_projective(2))
+
+    def test_unusual_ids(self):
+        tree = CompactTree([Token({"id": 10, "head": 0}), Token({"id": 5, "head": 10})])
+        self.assertEqual(tree.ids, [0, 10, 5])
+        self.assertEqual(tree.children(10), [5])
+        self.assertEqual(tree.span(10), (10, 5))
+
+    def test_invalid_trees(self):
+        with self.assertRaises(ParseException):
+            CompactTree([Token({"id": 1, "head": 0}), Token({"id": 1, "head": 0})])
+
+        with self.assertRaises(ParseException):
+            CompactTree([Token({"id": 1, "head": 0}), Token({"id": 2, "head": 5})])
+
+        with self.assertRaises(ParseException):
+            CompactTree([Token({"id": 1, "head": 0}), Token({"id": 2, "head": 3}), Token({"id": 3, "head": 2})])
+
+    def test_deep_tree(self):
+        length = 5000
+        tree = TokenList([Token({"id": i, "head": i - 1}) for i in range(1, length + 1)]).to_compact_tree()
+        self.assertEqual(tree.depth(length), length)
+        self.assertEqual(tree.lca(length, length - 10), length - 10)
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from textwrap import dedent
+from unittest import mock
+
+from conllu import parse, parse_incr
+from conllu.corpus_index import CorpusIndex
+from conllu.exceptions import ParseException
+from conllu.models import TokenList
+
+DATA = dedent("""\
+    # sent_id = 1
+    1\tThe\tthe\tDET\tDT\tDefinite=Def|PronType=Art\t2\tdet\t_\t_
+    2\tdogs\tdog\tNOUN\tNNS\tNumber=Plur\t3\tnsubj\t_\t_
+    3\tbark\tbark\tVERB\tVBP\tNumber=Plur\t0\troot\t_\t_
+
+    # sent_id = 2
+    1\tA\ta\tDET\tDT\tDefinite=Ind|PronType=Art\t2\tdet\t_\t_
+    2\tdog\tdog\tNOUN\tNN\tNumber=Sing\t0\troot\t_\t_
+
+    # sent_id = 3
+    1\tDogs\tdog\tNOUN\tNNS\tNumber=Plur\t2\tnsubj\t_\t_
+    2\tsleep\tsleep\tVERB\tVBP\tNumber=Plur|Typo\t0\troot\t_\t_
+""")
+
+
+class TestCorpusIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = CorpusIndex.build(parse(DATA))
+
+    def test_lookup(self):
+        self.assertEqual(self.index.lookup("lemma", "dog"), [(0, 1), (1, 1), (2, 0)])
+        self.assertEqual(self.index.lookup("upos", "VERB"), [(0, 2), (2, 1)])
+        self.assertEqual(self.index.lookup("feats__Number", "Plur"), [(0, 1), (0, 2), (2, 0), (2, 1)])
+        self.assertEqual(self.index.lookup("feats", "Definite"), [(0, 0), (1, 0)])
+        self.assertEqual(self.index.lookup("feats", "Typo"), [(2, 1)])
+        self.assertEqual(self.index.lookup("lemma", "cat"), [])
+        self.assertEqual(self.index.lookup("head", "0"), [])
+
+    def test_tokens(self):
+        self.assertEqual(self.index.tokens(lemma="dog", feats__Number="Plur"), [(0, 1), (2, 0)])
+        self.assertEqual(self.index.tokens(upos="VERB", lemma="dog"), [])
+        self.assertEqual(self.index.tokens(deprel="root", upos="VERB", feats__Number="Plur"), [(0, 2), (2, 1)])
+        self.assertEqual(self.index.tokens(), [])
+
+    def test_sentences(self):
+        self.assertEqual(self.index.sentences(lemma="dog"), [0, 1, 2])
+        self.assertEqual(self.index.sentences(lemma="dog", upos="VERB"), [0, 2])
+        self.assertEqual(self.index.sentences(lemma="dog", upos="VERB", form="bark"), [0])
+        self.assertEqual(self.index.sentences(lemma="cat", upos="VERB"), [])
+        self.assertEqual(self.index.sentences(), [])
+
+    def test_add_updates_sentences(self):
+        self.assertEqual(self.index.sentences(lemma="cat"), [])
+        self.index.add(TokenList([{"id": 1, "form": "Cat", "lemma": "cat"}]))
+        self.assertEqual(self.index.sentences(lemma="cat"), [3])
+        self.assertEqual(len(self.index), 4)
+
+    def test_custom_fields(self):
+        index = CorpusIndex.build(parse_incr(StringIO(DATA)), fields=["head", "deps", "misc"])
+        self.assertEqual(index.fields, ("head", "deps", "misc"))
+        self.assertEqual(index.lookup("head", 0), [(0, 2), (1, 1), (2, 1)])
+        self.assertEqual(index.values("head"), ["2", "3", "0"])
+        self.assertEqual(index.values("deps"), [])
+        self.assertEqual(repr(index), "CorpusIndex<3 sentences, fields=['head', 'deps', 'misc']>")
+
+    def test_skips_lists_and_empty_values(self):
+        index = CorpusIndex.build([TokenList([
+            {"id": 1, "deps": [("nsubj", 2)], "feats": {"Typo": None}, "misc": {"SpaceAfter": "No"}},
+        ])], fields=["deps", "feats", "misc", "misc"])
+        self.assertEqual(index.postings.keys(), {"feats", "misc", "misc__SpaceAfter"})
+        self.assertEqual(index.lookup("feats", "Typo"), [(0, 0)])
+        self.assertEqual(index.lookup("misc", "SpaceAfter"), [(0, 0)])
+
+    def test_too_long_sentence(self):
+        with mock.patch("conllu.corpus_index.TOKEN_MASK", 1):
+            with self.assertRaises(ParseException):
+                self.index.add(TokenList([{"id": 1}, {"id": 2}]))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus.idx")
+            self.index.save(path)
+            index = CorpusIndex.load(path)
+
+        self.assertEqual(index.fields, self.index.fields)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.postings, self.index.postings)
+        self.assertEqual(index.sentences(lemma="dog", upos="VERB"), [0, 2])
+
+    def test_load_other_byteorder(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus.idx")
+            with mock.patch("sys.byteorder", "other"):
+                self.index.save(path)
+
+            index = CorpusIndex.load(path)
+
+        self.assertNotEqual(index.lookup("lemma", "dog"), self.index.lookup("lemma", "dog"))
+        self.assertEqual(len(index.lookup("lemma", "dog")), 3)
+
+    def test_load_unsupported_version(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus.idx")
+            with open(path, "w") as f:
+                f.write('{"version": 0}')
+
+            with self.assertRaises(ParseException):
+                CorpusIndex.load(path)
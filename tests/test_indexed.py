@@ -0,0 +1,288 @@
+import os
+import tempfile
+import unittest
+from io import BytesIO, StringIO
+from textwrap import dedent
+from unittest import mock
+
+from conllu import parse_incr
+from conllu.exceptions import ParseException
+from conllu.indexed import (
+    INDEX_SUFFIX, INDEX_VERSION, IndexedSentenceList, MappedSentenceList, SentenceIndex, _is_blank,
+    load_or_build_index, scan_sentence_spans,
+)
+from conllu.models import SentenceList
+
+DATA = dedent("""\
+    # sent_id = s1
+    # text = The dog
+    1\tThe\tthe\tDET\tDT\tDefinite=Def\t2\tdet\t_\t_
+    2\tdog\tdog\tNOUN\tNN\tNumber=Sing\t0\troot\t_\t_
+
+
+    # global.columns = ID FORM HEAD
+    # sent_id = s2
+    1\tHello\t0
+
+    # sent_id = s3
+    1\tthere\t0
+    \t
+    # sent_id = s4
+    # global.columns =
+    1\tBye\tbye\tINTJ\t_\t_\t0\troot\t_\t_
+""")
+
+
+class TestSentenceIndex(unittest.TestCase):
+    def test_from_file(self):
+        index = SentenceIndex.from_file(BytesIO(DATA.encode("utf-8")))
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.sent_ids, ["s1", "s2", "s3", "s4"])
+        self.assertTrue(index.strict_tabs)
+
+        encoded = DATA.encode("utf-8")
+        sentences = [encoded[offset:offset + length] for offset, length in zip(index.offsets, index.lengths)]
+        self.assertTrue(sentences[0].startswith(b"# sent_id = s1\n"))
+        self.assertTrue(sentences[0].endswith(b"root\t_\t_\n"))
+        self.assertEqual(sentences[2], b"# sent_id = s3\n1\tthere\t0\n")
+
+    def test_global_columns(self):
+        index = SentenceIndex.from_file(BytesIO(DATA.encode("utf-8")))
+        self.assertEqual([index.fields_at(i) for i in range(4)], [
+            None, ("id", "form", "head"), ("id", "form", "head"), None,
+        ])
+
+    def test_detects_space_separated_files(self):
+        index = SentenceIndex.from_file(BytesIO(b"# newdoc\n\n1  The\n\n1\tdog\n"))
+        self.assertFalse(index.strict_tabs)
+        self.assertEqual(index.sent_ids, [None, None, None])
+
+    def test_ends_with_blank_lines(self):
+        index = SentenceIndex.from_file(BytesIO(b"1\tThe\n\n# sent_id = 2\n1\tdog\n\n\n"))
+        self.assertEqual(list(index.offsets), [0, 7])
+        self.assertEqual(list(index.lengths), [6, 20])
+        self.assertEqual(index.position("2"), 1)
+
+    def test_without_tokens(self):
+        index = SentenceIndex.from_file(BytesIO(b"# newdoc"))
+        self.assertFalse(index.strict_tabs)
+        self.assertEqual(list(index.offsets), [0])
+        self.assertEqual(list(index.lengths), [8])
+
+    def test_position(self):
+        index = SentenceIndex.from_file(BytesIO(DATA.encode("utf-8")))
+        self.assertEqual(index.position("s3"), 2)
+        with self.assertRaises(KeyError):
+            index.position("missing")
+
+    def test_equality_and_repr(self):
+        index = SentenceIndex.from_file(BytesIO(DATA.encode("utf-8")))
+        self.assertEqual(index, SentenceIndex.from_file(BytesIO(DATA.encode("utf-8"))))
+        self.assertNotEqual(index, SentenceIndex.from_file(BytesIO(b"1\tdog\n")))
+        self.assertNotEqual(index, "index")
+        self.assertEqual(repr(index), "SentenceIndex<4 sentences>")
+
+    def test_is_blank(self):
+        self.assertTrue(_is_blank(b"\n"))
+        self.assertTrue(_is_blank(b" \t\r\n"))
+        self.assertTrue(_is_blank(" \n".encode("utf-8")))
+        self.assertTrue(_is_blank(b"\x1c\n"))
+        self.assertFalse(_is_blank("å\tdog\n".encode("utf-8")))
+        self.assertFalse(_is_blank(b"1\tdog\n"))
+
+class TestScanSentenceSpans(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(list(scan_sentence_spans(b"")), [])
+        self.assertEqual(list(scan_sentence_spans(b"\n \n")), [])
+
+    def test_spans(self):
+        data = b"\n1\tThe\n2\tdog\n\n\t\n\xc2\xa0\n1\tcat\r\n\r\n1\tend"
+        self.assertEqual([data[start:end] for start, end in scan_sentence_spans(data)], [
+            b"1\tThe\n2\tdog\n",
+            b"1\tcat\r\n",
+            b"1\tend",
+        ])
+
+    def test_from_buffer_matches_from_file(self):
+        for data in [
+            DATA.encode("utf-8"),
+            b"\n \n1  x\n\xc2\xa0\n# sent_id = 3\n1\ty\n\r\n  \n2\tz",
+            b"# newdoc\n\n  # sent_id = 2\n1\tx\n# inside = 1\n\n",
+            b"",
+        ]:
+            self.assertEqual(SentenceIndex.from_buffer(data), SentenceIndex.from_file(BytesIO(data)))
+
+class TestSentenceIndexFiles(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "corpus.conllu")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(DATA)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_save_and_load(self):
+        index = SentenceIndex.build(self.path)
+        index.save(self.path + INDEX_SUFFIX)
+        loaded = SentenceIndex.load(self.path + INDEX_SUFFIX)
+        self.assertEqual(loaded, index)
+        self.assertEqual(loaded.fields_at(2), ("id", "form", "head"))
+        self.assertTrue(loaded.is_current(self.path))
+
+    def test_build_empty_file(self):
+        with open(self.path, "w"):
+            pass
+
+        self.assertEqual(len(SentenceIndex.build(self.path)), 0)
+
+    def test_load_unsupported_version(self):
+        with open(self.path + INDEX_SUFFIX, "w") as f:
+            f.write('{"version": 0}')
+
+        with self.assertRaises(ParseException):
+            SentenceIndex.load(self.path + INDEX_SUFFIX)
+
+    def test_load_or_build_index(self):
+        index = load_or_build_index(self.path)
+        self.assertTrue(os.path.exists(self.path + INDEX_SUFFIX))
+        self.assertEqual(load_or_build_index(self.path), index)
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n# sent_id = s5\n1\tMore\tmore\tADV\t_\t_\t0\troot\t_\t_\n")
+
+        rebuilt = load_or_build_index(self.path)
+        self.assertEqual(rebuilt.sent_ids[-1], "s5")
+        self.assertTrue(SentenceIndex.load(self.path + INDEX_SUFFIX).is_current(self.path))
+
+    def test_rebuilds_corrupt_index(self):
+        for corrupt in ['{"version": 0}', '{"offsets', '{"version": %d}' % INDEX_VERSION, "[]"]:
+            with self.subTest(corrupt=corrupt):
+                with open(self.path + INDEX_SUFFIX, "w", encoding="utf-8") as f:
+                    f.write(corrupt)
+
+                self.assertEqual(load_or_build_index(self.path).sent_ids, ["s1", "s2", "s3", "s4"])
+                self.assertTrue(SentenceIndex.load(self.path + INDEX_SUFFIX).is_current(self.path))
+
+    def test_index_that_cant_be_saved(self):
+        with mock.patch.object(SentenceIndex, "save", side_effect=PermissionError):
+            index = load_or_build_index(self.path)
+            with IndexedSentenceList(self.path) as sentences:
+                self.assertEqual(len(sentences), 4)
+
+        self.assertEqual(index.sent_ids, ["s1", "s2", "s3", "s4"])
+        self.assertFalse(os.path.exists(self.path + INDEX_SUFFIX))
+
+class TestIndexedSentenceList(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "corpus.conllu")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(DATA)
+
+        self.expected = list(parse_incr(StringIO(DATA)))
+        self.sentences = IndexedSentenceList(self.path)
+
+    def tearDown(self):
+        self.sentences.close()
+        self.tempdir.cleanup()
+
+    def test_matches_parse_incr(self):
+        self.assertEqual(len(self.sentences), 4)
+        for i, expected in enumerate(self.expected):
+            self.assertEqual(self.sentences[i], expected)
+            self.assertEqual(self.sentences[i].default_fields, expected.default_fields)
+
+    def test_negative_index(self):
+        self.assertEqual(self.sentences[-1], self.expected[-1])
+
+    def test_index_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.sentences[4]
+
+    def test_slicing(self):
+        sliced = self.sentences[1:3]
+        self.assertIsInstance(sliced, SentenceList)
+        self.assertEqual(sliced, self.expected[1:3])
+
+    def test_get_by_sent_id(self):
+        self.assertEqual(self.sentences.get_by_sent_id("s3"), self.expected[2])
+        with self.assertRaises(KeyError):
+            self.sentences.get_by_sent_id("missing")
+
+    def test_custom_parsers(self):
+        sentences = IndexedSentenceList(
+            self.path,
+            fields=["ID", "FORM"],
+            field_parsers={"form": lambda line, i: line[i].upper()},
+            metadata_parsers={"sent_id": lambda key, value: (key, value.upper())},
+            strict_tabs=False,
+        )
+        with sentences:
+            self.assertEqual(sentences[0].metadata["sent_id"], "S1")
+            self.assertEqual(list(sentences[0][1].items()), [("id", 2), ("form", "DOG")])
+            self.assertEqual(sentences[1][0]["form"], "HELLO")
+            self.assertEqual(sentences[0][0], sentences[0][0])
+
+        self.assertIsNone(sentences._file)
+
+    def test_index_from_other_file(self):
+        index = SentenceIndex([len(DATA) + 10], [5], [None])
+        with IndexedSentenceList(self.path, index=index) as sentences:
+            with self.assertRaises(ParseException):
+                sentences[0]
+
+    def test_repr(self):
+        self.assertEqual(repr(self.sentences), f"IndexedSentenceList<{self.path}, 4 sentences>")
+
+class TestMappedSentenceList(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "corpus.conllu")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(DATA)
+
+        self.expected = list(parse_incr(StringIO(DATA)))
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_matches_parse_incr(self):
+        with MappedSentenceList(self.path) as sentences:
+            self.assertEqual(len(sentences), 4)
+            self.assertEqual(list(sentences), self.expected)
+            self.assertEqual(sentences.get_by_sent_id("s2"), self.expected[1])
+            self.assertEqual(sentences[-2:], self.expected[-2:])
+
+        self.assertFalse(os.path.exists(self.path + INDEX_SUFFIX))
+
+    def test_read_returns_raw_sentence(self):
+        with MappedSentenceList(self.path) as sentences:
+            raw = sentences.read(2)
+            self.assertEqual(raw, b"# sent_id = s3\n1\tthere\t0\n")
+
+    def test_read_stays_valid_after_close(self):
+        sentences = MappedSentenceList(self.path)
+        raw = sentences.read(2)
+        sentences.close()
+        self.assertEqual(raw, b"# sent_id = s3\n1\tthere\t0\n")
+        with self.assertRaisesRegex(ValueError, "closed"):
+            sentences.read(2)
+
+    def test_with_saved_index(self):
+        index = load_or_build_index(self.path)
+        with MappedSentenceList(self.path, index=index) as sentences:
+            self.assertIs(sentences.sentence_index, index)
+            self.assertEqual(sentences[1], self.expected[1])
+
+    def test_empty_file(self):
+        with open(self.path, "w"):
+            pass
+
+        with MappedSentenceList(self.path) as sentences:
+            self.assertEqual(len(sentences), 0)
+            self.assertEqual(list(sentences), [])
+
+    def test_repr(self):
+        with MappedSentenceList(self.path) as sentences:
+            self.assertEqual(repr(sentences), f"MappedSentenceList<{self.path}, 4 sentences>")
@@ -6,7 +6,8 @@ from textwrap import dedent
 import pytest
 
 from conllu import parse, parse_incr, parse_tree, parse_tree_incr
-from conllu.models import Token, TokenList
+from conllu.columnar import parse_columnar
+from conllu.models import CompactToken, LazyToken, Token, TokenList
 from conllu.parser import parse_dict_value, parse_int_value
 from tests.helpers import capture_print
 
@@ -146,6 +147,33 @@ class TestParse(unittest.TestCase):
     def test_parse_incr(self):
         self.assertEqual(parse(self.data), list(parse_incr(StringIO(self.data))))
 
+    def test_parse_columnar_with_workers(self):
+        self.assertEqual(parse(self.data), list(parse_columnar(StringIO(self.data), workers=2)))
+
+    def test_parse_compact(self):
+        sentences = parse(self.data, compact=True)
+        self.assertEqual(sentences, parse(self.data))
+        self.assertIsInstance(sentences[0][0], CompactToken)
+        self.assertEqual(sentences[0].serialize(), self.data)
+        self.assertEqual(sentences[0].to_tree(), parse_tree(self.data)[0])
+
+    def test_parse_columns(self):
+        sentences = parse(self.data, columns=["form", "upos"])
+        self.assertEqual(sentences[0][0], Token([("form", "The"), ("upos", "DET")]))
+        self.assertEqual(sentences[0].metadata["text"], "The quick brown fox jumps over the lazy dog.")
+
+    def test_parse_with_filters(self):
+        data = self.data + "# text = Broken\nx\ty\n\n"
+        self.assertEqual(parse(data, token_filter={"lemma": "jump"}), parse(self.data))
+        self.assertEqual(parse(data, metadata_filter={"text": lambda text: text.startswith("The")}), parse(self.data))
+
+    def test_parse_lazy(self):
+        sentences = parse(self.data, lazy=True)
+        self.assertIsInstance(sentences[0][0], LazyToken)
+        self.assertEqual(sentences[0].serialize(), self.data)
+        self.assertEqual(sentences, parse(self.data))
+        self.assertEqual(sentences[0].serialize(), self.data)
+
     def test_parse_incr_invalid_file(self):
         with self.assertRaises(FileNotFoundError):
             list(parse_incr("SOME STRING DATA"))
@@ -154,6 +182,31 @@ class TestParse(unittest.TestCase):
         self.assertEqual(parse_tree(self.data), list(parse_tree_incr(StringIO(self.data))))
 
 
+@pytest.mark.integration
+class TestParseStrictTabs(unittest.TestCase):
+    data = dedent("""\
+        1\tNew  York\tNew  York
+
+        1\tThe\tthe
+    """)
+
+    def test_detects_tab_separated_files(self):
+        sentences = parse("1\tThe\tthe\n\n1\tNew  York\tNew  York\n")
+        self.assertEqual(sentences[1][0]["form"], "New  York")
+
+    def test_detects_space_separated_files(self):
+        sentences = parse(self.data)
+        self.assertEqual(sentences[0][0]["form"], "New")
+
+    def test_force_strict_tabs(self):
+        sentences = parse(self.data, strict_tabs=True)
+        self.assertEqual(sentences[0][0]["form"], "New  York")
+
+    def test_disable_strict_tabs(self):
+        sentences = parse("1\tThe\tthe\n\n1\tNew  York\tNew  York\n", strict_tabs=False)
+        self.assertEqual(sentences[1][0]["form"], "New")
+
+
 @pytest.mark.integration
 class TestTrickyCases(unittest.TestCase):
     maxDiff = None
@@ -0,0 +1,102 @@
+import unittest
+from io import StringIO
+from textwrap import dedent
+
+from conllu import parse, parse_incr
+from conllu.intern import InternTable
+
+DATA = dedent("""\
+    # sent_id = 1
+    1\tThe\tthe\tDET\tDT\tDefinite=Def|PronType=Art\t2\tdet\t_\tSpaceAfter=No
+    2\tdog\tdog\tNOUN\tNN\tNumber=Sing\t0\troot\t0:root\t_
+
+    # sent_id = 2
+    # global.columns = ID FORM UPOS FEATS
+    1\tthe\tDET\tDefinite=Def|Typo
+
+""")
+
+
+def upper_form(line, i):
+    return line[i].upper()
+
+
+class TestInternTable(unittest.TestCase):
+    def test_intern(self):
+        table = InternTable()
+        first = "".join(["do", "g"])
+        second = "".join(["d", "og"])
+        self.assertIsNot(first, second)
+
+        self.assertIs(table.intern(first), first)
+        self.assertIs(table.intern(second), first)
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.stats(), {"size": 1, "max_size": 1_000_000, "hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    def test_max_size(self):
+        table = InternTable(max_size=1)
+        table.intern("a")
+        second = "".join(["b", "c"])
+        self.assertIs(table.intern(second), second)
+        self.assertIsNot(table.intern("".join(["b", "c"])), second)
+        self.assertIs(table.intern("".join(["a"])), "a")
+        self.assertEqual(table.stats()["size"], 1)
+        self.assertEqual((table.hits, table.misses), (1, 3))
+
+    def test_intern_value(self):
+        table = InternTable()
+        number = table.intern("".join(["Si", "ng"]))
+        value = table.intern_value({"Number": "".join(["Si", "ng"]), "Typo": None, 1: 2})
+        self.assertEqual(value, {"Number": "Sing", "Typo": None, 1: 2})
+        self.assertIs(value["Number"], number)
+        self.assertEqual(table.intern_value([1, 2]), [1, 2])
+        self.assertEqual(table.hit_rate, 0.25)
+
+    def test_empty_table(self):
+        table = InternTable()
+        self.assertEqual(table.hit_rate, 0.0)
+        self.assertEqual(repr(table), "InternTable<0 strings, hit rate 0.0%>")
+
+
+class TestParseIntern(unittest.TestCase):
+    def test_values_are_shared(self):
+        sentences = parse(DATA, intern=True)
+        self.assertEqual(sentences, parse(DATA))
+
+        self.assertIs(sentences[0][0]["upos"], sentences[1][0]["upos"])
+        self.assertIs(sentences[0][0]["lemma"], sentences[1][0]["form"])
+        self.assertIs(sentences[0][1]["form"], sentences[0][1]["lemma"])
+        self.assertIs(next(iter(sentences[0][0]["feats"])), next(iter(sentences[1][0]["feats"])))
+        self.assertIs(sentences[0][0]["feats"]["Definite"], sentences[1][0]["feats"]["Definite"])
+
+    def test_shared_table(self):
+        table = InternTable()
+        first = parse(DATA, intern=table)
+        misses = table.misses
+        second = list(parse_incr(StringIO(DATA), intern=table))
+
+        self.assertIs(first[0][1]["form"], second[0][1]["form"])
+        self.assertEqual(table.misses, misses)
+        self.assertGreater(table.hits, 0)
+
+    def test_each_call_gets_a_table(self):
+        first = parse(DATA, intern=True)
+        second = parse(DATA, intern=True)
+        self.assertIsNot(first[0][1]["form"], second[0][1]["form"])
+
+    def test_skips_numbers_and_ids(self):
+        table = InternTable()
+        sentences = parse(DATA, intern=table)
+        self.assertNotIn("2", table.strings)
+        self.assertNotIn("0:root", table.strings)
+        self.assertEqual(sentences[0][1]["deps"], [("root", 0)])
+
+    def test_custom_parsers_and_compact_and_lazy(self):
+        table = InternTable()
+        sentences = parse(DATA, field_parsers={"form": upper_form}, compact=True, intern=table)
+        self.assertEqual(sentences[0][1]["form"], "DOG")
+        self.assertIn("DOG", table.strings)
+
+        sentences = parse(DATA, lazy=True, intern=table)
+        self.assertIs(sentences[0][1]["form"], table.strings["dog"])
+        self.assertEqual(sentences[0].serialize(), parse(DATA)[0].serialize())
@@ -1,9 +1,12 @@
 import pickle
+import sys
 import tempfile
 import unittest
 from textwrap import dedent
 
-from conllu.models import Metadata, SentenceGenerator, SentenceList, Token, TokenList, TokenTree
+from conllu.models import (
+    CompactToken, LazyToken, Metadata, SentenceGenerator, SentenceList, Token, TokenList, TokenTree, traverse_dict,
+)
 from conllu.parser import ParseException, serialize
 from tests.helpers import capture_print
 
@@ -49,6 +52,175 @@ class TestToken(unittest.TestCase):
         self.assertEqual(str(Token({"id": 1})), "id=1")
         self.assertEqual(str(Token({"x": 1})), "")
 
+class TestCompactToken(unittest.TestCase):
+    def test_works_like_token(self):
+        data = {"id": 1, "form": "The", "upostag": "DET", "feats": {"Definite": "Def"}}
+        token = CompactToken(data)
+        self.assertEqual(token, Token(data))
+        self.assertEqual(Token(data), token)
+        self.assertEqual(list(token), ["id", "form", "upostag", "feats"])
+        self.assertEqual(list(token.values()), [1, "The", "DET", {"Definite": "Def"}])
+        self.assertEqual(len(token), 4)
+        self.assertEqual(repr(token), repr(data))
+        self.assertIn("form", token)
+        self.assertNotIn("upos", token)
+
+    def test_aliases(self):
+        token = CompactToken([("id", 1), ("xpos", "DT"), ("upostag", "DET")])
+        self.assertEqual(token["xpostag"], "DT")
+        self.assertEqual(token["upos"], "DET")
+        self.assertEqual(token.get("xpostag"), "DT")
+        self.assertEqual(token.get("upos"), "DET")
+        self.assertEqual(CompactToken({"id": 1})["upos"], None)
+
+    def test_invalid_key_access(self):
+        token = CompactToken({"id": 1})
+        with self.assertRaises(KeyError):
+            token["inexistent_value"]
+
+        self.assertEqual(token.get("inexistent_value"), None)
+        self.assertEqual(token.get("inexistent_value", "HEJ"), "HEJ")
+
+    def test_set_and_delete(self):
+        token = CompactToken({"id": 1, "form": "The"})
+        token["form"] = "A"
+        token["lemma"] = "a"
+        self.assertEqual(token, {"id": 1, "form": "A", "lemma": "a"})
+
+        del token["id"]
+        self.assertEqual(list(token.items()), [("form", "A"), ("lemma", "a")])
+
+        with self.assertRaises(KeyError):
+            del token["id"]
+
+    def test_shares_fields(self):
+        fields = ("id", "form")
+        first = CompactToken.from_values(fields, (1, "The"))
+        second = first.copy()
+        second["form"] = "A"
+        self.assertIs(second._fields, fields)
+        self.assertEqual(first["form"], "The")
+
+    def test_no_dict(self):
+        with self.assertRaises(AttributeError):
+            CompactToken().__dict__
+
+    def test_str(self):
+        self.assertEqual(str(CompactToken({"id": 1, "form": "The"})), "The")
+        self.assertEqual(str(CompactToken({"id": 1})), "id=1")
+        self.assertEqual(str(CompactToken({"x": 1})), "")
+
+    def test_pickle(self):
+        token = CompactToken({"id": 1, "form": "The"})
+        self.assertEqual(pickle.loads(pickle.dumps(token)), token)
+        self.assertEqual(pickle.loads(pickle.dumps(token, protocol=0)), token)
+
+    def test_in_tokenlist(self):
+        tokenlist = TokenList([
+            CompactToken({"id": 1, "form": "The", "head": 2, "deprel": "det"}),
+            CompactToken({"id": 2, "form": "dog", "head": 0, "deprel": "root"}),
+        ])
+        self.assertIsInstance(tokenlist[0], CompactToken)
+        self.assertIsInstance(tokenlist.filter(id=2)[0], CompactToken)
+        self.assertEqual(tokenlist.serialize(), "1\tThe\t2\tdet\n2\tdog\t0\troot\n\n")
+        self.assertEqual(tokenlist.to_tree().children[0].token["form"], "The")
+
+class TestLazyToken(unittest.TestCase):
+    fields = ("id", "form", "feats")
+    columns = (
+        (0, "id", lambda line, i: int(line[i])),
+        (1, "form", None),
+        (2, "feats", lambda line, i: dict([line[i].split("=")])),
+    )
+
+    def make_token(self, line="1\tThe\tDefinite=Def"):
+        return LazyToken.from_line(self.fields, line.split("\t"), self.columns)
+
+    def test_parses_on_first_access(self):
+        token = self.make_token()
+        self.assertIs(token._values[0], token._values[2])
+        self.assertEqual(token["form"], "The")
+        self.assertEqual(token["feats"], {"Definite": "Def"})
+        self.assertIs(token["feats"], token["feats"])
+        self.assertEqual(token, {"id": 1, "form": "The", "feats": {"Definite": "Def"}})
+        self.assertEqual(repr(token), "{'id': 1, 'form': 'The', 'feats': {'Definite': 'Def'}}")
+
+    def test_errors_are_raised_on_access(self):
+        token = self.make_token("x\tThe\tDefinite=Def")
+        self.assertEqual(token["form"], "The")
+        with self.assertRaises(ValueError):
+            token["id"]
+
+        def fail(line, i):
+            raise ParseException("broken")
+
+        token = LazyToken.from_line(("id",), ["1"], ((0, "id", fail),))
+        with self.assertRaises(ParseException) as context:
+            token["id"]
+
+        self.assertEqual(str(context.exception), "Failed parsing field 'id': broken")
+
+    def test_serializes_raw_values(self):
+        token = self.make_token("01\tThe\tDefinite=Def")
+        self.assertEqual(token.serialize_values(), ["01", "The", "Definite=Def"])
+        self.assertEqual(token["id"], 1)
+        self.assertEqual(token.serialize_values(), ["1", "The", "Definite=Def"])
+
+        token["feats"]["Definite"] = "Ind"
+        self.assertEqual(serialize(TokenList([token])), "1\tThe\tDefinite=Ind\n\n")
+
+    def test_raw_line(self):
+        line = "01\tThe\tDefinite=Def"
+        token = LazyToken.from_line(self.fields, line.split("\t"), self.columns, line)
+        self.assertEqual(token.raw_line, line)
+
+        # Reading values that can't be changed in place keeps the line
+        self.assertEqual((token["id"], token["form"]), (1, "The"))
+        self.assertEqual(token.copy().raw_line, line)
+        self.assertEqual(serialize(TokenList([token])), line + "\n\n")
+
+        token["feats"]["Definite"] = "Ind"
+        self.assertIsNone(token.raw_line)
+        self.assertEqual(token.serialize_line(), "1\tThe\tDefinite=Ind")
+
+        token = LazyToken.from_line(self.fields, line.split("\t"), self.columns, line)
+        token["form"] = "A"
+        self.assertIsNone(token.raw_line)
+        self.assertEqual(token.serialize_line(), "1\tA\tDefinite=Def")
+
+        self.assertIsNone(self.make_token().raw_line)
+        self.assertIsNone(LazyToken({"id": 1}).raw_line)
+
+    def test_set_and_delete(self):
+        token = self.make_token()
+        token["lemma"] = "the"
+        self.assertEqual(token, {"id": 1, "form": "The", "feats": {"Definite": "Def"}, "lemma": "the"})
+        self.assertEqual(token.serialize_values(), ["1", "The", "Definite=Def", "the"])
+
+        token = self.make_token()
+        del token["id"]
+        self.assertEqual(list(token.items()), [("form", "The"), ("feats", {"Definite": "Def"})])
+
+    def test_copy(self):
+        token = self.make_token()
+        copy = token.copy()
+        self.assertEqual(copy["id"], 1)
+        self.assertIs(token._values[0], copy._values[2])
+
+        token["id"] = 2
+        self.assertEqual(token.copy(), {"id": 2, "form": "The", "feats": {"Definite": "Def"}})
+        self.assertEqual(copy["id"], 1)
+
+    def test_pickle(self):
+        token = pickle.loads(pickle.dumps(self.make_token()))
+        self.assertIs(type(token), CompactToken)
+        self.assertEqual(token, {"id": 1, "form": "The", "feats": {"Definite": "Def"}})
+
+    def test_from_mapping(self):
+        token = LazyToken({"id": 1, "form": "The"})
+        self.assertEqual(token["id"], 1)
+        self.assertEqual(token.serialize_values(), ["1", "The"])
+
 class TestTokenList(unittest.TestCase):
     def test_constructor(self):
         with self.assertRaises(ParseException):
@@ -244,6 +416,29 @@ class TestParsingTrickyTrees(unittest.TestCase):
         )
         self.assertTreeEqual(tokenlist.to_tree(), tree)
 
+    def test_skips_unreachable_nodes(self):
+        tokenlist = TokenList([
+            Token([("id", 1), ("form", "dog"), ("head", 0)]),
+            Token([("id", 2), ("form", "a"), ("head", 3)]),
+            Token([("id", 3), ("form", "the"), ("head", 2)]),
+            Token([("id", 4), ("form", "big"), ("head", 7)]),
+        ])
+        tree = TokenTree(token=Token([("id", 1), ("form", "dog"), ("head", 0)]), children=[])
+        self.assertTreeEqual(tokenlist.to_tree(), tree)
+
+    def test_deep_tree(self):
+        length = sys.getrecursionlimit() * 2
+        tokenlist = TokenList([Token({"id": i, "form": str(i), "head": i - 1}) for i in range(1, length + 1)])
+        tree = tokenlist.to_tree()
+
+        depth = 0
+        while tree.children:
+            tree = tree.children[0]
+            depth += 1
+
+        self.assertEqual(depth, length - 1)
+        self.assertEqual(tree.token["id"], length)
+
     def test_no_root_nodes(self):
         tokenlist = TokenList([
             Token([('id', 1), ('form', 'To'), ('head', 1)]),
@@ -428,6 +623,14 @@ class TestFilter(unittest.TestCase):
         )
 
 
+class TestTraverseDict(unittest.TestCase):
+    def test_traverse(self):
+        token = Token({"id": 1, "feats": {"Number": "Sing"}, "misc": None})
+        self.assertEqual(traverse_dict(token, "id"), 1)
+        self.assertEqual(traverse_dict(token, "feats__Number"), "Sing")
+        self.assertEqual(traverse_dict(token, "misc__SpaceAfter"), None)
+        self.assertEqual(traverse_dict(token, "unknown"), None)
+
 class TestTokenTree(unittest.TestCase):
     def test_eq(self):
         metadata = {"meta": "data"}
@@ -495,6 +698,21 @@ class TestSerializeTree(unittest.TestCase):
             """)
         )
 
+    def test_flatten_deep_tree(self):
+        length = sys.getrecursionlimit() * 2
+        tokenlist = TokenList([Token({"id": i, "head": (i + 1) % (length + 1)}) for i in range(1, length + 1)])
+        self.assertEqual(tokenlist.to_tree().to_list(), tokenlist)
+
+    def test_flatten_unusual_ids(self):
+        trees = [
+            TokenTree(token={"id": 5}, children=[TokenTree(token={"id": 3}, children=[])]),
+            TokenTree(token={"id": 2}, children=[TokenTree(token={"id": 1.5}, children=[])]),
+            TokenTree(token={"id": 1}, children=[TokenTree(token={"id": 1}, children=[])]),
+        ]
+        self.assertEqual(trees[0].to_list(), [{"id": 3}, {"id": 5}])
+        self.assertEqual(trees[1].to_list(), [{"id": 1.5}, {"id": 2}])
+        self.assertEqual(trees[2].to_list(), [{"id": 1}, {"id": 1}])
+
 
 class TestPrintTree(unittest.TestCase):
     def test_print_empty_list(self):
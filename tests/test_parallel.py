@@ -0,0 +1,207 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from textwrap import dedent
+
+from conllu import parse
+from conllu.columnar import ColumnarSentenceList, parse_columnar
+from conllu.models import Token
+from conllu.parallel import (
+    _file_ranges, _init_worker, _parse_chunk, _parse_range, _source_path, parse_columnar_parallel,
+)
+from conllu.parser import DEFAULT_FIELDS, parse_token_and_metadata
+
+
+def upper_form(line, i):
+    return line[i].upper()
+
+def split_tags(key, value):
+    return key, value.split("|")
+
+
+class TestParseColumnarParallel(unittest.TestCase):
+    data = dedent("""\
+        # sent_id = 1
+        1\tThe\tthe\tDET\tDT\tDefinite=Def|PronType=Art\t2\tdet\t_\t_
+        2\tdog\tdog\tNOUN\tNN\tNumber=Sing\t0\troot\t_\t_
+
+        # global.columns = ID FORM HEAD
+        # sent_id = 2
+        1\tHello\t0
+
+        # sent_id = 3
+        # tags = A|B
+        1\tthere\t0
+    """)
+
+    def test_keeps_order_and_global_columns(self):
+        sentences = list(parse_columnar_parallel(StringIO(self.data), workers=2, chunk_size=1))
+        self.assertEqual([sentence.metadata["sent_id"] for sentence in sentences], ["1", "2", "3"])
+        self.assertEqual(sentences[0][1]["feats"], {"Number": "Sing"})
+        self.assertEqual(list(sentences[1]), [Token([("id", 1), ("form", "Hello"), ("head", 0)])])
+        self.assertEqual(sentences[2].default_fields, ("id", "form", "head"))
+
+    def test_custom_parsers(self):
+        sentences = list(parse_columnar_parallel(
+            StringIO(self.data),
+            workers=2,
+            field_parsers={"form": upper_form},
+            metadata_parsers={"tags": split_tags},
+        ))
+        self.assertEqual([sentence[0]["form"] for sentence in sentences], ["THE", "HELLO", "THERE"])
+        self.assertEqual(sentences[2].metadata["tags"], ["A", "B"])
+
+    def test_bounded_in_flight_chunks(self):
+        data = "".join("{}\thej\n\n".format(i) for i in range(1, 10))
+        sentences = parse_columnar_parallel(StringIO(data), workers=1, chunk_size=1)
+        self.assertEqual([sentence[0]["id"] for sentence in sentences], list(range(1, 10)))
+
+    def test_merges_columns(self):
+        data = TestParseFileInParallel.data
+        expected = parse_columnar(StringIO(data))
+        for chunk_size in [1, 2, 100]:
+            with self.subTest(chunk_size=chunk_size):
+                corpus = parse_columnar_parallel(StringIO(data), 2, chunk_size=chunk_size)
+                self.assertEqual(list(corpus), list(expected))
+                self.assertEqual(len(corpus.values), len(expected.values))
+
+    def test_empty(self):
+        self.assertEqual(list(parse_columnar_parallel(StringIO(""), workers=2)), [])
+
+    def test_extend_with_columnar(self):
+        first, second = parse("1\tThe\tthe\n\n1\tdog\n"), parse("1\tcat\t_\tNOUN\n\n# a = b\n1\tThe\n")
+        corpus = ColumnarSentenceList(first)
+        corpus.extend(ColumnarSentenceList(second))
+        self.assertEqual(list(corpus), first + second)
+        self.assertEqual(corpus.column("upos"), [None, None, "NOUN", None])
+
+class TestParseChunk(unittest.TestCase):
+    def tearDown(self):
+        _init_worker(None, None)
+
+    def test_reuses_plans_within_chunk(self):
+        _init_worker({"form": upper_form}, None)
+        corpus = _parse_chunk([
+            (DEFAULT_FIELDS, True, ["# sent_id = 1"], ["1\tThe"]),
+            (DEFAULT_FIELDS, True, [], ["1\tdog"]),
+            (("id", "form"), False, [], ["1  cat"]),
+        ])
+        self.assertIsInstance(corpus, ColumnarSentenceList)
+        self.assertEqual(list(corpus), [
+            parse_token_and_metadata("# sent_id = 1\n1\tTHE"),
+            parse_token_and_metadata("1\tDOG"),
+            parse_token_and_metadata("1\tCAT", fields=("id", "form")),
+        ])
+
+class TestParseFileInParallel(unittest.TestCase):
+    data = dedent("""\
+        # global.columns = ID FORM HEAD
+
+        # sent_id = 1
+        1\tThe\t2
+        2\tdog\t0
+
+        # sent_id = 2
+        # global.columns = ID FORM
+        # global.columns = ID HEAD
+        1\tHello
+
+        # sent_id = 3
+        # global.columns =ignored
+        1\tthere
+
+
+        # global.columns =
+        # sent_id = 4
+        1\tBye\tbye\tINTJ\t_\tPolite=Form\t0\troot\t_\t_
+    """)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "corpus.conllu")
+        self.write(self.data)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        _init_worker(None, None)
+
+    def write(self, data, newline=None):
+        with open(self.path, "w", encoding="utf-8", newline=newline) as f:
+            f.write(data)
+
+    def test_every_chunk_size(self):
+        expected = parse(self.data)
+        for chunk_bytes in range(1, len(self.data) + 2):
+            with self.subTest(chunk_bytes=chunk_bytes):
+                ranges = _file_ranges(self.path, chunk_bytes)
+                self.assertEqual(ranges[0][0], 0)
+                self.assertEqual(ranges[-1][1], len(self.data))
+
+                sentences = [
+                    sentence for start, end, global_fields in ranges
+                    for sentence in _parse_range(self.path, start, end, global_fields, True)
+                ]
+                self.assertEqual(sentences, expected)
+                self.assertEqual([sentence.default_fields for sentence in sentences], [
+                    sentence.default_fields for sentence in expected
+                ])
+
+    def test_reads_file_in_workers(self):
+        self.write(self.data.replace("\n", "\r\n"), newline="")
+        with open(self.path, encoding="utf-8") as f:
+            corpus = parse_columnar_parallel(f, workers=2, chunk_bytes=20)
+
+        self.assertEqual(list(corpus), parse(self.data))
+        self.assertEqual(corpus[1][0], Token([("id", 1), ("form", "The"), ("head", 2)]))
+
+    def test_workers(self):
+        _init_worker(None, None, fields=["id", "form"])
+        ranges = _file_ranges(self.path, 20)
+        sentences = [sentence for range_ in ranges for sentence in _parse_range(self.path, *range_, False)]
+        self.assertEqual(sentences, parse(self.data, fields=["id", "form"], strict_tabs=False))
+
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(parse_columnar_parallel(f, workers=2, strict_tabs=True)), 5)
+
+    def test_detects_tabs(self):
+        self.write("1  dog\n\n1\tNew  York\n")
+        with open(self.path, encoding="utf-8") as f:
+            sentences = list(parse_columnar_parallel(f, workers=2))
+
+        self.assertEqual(sentences[1][0], Token([("id", 1), ("form", "New"), ("lemma", "York")]))
+
+        self.write("# newdoc\n")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(list(parse_columnar_parallel(f, workers=2))), 1)
+
+        self.write("")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(list(parse_columnar_parallel(f, workers=2)), [])
+
+    def test_source_path(self):
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(_source_path(f), self.path)
+            f.readline()
+            self.assertIsNone(_source_path(f))
+
+        with open(self.path, encoding="latin-1") as f:
+            self.assertIsNone(_source_path(f))
+
+        with open(self.path, encoding="utf-8") as f:
+            f.close()
+            self.assertIsNone(_source_path(f))
+
+        self.assertIsNone(_source_path(StringIO(self.data)))
+
+class TestParseColumnarInParallel(unittest.TestCase):
+    def test_parse_columnar_with_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus.conllu")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(TestParseFileInParallel.data)
+
+            with open(path, encoding="utf-8") as f:
+                corpus = parse_columnar(f, workers=2, chunk_bytes=20)
+
+        self.assertEqual(list(corpus), parse(TestParseFileInParallel.data))
@@ -1,12 +1,19 @@
+import random
+import re
+import tempfile
 import unittest
-from io import StringIO
+from collections import OrderedDict
+from io import BytesIO, StringIO
 from textwrap import dedent
 
-from conllu.models import Token, TokenList
+from conllu import parse, parse_incr, serialize_incr
+from conllu.models import CompactToken, LazyToken, Metadata, Token, TokenList
 from conllu.parser import (
-    DEFAULT_FIELDS, ParseException, head_to_token, parse_comment_line, parse_dict_value, parse_id_value,
-    parse_int_value, parse_line, parse_nullable_value, parse_paired_list_value, parse_sentences,
-    parse_token_and_metadata, serialize, serialize_field,
+    DEFAULT_FIELD_PARSERS, DEFAULT_FIELDS, ID_DOT_ID, ID_RANGE, ID_SINGLE, INTEGER, MULTI_DEPS_PATTERN, ParseException,
+    _filter_sentences, _plan_sentences, compile_parse_plan, detect_strict_tabs, head_to_token, parse_cache_info,
+    parse_comment_line, parse_dict_value, parse_id_value, parse_int_value, parse_line, parse_lines,
+    parse_nullable_value, parse_paired_list_value, parse_sentence_lines, parse_sentences, parse_token_and_metadata,
+    serialize, serialize_field, set_parse_cache_size,
 )
 
 
@@ -75,6 +82,148 @@ class TestParseSentencesGenerator(unittest.TestCase):
             '1\thej\n2\tdå',
         ])
 
+class TestParseSentenceLines(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(list(parse_sentence_lines(StringIO(""))), [])
+
+    def test_classifies_lines(self):
+        data = dedent("""\
+            # sent_id = 1
+            1\thej
+            # inside = yes
+            2\tdå
+
+            \t
+              # sent_id = 2
+            1\thej  \n""")
+        self.assertEqual(list(parse_sentence_lines(StringIO(data))), [
+            (["# sent_id = 1", "# inside = yes"], ["1\thej", "2\tdå"]),
+            (["# sent_id = 2"], ["1\thej"]),
+        ])
+
+    def test_only_comments(self):
+        self.assertEqual(list(parse_sentence_lines(StringIO("# newdoc\n\n"))), [
+            (["# newdoc"], []),
+        ])
+
+class TestPlanSentences(unittest.TestCase):
+    def test_global_columns_change_plan(self):
+        data = dedent("""\
+            1\thej\thej
+
+            # global.columns = ID FORM
+            1\thej
+
+            1\tdå
+
+            # global.columns = ID FORM
+            1\thej
+
+            # global.columns =
+            1\thej
+        """)
+        plans = [plan for plan, _, _ in _plan_sentences(StringIO(data))]
+        self.assertEqual(plans[0].fields, DEFAULT_FIELDS)
+        self.assertEqual(plans[1].fields, ("id", "form"))
+        self.assertIs(plans[2], plans[1])
+        self.assertIs(plans[3], plans[1])
+        self.assertIs(plans[4], plans[0])
+
+    def test_global_columns_with_projection(self):
+        data = dedent("""\
+            1\thej\thej\tNOUN
+
+            # global.columns = UPOS ID MISC FORM
+            NOUN\t1\t_\thej
+        """)
+        plans = [plan for plan, _, _ in _plan_sentences(StringIO(data), columns=["form", "upos"])]
+        self.assertEqual(plans[0].token_fields, ("form", "upos"))
+        self.assertEqual(plans[1].token_fields, ("upos", "form"))
+        self.assertEqual([i for i, _, _ in plans[1].columns], [0, 3])
+
+    def test_detects_tabs_from_first_sentence_with_tokens(self):
+        data = "# newdoc\n\n1\thej\n\n1  hej\n"
+        plans = [plan for plan, _, _ in _plan_sentences(StringIO(data))]
+        self.assertEqual([plan.strict_tabs for plan in plans], [False, True, True])
+
+    def test_empty_global_columns_resets_fields(self):
+        data = "# global.columns = ID FORM HEAD\n1\tdog\t0\n\n# global.columns =\n1\tcat\tcat\n"
+        self.assertEqual([list(sentence[0].keys()) for sentence in parse(data)], [
+            ["id", "form", "head"], ["id", "form", "lemma"],
+        ])
+        self.assertEqual(list(parse(data, fields=["id", "misc"])[1][0].keys()), ["id", "misc"])
+
+    def test_global_columns_before_first_tokens(self):
+        data = "# global.columns = ID FORM HEAD\n\n1\tdog\t0\n"
+        plans = [plan for plan, _, _ in _plan_sentences(StringIO(data))]
+        self.assertEqual([plan.fields for plan in plans], [("id", "form", "head")] * 2)
+        self.assertTrue(plans[1].strict_tabs)
+        self.assertEqual(parse(data)[1][0], Token([("id", 1), ("form", "dog"), ("head", 0)]))
+
+    def test_strict_tabs_given(self):
+        plans = [plan for plan, _, _ in _plan_sentences(StringIO("1  hej\n"), strict_tabs=True)]
+        self.assertTrue(plans[0].strict_tabs)
+
+class TestFilterSentences(unittest.TestCase):
+    data = dedent("""\
+        # newdoc id = a
+        # sent_id = 1
+        1\tThe\tthe\tDET
+        2\tdogs\tdog\tNOUN
+
+        # sent_id = 2
+        x\tbroken\tbroken\tVERB
+
+        # global.columns = ID UPOSTAG LEMMA
+        # sent_id = 3
+        1\tNOUN\tdog
+    """)
+
+    def sent_ids(self, **kwargs):
+        planned = _filter_sentences(_plan_sentences(StringIO(self.data)), **kwargs)
+        return [comment_lines[-1][-1] for _, comment_lines, _ in planned]
+
+    def test_no_filters(self):
+        self.assertEqual(self.sent_ids(), ["1", "2", "3"])
+
+    def test_metadata_filter(self):
+        self.assertEqual(self.sent_ids(metadata_filter={"sent_id": "2"}), ["2"])
+        self.assertEqual(self.sent_ids(metadata_filter={"newdoc id": "a"}), ["1"])
+        self.assertEqual(self.sent_ids(metadata_filter={"sent_id": lambda value: value != "2"}), ["1", "3"])
+
+    def test_metadata_filter_uses_metadata_parsers(self):
+        metadata_parsers = {"sent_id": lambda key, value: ("id", int(value))}
+        self.assertEqual(self.sent_ids(metadata_filter={"id": 3}, metadata_parsers=metadata_parsers), ["3"])
+
+    def test_token_filter_on_raw_values(self):
+        self.assertEqual(self.sent_ids(token_filter={"lemma": "dog"}), ["1", "3"])
+        self.assertEqual(self.sent_ids(token_filter={"id": "x"}), ["2"])
+        self.assertEqual(self.sent_ids(token_filter={"lemma": "dog", "upos": "NOUN"}), ["1", "3"])
+        self.assertEqual(self.sent_ids(token_filter={"lemma": "the", "upos": "NOUN"}), [])
+        self.assertEqual(self.sent_ids(token_filter={"form": lambda form: (form or "").startswith("b")}), ["2"])
+
+    def test_token_filter_missing_field(self):
+        self.assertEqual(self.sent_ids(token_filter={"deprel": None}), ["1", "2", "3"])
+        self.assertEqual(self.sent_ids(token_filter={"unknown": "dog"}), [])
+
+    def test_both_filters(self):
+        self.assertEqual(self.sent_ids(metadata_filter={"sent_id": "1"}, token_filter={"lemma": "dog"}), ["1"])
+
+class TestParseLines(unittest.TestCase):
+    def test_parse_lines(self):
+        plan = compile_parse_plan(["id", "form"])
+        tokenlist = parse_lines(["# sent_id = 1", "# newdoc"], ["1\thej", "2\tdå"], plan)
+        self.assertEqual(tokenlist, TokenList([
+            Token([("id", 1), ("form", "hej")]),
+            Token([("id", 2), ("form", "då")]),
+        ], Metadata([("sent_id", "1"), ("newdoc", None)])))
+        self.assertEqual(tokenlist.default_fields, ("id", "form"))
+
+    def test_custom_metadata_parsers(self):
+        plan = compile_parse_plan(["id", "form"])
+        tokenlist = parse_lines(["# tags = A|B"], [], plan, {"tags": lambda key, value: (key, value.split("|"))})
+        self.assertEqual(tokenlist.metadata, Metadata([("tags", ["A", "B"])]))
+
 class TestParseTokenAndMetadata(unittest.TestCase):
     def test_empty(self):
         with self.assertRaises(ParseException):
@@ -243,6 +392,153 @@ class TestParseTokenAndMetadata(unittest.TestCase):
             Token({"id": 3, "form": "_"}),  # Form is set to default value
         ])
 
+class TestCompileParsePlan(unittest.TestCase):
+    def test_default_fields(self):
+        plan = compile_parse_plan()
+        parsers = {field: parser for _, field, parser in plan.columns}
+        self.assertEqual(plan.fields, DEFAULT_FIELDS)
+        self.assertEqual([i for i, _, _ in plan.columns], list(range(len(DEFAULT_FIELDS))))
+        self.assertEqual(parsers["id"], DEFAULT_FIELD_PARSERS["id"])
+        self.assertIsNone(parsers["form"])
+
+    def test_custom_parsers_are_merged_with_defaults(self):
+        field_parsers = {"form": lambda line, i: line[i].upper()}
+        plan = compile_parse_plan(["id", "form"], field_parsers)
+        self.assertEqual(plan.columns, (
+            (0, "id", DEFAULT_FIELD_PARSERS["id"]),
+            (1, "form", field_parsers["form"]),
+        ))
+
+    def test_aliases_are_resolved_once(self):
+        field_parsers = {
+            "xpos": lambda line, i: line[i] * 2,
+            "upostag": lambda line, i: line[i] * 2,
+        }
+        plan = compile_parse_plan(["xpostag", "upos"], field_parsers)
+        self.assertEqual(plan.parse_line("a\tb"), Token([("xpostag", "aa"), ("upos", "bb")]))
+
+    def test_reuse_plan_across_sentences(self):
+        plan = compile_parse_plan(["id", "form"])
+        first = parse_token_and_metadata("1\thej", plan=plan)
+        second = parse_token_and_metadata("1\tdå", plan=plan)
+        self.assertEqual(first, [Token([("id", 1), ("form", "hej")])])
+        self.assertEqual(second, [Token([("id", 1), ("form", "då")])])
+        self.assertEqual(second.default_fields, ("id", "form"))
+
+    def test_plan_overrides_fields(self):
+        plan = compile_parse_plan(["id"])
+        tokenlist = parse_token_and_metadata("1\thej", fields=["id", "form"], plan=plan)
+        self.assertEqual(tokenlist, [Token([("id", 1)])])
+
+    def test_compact(self):
+        plan = compile_parse_plan(["id", "form", "head"], compact=True)
+        tokenlist = parse_token_and_metadata("1\thej\t0\n2\tdå", plan=plan)
+        self.assertEqual(tokenlist, [
+            Token([("id", 1), ("form", "hej"), ("head", 0)]),
+            Token([("id", 2), ("form", "då")]),
+        ])
+        self.assertIsInstance(tokenlist[0], CompactToken)
+        self.assertIs(tokenlist[0]._fields, plan.fields)
+        self.assertEqual(tokenlist[1]._fields, ("id", "form"))
+
+    def test_lazy(self):
+        plan = compile_parse_plan(["id", "form", "feats"], lazy=True)
+        self.assertTrue(plan.compact)
+
+        tokenlist = parse_token_and_metadata("1\thej\tA=B\n2\tdå\n3\tx\t_\textra", plan=plan)
+        self.assertIsInstance(tokenlist[0], LazyToken)
+        self.assertIs(tokenlist[0]._fields, plan.fields)
+        self.assertIs(tokenlist[2]._fields, plan.fields)
+        self.assertEqual(tokenlist, [
+            Token([("id", 1), ("form", "hej"), ("feats", {"A": "B"})]),
+            Token([("id", 2), ("form", "då")]),
+            Token([("id", 3), ("form", "x"), ("feats", None)]),
+        ])
+
+    def test_lazy_raw_line(self):
+        plan = compile_parse_plan(["id", "form", "feats"], lazy=True)
+        self.assertEqual(plan.parse_lazy_line("1\thej\tA=B").raw_line, "1\thej\tA=B")
+        self.assertIsNone(plan.parse_lazy_line("1  hej  A=B").raw_line)
+        self.assertIsNone(plan.parse_lazy_line("1\thej").raw_line)
+        self.assertIsNone(plan.parse_lazy_line("1\thej\tA=B\textra").raw_line)
+
+        plan = compile_parse_plan(["id", "form", "feats"], lazy=True, columns=["form", "feats"])
+        self.assertIsNone(plan.parse_lazy_line("1\thej\tA=B").raw_line)
+
+    def test_lazy_errors(self):
+        plan = compile_parse_plan(["id", "form"], lazy=True)
+        token = plan.parse_lazy_line("1-x\thej")
+        self.assertEqual(token["form"], "hej")
+        with self.assertRaises(ParseException) as context:
+            token["id"]
+
+        self.assertIn("Failed parsing field 'id'", str(context.exception))
+
+        with self.assertRaises(ParseException):
+            plan.parse_lazy_line("1 hej")
+
+    def test_columns(self):
+        plan = compile_parse_plan(columns=["form", "head", "unknown"])
+        self.assertEqual(plan.fields, DEFAULT_FIELDS)
+        self.assertEqual(plan.token_fields, ("form", "head"))
+        self.assertEqual(plan.columns, ((1, "form", None), (6, "head", DEFAULT_FIELD_PARSERS["head"])))
+
+        tokenlist = parse_token_and_metadata("1\thej\thej\tNOUN\t_\t_\t0\troot\t_\t_", plan=plan)
+        self.assertEqual(tokenlist, [Token([("form", "hej"), ("head", 0)])])
+        self.assertEqual(tokenlist.default_fields, ("form", "head"))
+
+        tokenlist = parse_token_and_metadata("1\thej", columns=["form"])
+        self.assertEqual(tokenlist, [Token([("form", "hej")])])
+
+    def test_columns_with_aliases(self):
+        plan = compile_parse_plan(["id", "upostag", "xpos"], columns=["upos", "xpos"])
+        self.assertEqual(plan.token_fields, ("upostag", "xpos"))
+
+    def test_columns_compact_and_lazy(self):
+        line = "1\thej\thej\tNOUN\t_\tA=B"
+        for options in [{"compact": True}, {"lazy": True}]:
+            plan = compile_parse_plan(columns=["feats", "form", "head"], **options)
+            token = parse_token_and_metadata(line, plan=plan)[0]
+            self.assertEqual(token._fields, ("form", "feats"))
+            self.assertEqual(token, {"form": "hej", "feats": {"A": "B"}})
+
+            token = parse_token_and_metadata(line + "\t0", plan=plan)[0]
+            self.assertIs(token._fields, plan.token_fields)
+            self.assertEqual(token, {"form": "hej", "feats": {"A": "B"}, "head": 0})
+
+        self.assertEqual(parse_token_and_metadata(line, plan=plan).serialize(), "hej\tA=B\n\n")
+
+    def test_lazy_with_repeated_fields(self):
+        plan = compile_parse_plan(["id", "form", "id"], lazy=True)
+        self.assertFalse(plan.lazy)
+        self.assertTrue(plan.compact)
+
+    def test_compact_with_repeated_fields(self):
+        plan = compile_parse_plan(["id", "form", "id"], compact=True)
+        self.assertEqual(plan.parse_compact_line("1\thej\t2"), plan.parse_line("1\thej\t2"))
+
+class TestStrictTabs(unittest.TestCase):
+    def test_detect_strict_tabs(self):
+        self.assertTrue(detect_strict_tabs(["1\tThe\tthe", "2\tdog\tdog"]))
+        self.assertFalse(detect_strict_tabs(["1  The  the", "2\tdog\tdog"]))
+        self.assertFalse(detect_strict_tabs(["1\tThe  the\tthe"]))
+
+    def test_strict_tabs_keeps_double_spaces_in_values(self):
+        plan = compile_parse_plan(["id", "form", "lemma"], strict_tabs=True)
+        self.assertEqual(plan.parse_line("1\tNew  York\tny"), Token([
+            ("id", 1), ("form", "New  York"), ("lemma", "ny"),
+        ]))
+
+    def test_strict_tabs_falls_back_to_spaces_without_tabs(self):
+        plan = compile_parse_plan(["id", "form"], strict_tabs=True)
+        self.assertEqual(plan.parse_line("1  The"), Token([("id", 1), ("form", "The")]))
+
+    def test_without_strict_tabs_splits_on_double_spaces(self):
+        plan = compile_parse_plan(["id", "form", "lemma"])
+        self.assertEqual(plan.parse_line("1\tNew  York\tny"), Token([
+            ("id", 1), ("form", "New"), ("lemma", "York"),
+        ]))
+
 class TestParseLine(unittest.TestCase):
     def test_empty(self):
         with self.assertRaises(ParseException) as assert_context:
@@ -398,6 +694,13 @@ class TestParseLine(unittest.TestCase):
             ])
         )
 
+    def test_parse_line_does_not_modify_field_parsers(self):
+        custom_fieldparsers = {
+            "xpos": lambda line, i: line[i] * 5,
+        }
+        parse_line("1\t2", fields=["xpostag"], field_parsers=custom_fieldparsers)
+        self.assertEqual(list(custom_fieldparsers.keys()), ["xpos"])
+
 class TestParseCommentLine(unittest.TestCase):
     def test_parse_spaces_before_square(self):
         data = ["# a = 1", "  # a = 1", "\t# a = 1"]
@@ -604,12 +907,131 @@ class TestParseDictValue(unittest.TestCase):
         self.assertEqual(parse_dict_value(""), None)
         self.assertEqual(parse_dict_value("_"), None)
 
+class TestScannersMatchPatterns(unittest.TestCase):
+    """
+        The value parsers scan strings by hand, but must accept exactly what the patterns accept.
+    """
+    @staticmethod
+    def parse_int_with_pattern(value):
+        if value == "_":
+            return None
+
+        if re.fullmatch(INTEGER, value):
+            return int(value)
+
+        raise ParseException("'{}' is not a valid value for parse_int_value.".format(value))
+
+    @staticmethod
+    def parse_id_with_patterns(value):
+        if not value or value == "_":
+            return None
+
+        if re.fullmatch(ID_SINGLE, value):
+            return int(value)
+        elif re.fullmatch(ID_RANGE, value):
+            from_, to = map(int, value.split("-"))
+            if to >= from_:
+                return (from_, "-", to)
+        elif re.fullmatch(ID_DOT_ID, value):
+            return (int(value.split(".")[0]), ".", int(value.split(".")[1]))
+
+        raise ParseException("'{}' is not a valid ID.".format(value))
+
+    def parse_paired_list_with_pattern(self, value):
+        if re.fullmatch(MULTI_DEPS_PATTERN, value):
+            return [
+                (part.split(":", 1)[1], self.parse_id_with_patterns(part.split(":")[0]))
+                for part in value.split("|")
+            ]
+
+        return parse_nullable_value(value)
+
+    def assertSameResult(self, first, second, value):
+        results = []
+        for function in (first, second):
+            try:
+                results.append(function(value))
+            except ParseException as e:
+                results.append(str(e))
+
+        self.assertEqual(results[0], results[1], value)
+
+    def test_random_values(self):
+        rng = random.Random(0)
+        for _ in range(10000):
+            value = "".join(rng.choice("0123456789-._:|a\u0663\u00b2 ") for _ in range(rng.randint(0, 8)))
+            self.assertSameResult(parse_int_value, self.parse_int_with_pattern, value)
+            self.assertSameResult(parse_id_value, self.parse_id_with_patterns, value)
+            self.assertSameResult(parse_paired_list_value, self.parse_paired_list_with_pattern, value)
+
+    def test_random_deps(self):
+        rng = random.Random(0)
+        ids = ["0", "1", "10", "01", "1-2", "2-1", "0-1", "1.1", "0.1", "1.0", "01.1", "1.1.1", "_", "", "a"]
+        relations = ["nsubj", "obl:for", "_x", "-x", "1x", "\u0663x", "x_y", "x-y", "", "obl::x", "conj:and:x"]
+        for _ in range(5000):
+            value = "|".join(rng.choice(ids) + ":" + rng.choice(relations) for _ in range(rng.randint(1, 3)))
+            self.assertSameResult(parse_paired_list_value, self.parse_paired_list_with_pattern, value)
+
 class TestParseNullableValue(unittest.TestCase):
     def test_parse_nullable_value(self):
         self.assertEqual(parse_nullable_value("_"), None)
         self.assertEqual(parse_nullable_value(""), None)
         self.assertEqual(parse_nullable_value("hello"), "hello")
 
+class TestParseCache(unittest.TestCase):
+    lines = [
+        "1\tThe\tthe\tDET\tDT\tDefinite=Def\t2\tdet\t2:det\t_",
+        "2\tdog\tdog\tNOUN\tNN\tNumber=Sing\t0\troot\t0:root\tSpaceAfter=No",
+        "1\tThe\tthe\tDET\tDT\tDefinite=Def\t2\tdet\t2:det\t_",
+    ]
+
+    # The compiled parser doesn't use the caches
+    plan = compile_parse_plan()._replace(native=False)
+
+    def setUp(self):
+        set_parse_cache_size()
+
+    def tearDown(self):
+        set_parse_cache_size()
+
+    def test_counts_hits(self):
+        tokens = [self.plan.parse_line(line) for line in self.lines]
+        self.assertEqual(tokens[0], tokens[2])
+        self.assertEqual(parse_cache_info()["id"], {"hits": 1, "misses": 2, "size": 2, "max_size": 4096})
+        self.assertEqual(parse_cache_info()["misc"], {"hits": 1, "misses": 2, "size": 2, "max_size": 4096})
+        self.assertEqual(parse_cache_info().keys(), {"id", "head", "deps", "feats", "misc"})
+
+    def test_values_are_copies(self):
+        first, _, second = [self.plan.parse_line(line) for line in self.lines]
+        first["feats"]["Definite"] = "Ind"
+        first["deps"].append(("conj", 1))
+        self.assertEqual(second["feats"], {"Definite": "Def"})
+        self.assertEqual(second["deps"], [("det", 2)])
+
+    def test_least_recently_used_out(self):
+        set_parse_cache_size(1)
+        for line in self.lines:
+            self.plan.parse_line(line)
+
+        self.assertEqual(parse_cache_info()["id"], {"hits": 0, "misses": 3, "size": 1, "max_size": 1})
+
+    def test_disabled(self):
+        set_parse_cache_size(0)
+        self.assertEqual(parse_cache_info(), {})
+        self.assertEqual(self.plan.parse_line(self.lines[0])["feats"], {"Definite": "Def"})
+
+    def test_errors_are_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(ParseException):
+                parse_line("a\tdog", ["id", "form"])
+
+        self.assertEqual(parse_cache_info()["id"]["misses"], 2)
+
+    def test_custom_parsers_are_not_cached(self):
+        compile_parse_plan(field_parsers={"feats": lambda line, i: line[i]}).parse_line(self.lines[0])
+        self.assertEqual(parse_cache_info()["feats"]["misses"], 0)
+        self.assertEqual(parse_cache_info()["id"]["misses"], 1)
+
 class TestHeadToToken(unittest.TestCase):
     maxDiff = None
 
@@ -635,6 +1057,9 @@ class TestHeadToToken(unittest.TestCase):
         with self.assertRaises(ParseException):
             head_to_token([{"data": "a"}])
 
+        with self.assertRaises(ParseException):
+            head_to_token([{"data": "a", "head": 1}])
+
     def test_negative_head(self):
         self.assertEqual(
             head_to_token([
@@ -754,6 +1179,15 @@ class TestSerializeField(unittest.TestCase):
         data = {"key1": True, "key2": False}
         self.assertEqual(serialize_field(data), "key1=True|key2=False")
 
+    def test_subclasses(self):
+        class MyStr(str):
+            pass
+
+        self.assertEqual(serialize_field(OrderedDict([("key1", MyStr("")), ("key2", MyStr("a"))])), "key1|key2=a")
+        self.assertEqual(serialize_field(type("MyTuple", (tuple,), {})((1, "-", 2))), "1-2")
+        self.assertEqual(serialize_field(type("MyList", (list,), {})([("nsubj", 2)])), "2:nsubj")
+        self.assertEqual(serialize_field(MyStr("ADJ")), "ADJ")
+
     def test_dict_with_nonserializable_type0(self):
         _object = object()
         data = {"key1": _object}
@@ -806,3 +1240,38 @@ class TestSerialize(unittest.TestCase):
         """)
         tokenlist = parse_token_and_metadata(data)
         self.assertEqual(serialize(tokenlist).strip(), data.strip())
+
+    def test_serialize_incr(self):
+        data = dedent("""\
+            # sent_id = 1
+            1\tThe\tthe\tDET\tDT\tDefinite=Def|PronType=Art\t2\tdet\t_\t_
+            2\tdog\tdog\tNOUN\tNN\tNumber=Sing\t0\troot\t2:nsubj|3:obj\tSpaceAfter=No
+
+            # sent_id = 2
+            1-2\tdidn't\t_\t_\t_\t_\t_\t_\t_\t_
+            1\tdid\tdo\tAUX\t_\t_\t0\troot\t_\t_
+            2\tn't\tnot\tPART\t_\tPolarity=Neg\t1\tadvmod\t_\t_
+
+        """)
+
+        out_file = StringIO()
+        serialize_incr(parse_incr(StringIO(data)), out_file)
+        self.assertEqual(out_file.getvalue(), data)
+
+        out_file = BytesIO()
+        serialize_incr(parse(data), out_file, buffer_size=1)
+        self.assertEqual(out_file.getvalue().decode("utf-8"), data)
+
+        out_file = StringIO()
+        serialize_incr([], out_file)
+        self.assertEqual(out_file.getvalue(), "")
+
+        for out_file in [
+            tempfile.NamedTemporaryFile(), tempfile.SpooledTemporaryFile(), tempfile.NamedTemporaryFile("w+"),
+            tempfile.SpooledTemporaryFile(mode="w+"),
+        ]:
+            with self.subTest(out_file=out_file), out_file:
+                serialize_incr(parse(data), out_file, buffer_size=1)
+                out_file.seek(0)
+                written = out_file.read()
+                self.assertEqual(written.decode("utf-8") if isinstance(written, bytes) else written, data)
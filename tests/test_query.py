@@ -0,0 +1,76 @@
+import unittest
+from io import StringIO
+from textwrap import dedent
+
+from conllu import parse, parse_incr, query
+from conllu.models import Token, TokenList
+
+DATA = dedent("""\
+    # sent_id = 1
+    1\tThe\tthe\tDET\tDT\tDefinite=Def|PronType=Art\t2\tdet\t_\t_
+    2\tdogs\tdog\tNOUN\tNNS\tNumber=Plur\t3\tnsubj\t_\t_
+    3\tbark\tbark\tVERB\tVBP\tNumber=Plur\t0\troot\t_\t_
+
+    # sent_id = 2
+    1\tA\ta\tDET\tDT\tDefinite=Ind|PronType=Art\t2\tdet\t_\t_
+    2\tcat\tcat\tNOUN\tNN\tNumber=Sing\t0\troot\t_\t_
+""")
+
+
+class TestCompile(unittest.TestCase):
+    def setUp(self):
+        self.sentence = parse(DATA)[0]
+
+    def forms(self, tokens):
+        return [token["form"] for token in tokens]
+
+    def test_single_field(self):
+        self.assertEqual(self.forms(query.compile(upos="NOUN").filter(self.sentence)), ["dogs"])
+        self.assertEqual(self.forms(query.compile(upostag="NOUN").filter(self.sentence)), ["dogs"])
+
+    def test_nested_field(self):
+        self.assertEqual(self.forms(query.compile(feats__Number="Plur").filter(self.sentence)), ["dogs", "bark"])
+        self.assertEqual(self.forms(query.compile(misc__SpaceAfter="No").filter(self.sentence)), [])
+        self.assertEqual(self.forms(query.compile(form__x="y").filter(self.sentence)), [])
+
+    def test_callable(self):
+        self.assertEqual(self.forms(query.compile(head=lambda head: head > 2).filter(self.sentence)), ["dogs"])
+        has_definite = query.compile(feats__Definite=lambda value: value is not None)
+        self.assertEqual([has_definite(token) for token in self.sentence], [True, False, False])
+
+    def test_all_conditions_must_match(self):
+        self.assertEqual(self.forms(query.compile(upos="NOUN", feats__Number="Plur").filter(self.sentence)), ["dogs"])
+        self.assertEqual(self.forms(query.compile(upos="DET", feats__Number="Plur").filter(self.sentence)), [])
+
+    def test_empty(self):
+        self.assertEqual(query.compile().filter(self.sentence), self.sentence)
+
+    def test_and_or_not(self):
+        noun = query.compile(upos="NOUN")
+        verb = query.compile(upos="VERB")
+        plural = query.compile(feats__Number="Plur")
+
+        self.assertEqual(self.forms((noun | verb).filter(self.sentence)), ["dogs", "bark"])
+        self.assertEqual(self.forms((plural & ~noun).filter(self.sentence)), ["bark"])
+        self.assertEqual(self.forms((~(noun | verb)).filter(self.sentence)), ["The"])
+
+    def test_filter_keeps_metadata_and_type(self):
+        class MyTokenList(TokenList):
+            pass
+
+        tokenlist = MyTokenList([Token({"id": 1})], {"sent_id": "1"}, default_fields=("id",))
+        filtered = query.compile(id=1).filter(tokenlist)
+        self.assertIsInstance(filtered, MyTokenList)
+        self.assertEqual(filtered.metadata, {"sent_id": "1"})
+        self.assertEqual(filtered.default_fields, ("id",))
+
+    def test_sentences(self):
+        sentences = query.compile(lemma="cat").sentences(parse_incr(StringIO(DATA)))
+        self.assertEqual([sentence.metadata["sent_id"] for sentence in sentences], ["2"])
+
+    def test_tokens(self):
+        matches = query.compile(upos="DET").tokens(parse(DATA))
+        self.assertEqual([(sentence.metadata["sent_id"], token["form"]) for sentence, token in matches], [
+            ("1", "The"),
+            ("2", "A"),
+        ])
@@ -0,0 +1,162 @@
+import copy
+import os
+import pickle
+import tempfile
+import unittest
+from io import StringIO
+from textwrap import dedent
+from unittest import mock
+
+from conllu import parse, parse_incr
+from conllu.arrays import Vocabulary
+from conllu.binary import load_binary, save_binary
+from conllu.columnar import ColumnarSentenceList
+from conllu.corpus_index import CorpusIndex
+from conllu.parser import compile_parse_plan
+from conllu.serializer import serialize_field
+from conllu.shared import SharedDict
+
+DATA = dedent("""\
+    # sent_id = 1
+    1\tThe\tthe\tDET\tDT\tDefinite=Def|PronType=Art\t2\tdet\t_\t_
+    2\tdog\tdog\tNOUN\tNN\tNumber=Sing\t0\troot\t_\tSpaceAfter=No
+
+    # sent_id = 2
+    1\tA\ta\tDET\tDT\tDefinite=Ind|PronType=Art\t2\tdet\t_\t_
+    2\tcat\tcat\tNOUN\tNN\tNumber=Sing\t0\troot\t_\tSpaceAfter=No
+
+""")
+
+
+class TestSharedDict(unittest.TestCase):
+    def test_copy_on_write(self):
+        data = {"Number": "Sing", "Case": "Nom"}
+        first = SharedDict.shared(data)
+        second = SharedDict.shared(data)
+        self.assertTrue(first.is_shared)
+
+        first["Number"] = "Plur"
+        self.assertEqual(first, {"Number": "Plur", "Case": "Nom"})
+        self.assertEqual(second, {"Number": "Sing", "Case": "Nom"})
+        self.assertEqual(data, {"Number": "Sing", "Case": "Nom"})
+        self.assertFalse(first.is_shared)
+        self.assertTrue(second.is_shared)
+
+        del second["Case"]
+        self.assertEqual(second, {"Number": "Sing"})
+        self.assertEqual(data, {"Number": "Sing", "Case": "Nom"})
+
+        third = SharedDict.shared(data)
+        third.update(Person="3")
+        self.assertEqual(third.pop("Case"), "Nom")
+        third.clear()
+        self.assertEqual(third, {})
+        self.assertEqual(data, {"Number": "Sing", "Case": "Nom"})
+
+    def test_works_like_a_dict(self):
+        shared_dict = SharedDict.shared({"Number": "Sing", "Typo": None})
+        self.assertEqual(shared_dict["Number"], "Sing")
+        self.assertEqual(shared_dict.get("Case"), None)
+        self.assertIn("Typo", shared_dict)
+        self.assertEqual(len(shared_dict), 2)
+        self.assertEqual(list(shared_dict), ["Number", "Typo"])
+        self.assertEqual(list(shared_dict.keys()), ["Number", "Typo"])
+        self.assertEqual(list(shared_dict.values()), ["Sing", None])
+        self.assertEqual(dict(shared_dict.items()), {"Number": "Sing", "Typo": None})
+        self.assertEqual(repr(shared_dict), "{'Number': 'Sing', 'Typo': None}")
+
+        self.assertEqual(shared_dict, SharedDict({"Number": "Sing", "Typo": None}))
+        self.assertEqual({"Number": "Sing", "Typo": None}, shared_dict)
+        self.assertNotEqual(shared_dict, {"Number": "Sing"})
+        self.assertNotEqual(shared_dict, [("Number", "Sing")])
+        with self.assertRaises(TypeError):
+            hash(shared_dict)
+
+    def test_copies(self):
+        data = {"Number": "Sing"}
+        shared_dict = SharedDict.shared(data)
+        for duplicate in [shared_dict.copy(), copy.copy(shared_dict), pickle.loads(pickle.dumps(shared_dict))]:
+            self.assertTrue(duplicate.is_shared)
+            duplicate["Number"] = "Plur"
+            self.assertEqual(shared_dict, {"Number": "Sing"})
+
+        owned = SharedDict(data)
+        self.assertFalse(owned.is_shared)
+        for duplicate in [owned.copy(), pickle.loads(pickle.dumps(owned))]:
+            self.assertFalse(duplicate.is_shared)
+            duplicate["Number"] = "Plur"
+            self.assertEqual(owned, {"Number": "Sing"})
+
+    def test_serialize(self):
+        self.assertEqual(serialize_field(SharedDict.shared({"Number": "Sing", "Typo": ""})), "Number=Sing|Typo")
+        self.assertEqual(serialize_field(SharedDict()), "_")
+
+
+class TestParseSharedFields(unittest.TestCase):
+    def test_shares_dicts(self):
+        sentences = parse(DATA, shared_fields=["feats", "misc"])
+        self.assertEqual(sentences, parse(DATA))
+        self.assertEqual(sentences[0].serialize(), parse(DATA)[0].serialize())
+
+        feats = sentences[0][1]["feats"]
+        self.assertIsInstance(feats, SharedDict)
+        self.assertIs(feats._data, sentences[1][1]["feats"]._data)
+        self.assertIs(sentences[0][1]["misc"]._data, sentences[1][1]["misc"]._data)
+        self.assertIsNot(sentences[0][0]["feats"]._data, sentences[1][0]["feats"]._data)
+        self.assertIsNone(sentences[0][0]["misc"])
+        self.assertIsNone(sentences[0][0]["deps"])
+
+    def test_changing_a_token(self):
+        sentences = parse(DATA, shared_fields=["feats"])
+        sentences[0][1]["feats"]["Number"] = "Plur"
+        self.assertEqual(sentences[1][1]["feats"], {"Number": "Sing"})
+        self.assertIn("Number=Plur", sentences[0].serialize())
+
+        self.assertEqual(sentences[0].filter(feats__Number="Plur")[0]["form"], "dog")
+        self.assertEqual(len(sentences[1].filter(feats__Number="Sing")), 1)
+
+    def test_only_named_fields(self):
+        sentences = list(parse_incr(StringIO(DATA), shared_fields=["misc", "form"]))
+        self.assertIs(type(sentences[0][1]["feats"]), dict)
+        self.assertIsInstance(sentences[0][1]["misc"], SharedDict)
+        self.assertIs(type(sentences[0][1]["form"]), str)
+
+    def test_max_shared_values(self):
+        plan = compile_parse_plan(shared_fields=["feats"])
+        with mock.patch("conllu.parser.MAX_SHARED_VALUES", 1):
+            first = plan.parse_line("1\tdog\t_\t_\t_\tNumber=Sing\t0\troot\t_\t_")
+            second = plan.parse_line("2\tdogs\t_\t_\t_\tNumber=Plur\t0\troot\t_\t_")
+
+        self.assertIsInstance(first["feats"], SharedDict)
+        self.assertIs(type(second["feats"]), dict)
+
+    def test_compact_lazy_and_intern(self):
+        expected = parse(DATA)
+        for options in [{"compact": True}, {"lazy": True}, {"intern": True}]:
+            with self.subTest(**options):
+                sentences = parse(DATA, shared_fields=["feats"], **options)
+                self.assertEqual(sentences, expected)
+                self.assertIsInstance(sentences[0][1]["feats"], SharedDict)
+                self.assertEqual(sentences[0].serialize(), expected[0].serialize())
+
+    def test_other_containers(self):
+        sentences = parse(DATA, shared_fields=["feats"])
+
+        corpus = ColumnarSentenceList(sentences)
+        self.assertEqual(list(corpus), parse(DATA))
+        self.assertEqual(len(corpus.values), len(ColumnarSentenceList(parse(DATA)).values))
+        token = corpus[0][1]
+        self.assertIsInstance(token["feats"], SharedDict)
+        token["feats"]["Number"] = "Plur"
+        self.assertEqual(corpus[1][1]["feats"], {"Number": "Sing"})
+
+        index = CorpusIndex.build(sentences)
+        self.assertEqual(index.lookup("feats__Number", "Sing"), [(0, 1), (1, 1)])
+
+        vocabulary = Vocabulary()
+        self.assertEqual(vocabulary.encode(sentences[0][1]["feats"]), vocabulary.encode({"Number": "Sing"}))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus.bin")
+            save_binary(sentences, path)
+            self.assertEqual(load_binary(path), sentences)
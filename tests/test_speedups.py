@@ -0,0 +1,118 @@
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+from benchmarks.corpus import SHAPES, generate_corpus
+from conllu import parse
+from conllu.exceptions import ParseException
+from conllu.intern import InternTable
+from conllu.models import Token
+from conllu.parser import DEFAULT_FIELDS, _load_speedups, _speedups, compile_parse_plan
+from tests.fixtures import TESTCASES
+
+# Pieces that hit every branch of the id, int, deps and dict parsers, and of the column splitting
+VALUES = [
+    "", "_", "-", ".", ":", "|", "=", "0", "1", "01", "-0", "-1", "-01", "12", "99999999999999999999",
+    "-99999999999999999999", "1-2", "2-1", "0-1", "1-", "1.1", "0.1", "1.0", "1.", ".1", "١", "²", "1-2-3",
+    "1.1.1", "a", "ab", "Å", "dog", "1:nsubj", "1:_", "1:-", "1:1", "1:", "1:a:b", "1:a::b", "1:a|2:b", "1:a|",
+    "|1:a", "0:root|2.1:nsubj:pass", "1-2:x", "1:a|x", "a=b", "a=b|c=d", "a", "a=", "=b", "_=b", "a=_",
+    "a=b=c", "a|b", "a||b", "|", "Typo=Yes|SpaceAfter=No", "Ö=ä",
+]
+SEPARATORS = ["\t", "\t", "\t", "  ", "   ", " \t", "\t ", "\t\t", " "]
+
+def random_line(rng):
+    values = [rng.choice(VALUES) for _ in range(rng.randint(1, 12))]
+    line = values[0]
+    for value in values[1:]:
+        line += rng.choice(SEPARATORS) + value
+
+    return line
+
+def parse_result(parse_line, line):
+    try:
+        token = parse_line(line)
+    except ParseException as e:
+        return ("error", str(e))
+
+    return ("token", type(token), list(token.items()), [type(value) for value in token.values()])
+
+@unittest.skipIf(_speedups is None, "the compiled parser isn't built")
+class TestSpeedups(unittest.TestCase):
+    def assertSameAsPython(self, lines, strict_tabs=False):
+        plan = compile_parse_plan(strict_tabs=strict_tabs)
+        python_plan = plan._replace(native=False)
+        self.assertTrue(plan.native)
+
+        for line in lines:
+            with self.subTest(line=line):
+                self.assertEqual(parse_result(plan.parse_line, line), parse_result(python_plan.parse_line, line))
+
+    def test_random_lines(self):
+        rng = random.Random(1)
+        lines = [random_line(rng) for _ in range(5000)]
+        self.assertSameAsPython(lines)
+        self.assertSameAsPython(lines, strict_tabs=True)
+
+    def test_every_value_in_every_column(self):
+        for i in range(len(DEFAULT_FIELDS)):
+            lines = []
+            for value in VALUES:
+                values = ["1", "dog", "dog", "NOUN", "NN", "_", "0", "root", "_", "_", "extra"]
+                values[i] = value
+                lines.append("\t".join(values))
+
+            self.assertSameAsPython(lines)
+            self.assertSameAsPython(lines, strict_tabs=True)
+
+    def test_parse(self):
+        for data in TESTCASES + [generate_corpus(50, shape) for shape in SHAPES]:
+            with self.subTest(data=data[:50]):
+                sentences = parse(data)
+                with mock.patch("conllu.parser._speedups", None):
+                    self.assertEqual(sentences, parse(data))
+
+        with self.assertRaisesRegex(ParseException, "Failed parsing field 'id': 'x' is not a valid ID."):
+            parse("1\tdog\n\nx\tcat")
+
+    def test_token_lines_must_be_strings(self):
+        with self.assertRaisesRegex(TypeError, "must be strings"):
+            _speedups.parse_token_lines(["1\tdog", 1], False, Token)
+
+        with self.assertRaises(TypeError):
+            _speedups.parse_token_line(1, False, Token)
+
+    def test_only_default_plans_are_native(self):
+        self.assertTrue(compile_parse_plan(DEFAULT_FIELDS, {}).native)
+        self.assertFalse(compile_parse_plan(["id", "form"]).native)
+        self.assertFalse(compile_parse_plan(field_parsers={"feats": lambda line, i: line[i]}).native)
+        self.assertFalse(compile_parse_plan(compact=True).native)
+        self.assertFalse(compile_parse_plan(lazy=True).native)
+        self.assertFalse(compile_parse_plan(columns=["form"]).native)
+        self.assertFalse(compile_parse_plan(intern=InternTable()).native)
+        self.assertFalse(compile_parse_plan(shared_fields=["feats"]).native)
+
+class TestLoadSpeedups(unittest.TestCase):
+    @unittest.skipIf(os.environ.get("CONLLU_PURE_PYTHON"), "the compiled parser is turned off")
+    def test_loaded(self):
+        # The extension is optional, so only environments that build it, like tox, require it
+        if _speedups is None and not os.environ.get("CONLLU_REQUIRE_SPEEDUPS"):
+            self.skipTest(
+                "the compiled parser isn't built, build it with 'python setup.py build_ext --inplace', "
+                "and set CONLLU_REQUIRE_SPEEDUPS=1 to fail when it's missing"
+            )
+
+        self.assertIsNotNone(_speedups)
+
+    def test_pure_python(self):
+        with mock.patch.dict(os.environ, {"CONLLU_PURE_PYTHON": "1"}):
+            self.assertIsNone(_load_speedups())
+
+    def test_not_built(self):
+        with mock.patch.dict(sys.modules, {"conllu._speedups": None}):
+            self.assertIsNone(_load_speedups())
+
+    def test_python_plans(self):
+        with mock.patch("conllu.parser._speedups", None):
+            self.assertFalse(compile_parse_plan().native)